@@ -272,6 +272,95 @@ else:
 SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
 
 
+# =============================================================================
+# BULK UPLOAD / BACKGROUND JOBS
+# Local default: uploads run inside the request
+# Production: Set IMPORT_JOBS_ENABLED=True and run `python manage.py run_import_worker`
+# =============================================================================
+
+# Queue bulk uploads as ImportJob rows instead of processing them in the request
+# (clients can still override per request with the `background` POST field)
+IMPORT_JOBS_ENABLED = os.getenv('IMPORT_JOBS_ENABLED', 'False').lower() in ('true', '1', 'yes')
+
+# Cards inserted per bulk_create chunk (one transaction per chunk)
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+
+# Processes used by `run_import_worker` to validate and thumbnail ZIP photos
+# of queued bulk uploads (0 or 1 = inline). Uploads handled in the web request
+# are always processed inline.
+IMPORT_IMAGE_WORKERS = int(os.getenv('IMPORT_IMAGE_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# Accept bulk-upload photos on a header-only check (signature, dimensions,
+# end marker). The full decode runs later in `run_import_worker`.
+IMAGE_FAST_VALIDATION = os.getenv('IMAGE_FAST_VALIDATION', 'False').lower() in ('true', '1', 'yes')
+
+# Ingest policy for uploaded photos (bulk upload, re-upload, card edits):
+# EXIF orientation applied, EXIF/XMP stripped, long edge capped, re-encoded
+# (JPEG uploads as JPEG at IMAGE_INGEST_JPEG_QUALITY, everything else as PNG).
+# Metadata is cut out of JPEGs without decoding, but photos over the max edge
+# or with an EXIF rotation are decoded to resize them - even with
+# IMAGE_FAST_VALIDATION on. Set IMAGE_INGEST_MAX_EDGE=0 to keep uploads that
+# only need metadata stripped on the header-only path.
+IMAGE_INGEST_ENABLED = os.getenv('IMAGE_INGEST_ENABLED', 'True').lower() in ('true', '1', 'yes')
+IMAGE_INGEST_MAX_EDGE = int(os.getenv('IMAGE_INGEST_MAX_EDGE', '1600'))  # px, 0 = keep size
+IMAGE_INGEST_JPEG_QUALITY = int(os.getenv('IMAGE_INGEST_JPEG_QUALITY', '85'))
+
+# Seconds the import worker sleeps between polls when the queue is empty
+IMPORT_WORKER_POLL_INTERVAL = float(os.getenv('IMPORT_WORKER_POLL_INTERVAL', '2'))
+
+
+# =============================================================================
+# EXPORTS
+# =============================================================================
+
+# Image ZIP downloads store JPEG/PNG/WebP as is (ZIP_STORED) instead of
+# deflating data that is already compressed. Other files are still deflated.
+EXPORT_ZIP_STORE_COMPRESSED = os.getenv('EXPORT_ZIP_STORE_COMPRESSED', 'True').lower() in ('true', '1', 'yes')
+
+# Height (px) of the export-sized JPEG cached next to each photo
+# ({name}_export.jpg) and embedded in DOCX exports. 300px = 2.5cm at ~300 DPI.
+# Built at upload time; rebuilt on export when missing or older than the photo.
+EXPORT_RENDITION_HEIGHT = int(os.getenv('EXPORT_RENDITION_HEIGHT', '300'))
+
+# Threads preparing photos for DOCX exports ahead of the document writer
+# (0 or 1 = prepare them inline)
+EXPORT_IMAGE_WORKERS = int(os.getenv('EXPORT_IMAGE_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# DOCX exports of at least this many cards are written straight into a
+# streamed ZIP (document.xml one page at a time) instead of building the
+# whole document in memory first. 0 = always build in memory.
+EXPORT_DOCX_STREAM_MIN_CARDS = int(os.getenv('EXPORT_DOCX_STREAM_MIN_CARDS', '1000'))
+
+
+# =============================================================================
+# API RESPONSES
+# =============================================================================
+
+# JSON API bodies of at least this many bytes are gzipped for clients that
+# send Accept-Encoding: gzip (0 = never compress)
+API_GZIP_MIN_BYTES = int(os.getenv('API_GZIP_MIN_BYTES', '1024'))
+
+
+# =============================================================================
+# CACHING
+# Local default: per-process memory cache
+# Production (several workers): a shared backend, e.g.
+#   CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache
+#   CACHE_LOCATION=cache_table   (then run `python manage.py createcachetable`)
+# =============================================================================
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'idcard-cache'),
+    }
+}
+
+# Seconds the dashboard statistics snapshot is cached. Card status changes
+# are applied to the cached copy; client / staff counts refresh on expiry.
+DASHBOARD_STATS_CACHE_TTL = int(os.getenv('DASHBOARD_STATS_CACHE_TTL', '60'))
+
+
 # =============================================================================
 # LOGGING (Optional - useful for debugging in production)
 # =============================================================================
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Client, Staff, IDCardGroup, IDCard, IDCardTable, WebsiteSettings, SystemSettings
+from .models import User, Client, Staff, IDCardGroup, IDCard, IDCardTable, ImportJob, WebsiteSettings, SystemSettings
 
 
 @admin.register(User)
@@ -51,6 +51,14 @@ class IDCardAdmin(admin.ModelAdmin):
     raw_id_fields = ('table',)
 
 
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'table', 'status', 'rows_processed', 'cards_created', 'photos_matched', 'error_count', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('original_file_name', 'table__name')
+    raw_id_fields = ('table', 'created_by')
+
+
 @admin.register(WebsiteSettings)
 class WebsiteSettingsAdmin(admin.ModelAdmin):
     list_display = ('site_name', 'contact_email', 'contact_phone')
@@ -22,5 +22,16 @@ class CoreConfig(AppConfig):
         
         For Render deployment, the start command runs:
             python startup.py && gunicorn config.wsgi
+        
+        The only hook registered here re-creates the card search index after
+        `migrate` (SQLite drops its FTS triggers whenever a migration rebuilds
+        the IDCard table).
         """
-        pass
+        from django.db.models.signals import post_migrate
+        post_migrate.connect(_ensure_search_index, sender=self)
+
+
+def _ensure_search_index(sender, using, **kwargs):
+    from django.db import connections
+    from .services.search_service import SearchService
+    SearchService.install_index(connections[using])
@@ -0,0 +1,158 @@
+"""
+Card Query Benchmark Command
+============================
+Seeds a large number of ID cards and times the card listing hot path
+(list_cards pages, status filters, counts, Select All ids) twice:
+
+    before - only the plain table_id index (the schema before migration 0005)
+    after  - the (table, id) and (table, status, id) composite indexes
+
+The seeded client, tables and cards are removed afterwards unless --keep is
+given. Run it against a scratch database, not production.
+
+Usage:
+    python manage.py benchmark_card_queries                    # 1,000,000 cards
+    python manage.py benchmark_card_queries --cards 200000 --repeat 3
+"""
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.db.models import Count
+
+from core.models import User, Client, IDCardGroup, IDCardTable, IDCard
+
+
+class Command(BaseCommand):
+    help = 'Seed cards and benchmark listing/count queries with and without the composite indexes'
+
+    STATUSES = [choice for choice, _ in IDCard.STATUS_CHOICES]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=1_000_000, help='Total cards to seed')
+        parser.add_argument('--tables', type=int, default=4, help='Tables the cards are spread over')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per query (median is reported)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Cards per bulk_create')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded data')
+
+    def handle(self, *args, **options):
+        tables = self._seed(options)
+        table = tables[0]
+
+        try:
+            self._set_indexes(composite=False)
+            before = self._run_queries(table, options['repeat'])
+
+            self._set_indexes(composite=True)
+            after = self._run_queries(table, options['repeat'])
+        finally:
+            self._set_indexes(composite=True)
+            if not options['keep']:
+                self._cleanup(tables)
+
+        self.stdout.write(f"\n{'query':<34}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+        for name in before:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            self.stdout.write(f"{name:<34}{before[name]:>12.2f}{after[name]:>12.2f}{speedup:>9.1f}x")
+
+    # ==================== SEEDING ====================
+
+    def _seed(self, options):
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            username=f'benchmark_{suffix}', email=f'benchmark_{suffix}@example.com', role='client'
+        )
+        client = Client.objects.create(user=user, name=f'Benchmark {suffix}')
+        group = IDCardGroup.objects.create(client=client, name='Benchmark')
+        fields = [
+            {'name': 'NAME', 'type': 'text', 'order': 0},
+            {'name': 'CLASS', 'type': 'text', 'order': 1},
+            {'name': 'PHOTO', 'type': 'photo', 'order': 2},
+        ]
+        tables = [
+            IDCardTable.objects.create(group=group, name=f'Benchmark {i + 1}', fields=fields)
+            for i in range(max(1, options['tables']))
+        ]
+
+        total, batch_size = options['cards'], options['batch_size']
+        rng = random.Random(42)
+        started = time.perf_counter()
+        self.stdout.write(f"Seeding {total:,} cards over {len(tables)} table(s)...")
+
+        for start in range(0, total, batch_size):
+            batch = [
+                IDCard(
+                    table=tables[i % len(tables)],
+                    status=rng.choice(self.STATUSES),
+                    field_data={'NAME': f'STUDENT {i}', 'CLASS': str(i % 12 + 1), 'PHOTO': 'NOT_FOUND'},
+                )
+                for i in range(start, min(start + batch_size, total))
+            ]
+            with transaction.atomic():
+                IDCard.objects.bulk_create(batch, batch_size=batch_size)
+            if (start // batch_size) % 20 == 0:
+                self.stdout.write(f"  {start + len(batch):,} cards")
+
+        self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')  # Fresh planner statistics (SQLite and PostgreSQL)
+        return tables
+
+    def _cleanup(self, tables):
+        # Queryset deletes skip IDCardTable.delete(), which walks every card for images
+        IDCard.objects.filter(table__in=tables).delete()
+        User.objects.filter(client_profile__id_card_groups__tables__in=tables).delete()
+
+    # ==================== INDEXES ====================
+
+    def _set_indexes(self, composite: bool):
+        """Switch between the old (table_id only) and the new composite indexes"""
+        legacy_index = models.Index(fields=['table'], name='idcard_benchmark_table_idx')
+        existing = connection.introspection.get_constraints(connection.cursor(), IDCard._meta.db_table)
+
+        with connection.schema_editor() as editor:
+            for index in IDCard._meta.indexes:
+                if composite and index.name not in existing:
+                    editor.add_index(IDCard, index)
+                elif not composite and index.name in existing:
+                    editor.remove_index(IDCard, index)
+
+            if composite and legacy_index.name in existing:
+                editor.remove_index(IDCard, legacy_index)
+            elif not composite and legacy_index.name not in existing:
+                editor.add_index(IDCard, legacy_index)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    # ==================== QUERIES ====================
+
+    def _run_queries(self, table, repeat):
+        """Median latency (ms) of each hot-path query"""
+        cards = IDCard.objects.filter(table=table)
+        middle = cards.count() // 2
+
+        queries = {
+            'list_cards page 1': lambda: list(cards.order_by('id')[:100]),
+            'list_cards deep page': lambda: list(cards.order_by('id')[middle:middle + 100]),
+            'list_cards status=approved': lambda: list(cards.filter(status='approved').order_by('id')[:100]),
+            'count (table)': lambda: cards.count(),
+            'count (table, status)': lambda: cards.filter(status='approved').count(),
+            'status counts (group by)': lambda: list(cards.values('status').annotate(count=Count('id'))),
+            'all card ids status=pending': lambda: list(
+                cards.filter(status='pending').order_by('id').values_list('id', flat=True)
+            ),
+        }
+
+        results = {}
+        for name, query in queries.items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                query()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+        return results
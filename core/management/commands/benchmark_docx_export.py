@@ -0,0 +1,101 @@
+"""
+DOCX Export Benchmark Command
+=============================
+Times ExportService.build_docx (the card tables) and Document.save for
+cards built in memory (no database or storage access: every photo is the
+same small JPEG, handed over as a ready rendition).
+
+Both are run at a tenth of --rows and at --rows; the difference between
+the two, divided by the extra rows, is the per-row cost (document setup
+excluded). If it grows with --rows, something in the writer has become
+quadratic again. --max-row-ms turns the run into a check that fails when
+a row costs more than that.
+
+Usage:
+    python manage.py benchmark_docx_export
+    python manage.py benchmark_docx_export --rows 2000 --fields 20 --images 2 --max-row-ms 1.5
+"""
+import statistics
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Client, IDCard, IDCardGroup, IDCardTable
+from core.services import ExportService
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the per-row cost of DOCX exports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Cards in the larger export')
+        parser.add_argument('--fields', type=int, default=20, help='Columns per card (text + images)')
+        parser.add_argument('--images', type=int, default=2, help='How many of the columns are photos')
+        parser.add_argument('--photos', type=int, default=200, help='Distinct photo paths (shared photos are embedded once)')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per size (median is reported)')
+        parser.add_argument('--max-row-ms', type=float, default=None, help='Fail if a row of the larger export costs more')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 10:
+            raise CommandError('--rows must be at least 10')
+        images = min(options['images'], options['fields'])
+        fields = [{'name': f'FIELD {n}', 'type': 'text', 'order': n} for n in range(options['fields'] - images)]
+        fields += [{'name': f'PHOTO {n}', 'type': 'photo', 'order': len(fields) + n} for n in range(images)]
+        group = IDCardGroup(name='Benchmark', client=Client(name='Benchmark School'))
+        table = IDCardTable(id=1, group=group, name='BENCHMARK', fields=fields)
+        jpeg = self._jpeg()
+
+        def renditions(paths):
+            for path in paths:
+                yield path, jpeg
+
+        self.stdout.write(
+            f"{options['fields']} columns ({images} photos), {options['photos']} distinct photos\n"
+            f"\n{'rows':>7}{'build ms':>11}{'save ms':>10}{'KB':>10}"
+        )
+        totals = {}
+        for rows in (options['rows'] // 10, options['rows']):
+            cards = self._cards(rows, fields, options['photos'])
+            build_times, save_times = [], []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                document = ExportService.build_docx(table, cards, renditions=renditions)
+                built = time.perf_counter()
+                buffer = BytesIO()
+                document.save(buffer)
+                build_times.append((built - started) * 1000)
+                save_times.append((time.perf_counter() - built) * 1000)
+
+            build_ms, save_ms = statistics.median(build_times), statistics.median(save_times)
+            totals[rows] = (build_ms, save_ms)
+            self.stdout.write(f"{rows:>7}{build_ms:>11.1f}{save_ms:>10.1f}{len(buffer.getvalue()) / 1024:>10.0f}")
+
+        (small, (small_build, small_save)), (large, (large_build, large_save)) = totals.items()
+        build_per_row = (large_build - small_build) / (large - small)
+        per_row = build_per_row + (large_save - small_save) / (large - small)
+        self.stdout.write(f"\nPer row: {build_per_row:.3f} ms build, {per_row:.3f} ms with save")
+
+        if options['max_row_ms'] is not None and per_row > options['max_row_ms']:
+            raise CommandError(f"{per_row:.3f} ms per row exceeds --max-row-ms {options['max_row_ms']}")
+
+    @staticmethod
+    def _cards(rows, fields, photos):
+        cards = []
+        for i in range(rows):
+            field_data = {}
+            for field in fields:
+                if field['type'] == 'photo':
+                    field_data[field['name']] = f'adarshimg/benchmark/{field["name"]}/{i % photos:06d}.jpg'
+                else:
+                    field_data[field['name']] = f'{field["name"]} value {i}'
+            cards.append(IDCard(id=i + 1, table_id=1, field_data=field_data))
+        return cards
+
+    @staticmethod
+    def _jpeg():
+        from PIL import Image
+
+        output = BytesIO()
+        Image.new('RGB', (227, 302), (180, 180, 180)).save(output, format='JPEG', quality=90)
+        return output.getvalue()
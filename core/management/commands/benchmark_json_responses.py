@@ -0,0 +1,117 @@
+"""
+JSON Response Benchmark Command
+===============================
+Times API response encoding for representative payloads built in memory
+(no database access):
+
+    list page          - api_idcard_list, 100 cards with ordered_fields
+    columnar page      - the same page with format=columnar
+    all card ids       - api_idcard_all_ids for --ids cards (Select All)
+    search results     - api_idcard_search, 100 matches
+
+Each payload is encoded with Django's JsonResponse (stdlib encoder) and with
+FastJsonResponse (orjson when installed), then with gzip on top.
+
+Usage:
+    python manage.py benchmark_json_responses
+    python manage.py benchmark_json_responses --fields 15 --ids 200000 --repeat 50
+"""
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.http import JsonResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from core.models import IDCard
+from core.services import IDCardService
+from core.utils import FastJsonResponse
+from core.utils import json_response
+
+
+class Command(BaseCommand):
+    help = 'Benchmark stdlib vs fast JSON encoding (and gzip) for API payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=100, help='Cards per list page')
+        parser.add_argument('--fields', type=int, default=10, help='Text fields per card')
+        parser.add_argument('--ids', type=int, default=100000, help='Ids in the Select All payload')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per case (median is reported)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Fast encoder: {'orjson ' + json_response.orjson.__version__ if json_response.orjson else 'not installed (stdlib fallback)'}")
+        gzip_request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        payloads = self._payloads(options)
+
+        self.stdout.write(
+            f"\n{'payload':<16}{'stdlib ms':>11}{'fast ms':>10}{'speedup':>9}"
+            f"{'KB':>10}{'fast+gzip ms':>14}{'gzip KB':>10}"
+        )
+        for name, payload in payloads.items():
+            stdlib_ms, stdlib_response = self._time(lambda: JsonResponse(payload), options['repeat'])
+            fast_ms, _ = self._time(lambda: FastJsonResponse(payload), options['repeat'])
+            gzip_ms, gzip_response = self._time(
+                lambda: FastJsonResponse(payload, request=gzip_request), options['repeat']
+            )
+            self.stdout.write(
+                f"{name:<16}{stdlib_ms:>11.2f}{fast_ms:>10.2f}{stdlib_ms / fast_ms:>8.1f}x"
+                f"{len(stdlib_response.content) / 1024:>10.1f}{gzip_ms:>14.2f}"
+                f"{len(gzip_response.content) / 1024:>10.1f}"
+            )
+
+    def _payloads(self, options):
+        fields = [{'name': f'FIELD {n}', 'type': 'text', 'order': n} for n in range(options['fields'])]
+        fields.append({'name': 'PHOTO', 'type': 'photo', 'order': len(fields)})
+        now = timezone.now()
+        cards = []
+        for i in range(options['cards']):
+            field_data = {field['name']: f'{field["name"]} VALUE {i}' for field in fields}
+            field_data['PHOTO'] = f'adarshimg/benchmark/PHOTO/{i:06d}.jpg'
+            cards.append(IDCard(
+                id=i + 1, table_id=1, field_data=field_data, status='pending',
+                created_at=now - timedelta(minutes=i), updated_at=now,
+            ))
+
+        page = {
+            'success': True,
+            'cards': [IDCardService.serialize_card(card, sr_no=i + 1, table_fields=fields) for i, card in enumerate(cards)],
+            'total_count': 10000, 'offset': 0, 'limit': len(cards), 'has_more': True,
+        }
+        columnar = {
+            'success': True, 'format': 'columnar', 'first_sr_no': 1,
+            **IDCardService.serialize_cards_columnar(cards, fields),
+            'total_count': 10000, 'offset': 0, 'limit': len(cards), 'has_more': True,
+        }
+        card_ids = list(range(1, options['ids'] + 1))
+        search = {
+            'success': True,
+            'results': [{
+                'id': card.id,
+                'display_name': card.field_data['FIELD 0'],
+                'status': card.status,
+                'status_display': card.get_status_display(),
+                'matched_field': 'FIELD 0',
+                'matched_value': card.field_data['FIELD 0'],
+                'photo': None,
+                'field_data': card.field_data,
+            } for card in cards],
+            'count': len(cards), 'has_more': False, 'query': 'VALUE',
+        }
+        return {
+            'list page': page,
+            'columnar page': columnar,
+            'all card ids': {'success': True, 'card_ids': card_ids, 'total_count': len(card_ids)},
+            'search results': search,
+        }
+
+    def _time(self, build, repeat):
+        """Median milliseconds to build the response, and the last response"""
+        timings = []
+        response = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = build()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), response
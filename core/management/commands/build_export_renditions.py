@@ -0,0 +1,70 @@
+"""
+Build Export Renditions Command
+===============================
+Creates the export-sized photo copies ({name}_export.jpg) embedded in DOCX
+exports. New uploads get theirs at ingest; run this once for photos uploaded
+before renditions existed (or after changing EXPORT_RENDITION_HEIGHT with
+--force), so the first export of an old batch doesn't pay for the resizing.
+
+Usage:
+    python manage.py build_export_renditions              # every table
+    python manage.py build_export_renditions --table 12   # one table
+    python manage.py build_export_renditions --force      # rebuild existing ones
+"""
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.models import IDCard, IDCardTable
+from core.services import ImageService
+
+
+class Command(BaseCommand):
+    help = 'Build the cached export-sized copies of card photos used by DOCX exports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table',
+            type=int,
+            action='append',
+            dest='table_ids',
+            help='Only process this table id (can be repeated)',
+        )
+        parser.add_argument('--force', action='store_true', help='Rebuild renditions that already exist')
+
+    def handle(self, *args, **options):
+        tables = IDCardTable.objects.order_by('id')
+        if options['table_ids']:
+            tables = tables.filter(id__in=options['table_ids'])
+
+        built = missing = failed = 0
+        for table in tables:
+            image_fields = ImageService.get_image_field_names(table.fields or [])
+            if not image_fields:
+                continue
+
+            paths = set()
+            for field_data in IDCard.objects.filter(table=table).values_list('field_data', flat=True).iterator():
+                for field in image_fields:
+                    path = (field_data or {}).get(field)
+                    if ImageService.get_export_rendition_path(path):
+                        paths.add(path)
+
+            for path in sorted(paths):
+                if options['force']:
+                    rendition_path = ImageService.get_export_rendition_path(path)
+                    if default_storage.exists(rendition_path):
+                        default_storage.delete(rendition_path)
+                try:
+                    ImageService.get_export_rendition(path)
+                    built += 1
+                except FileNotFoundError:
+                    missing += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f'{path}: {e}')
+
+            self.stdout.write(f'Table {table.id}: {len(paths)} photo(s)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{built} rendition(s) ready, {missing} photo(s) missing, {failed} failed'
+        ))
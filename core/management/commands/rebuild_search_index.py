@@ -0,0 +1,33 @@
+"""
+Rebuild Search Index Command
+============================
+Recomputes the IDCard search columns from field_data and (re)creates the
+database search index: the pg_trgm GIN indexes on PostgreSQL, the FTS5
+trigram table and its sync triggers on SQLite. Run it after manual SQL
+changes to field_data, or if searches have fallen back to a plain LIKE scan.
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --batch-size 5000
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.services import SearchService
+
+
+class Command(BaseCommand):
+    help = 'Recompute card search text and rebuild the database search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Cards per bulk_update')
+
+    def handle(self, *args, **options):
+        updated = SearchService.refresh_search_text(batch_size=options['batch_size'])
+        self.stdout.write(f'Search text updated on {updated} card(s)')
+
+        if connection.vendor == 'sqlite':
+            # Drop first so the FTS table is rebuilt from the fresh search columns
+            SearchService.drop_index(connection)
+        index = SearchService.install_index(connection)
+        self.stdout.write(self.style.SUCCESS(f'Search index: {index}'))
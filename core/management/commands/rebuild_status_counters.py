@@ -0,0 +1,43 @@
+"""
+Rebuild Status Counters Command
+===============================
+Recomputes the per-table TableStatusCounter rows from IDCard (one GROUP BY
+per table). Counters are kept in sync on every write; run this after manual
+SQL changes or if a badge ever shows a wrong number.
+
+Usage:
+    python manage.py rebuild_status_counters              # every table
+    python manage.py rebuild_status_counters --table 12   # one table
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import IDCardTable, TableStatusCounter
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-table card status counters from the ID cards'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table',
+            type=int,
+            action='append',
+            dest='table_ids',
+            help='Only rebuild this table id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        table_ids = options['table_ids'] or list(IDCardTable.objects.values_list('id', flat=True))
+
+        fixed = 0
+        for table_id in table_ids:
+            before = TableStatusCounter.objects.filter(table_id=table_id).first()
+            before = before.as_dict() if before else None
+            after = TableStatusCounter.rebuild(table_id).as_dict()
+            if before != after:
+                fixed += 1
+                self.stdout.write(f'Table {table_id}: {before} -> {after}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {len(table_ids)} counter(s), {fixed} changed'
+        ))
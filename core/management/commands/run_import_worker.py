@@ -0,0 +1,90 @@
+"""
+Import Worker Command
+=====================
+Processes queued bulk uploads (ImportJob rows) outside the web request.
+When the queue is empty it runs the deferred full decode of photos that
+were accepted by the fast header check (IMAGE_FAST_VALIDATION).
+
+The worker polls the database - no external broker is needed. Several
+workers can run side by side; each job is claimed atomically.
+
+Usage:
+    python manage.py run_import_worker            # run forever
+    python manage.py run_import_worker --once     # drain the queue and exit
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.services import ImportService, ImageService
+
+
+class Command(BaseCommand):
+    help = 'Process queued bulk upload jobs (polls the database for new jobs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process all queued jobs and exit instead of polling forever',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'IMPORT_WORKER_POLL_INTERVAL', 2),
+            help='Seconds to wait between polls when the queue is empty',
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=30,
+            help='Mark running jobs that have not reported progress for this many minutes as failed',
+        )
+
+    def handle(self, *args, **options):
+        poll_interval = options['poll_interval']
+        stale_after = timedelta(minutes=options['stale_minutes'])
+
+        # Photos of queued uploads are processed in the image pool here only
+        ImageService.enable_image_pool()
+
+        interrupted = ImportService.fail_stale_jobs(stale_after)
+        if interrupted:
+            self.stdout.write(self.style.WARNING(f'Marked {interrupted} interrupted job(s) as failed'))
+
+        self.stdout.write(f'Import worker started (poll interval {poll_interval}s)')
+
+        try:
+            while True:
+                close_old_connections()
+                job = ImportService.claim_next_job()
+
+                if job is None:
+                    # Idle - fully validate photos from fast-validated imports
+                    checked, broken = ImageService.run_deferred_checks()
+                    if checked:
+                        if broken:
+                            self.stdout.write(self.style.WARNING(
+                                f'Image check: {broken} of {checked} photo(s) broken, reset to PENDING'
+                            ))
+                        continue
+                    
+                    if options['once']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                self.stdout.write(f'Job #{job.id}: importing {job.original_file_name} into table {job.table_id}')
+                started = time.monotonic()
+                result = ImportService.run_job(job)
+                elapsed = time.monotonic() - started
+
+                if result.success:
+                    self.stdout.write(self.style.SUCCESS(f'Job #{job.id}: {result.message} ({elapsed:.1f}s)'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'Job #{job.id} failed: {result.message}'))
+        except KeyboardInterrupt:
+            self.stdout.write('Import worker stopped')
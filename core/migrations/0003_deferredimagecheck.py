@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-16 22:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeferredImageCheck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_name', models.CharField(max_length=100)),
+                ('image_path', models.CharField(max_length=500)),
+                ('reference', models.CharField(blank=True, default='', help_text='Photo reference from the upload sheet', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deferred_image_checks', to='core.idcardtable')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
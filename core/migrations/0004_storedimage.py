@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-16 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_deferredimagecheck'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('folder', models.CharField(help_text='Client image folder, e.g. adarshimg/ABCDE12345', max_length=255)),
+                ('sha256', models.CharField(max_length=64)),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('folder', 'sha256')},
+            },
+        ),
+    ]
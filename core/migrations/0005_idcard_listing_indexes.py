@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_storedimage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='idcard',
+            index=models.Index(fields=['table', 'id'], name='idcard_table_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='idcard',
+            index=models.Index(fields=['table', 'status', 'id'], name='idcard_table_status_id_idx'),
+        ),
+        # The (table, id) index covers table_id lookups, so the plain FK index
+        # is dropped only after the composite indexes exist
+        migrations.AlterField(
+            model_name='idcard',
+            name='table',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='id_cards', to='core.idcardtable'),
+        ),
+    ]
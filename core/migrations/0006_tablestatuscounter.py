@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_idcard_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableStatusCounter',
+            fields=[
+                ('table', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='status_counter', serialize=False, to='core.idcardtable')),
+                ('pending', models.IntegerField(default=0)),
+                ('verified', models.IntegerField(default=0)),
+                ('pool', models.IntegerField(default=0)),
+                ('approved', models.IntegerField(default=0)),
+                ('download', models.IntegerField(default=0)),
+                ('reprint', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
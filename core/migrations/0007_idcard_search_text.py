@@ -0,0 +1,90 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:07
+
+from django.db import DatabaseError, migrations, models, transaction
+
+# The tokenizer and index DDL are frozen here as they were when this
+# migration was written - later changes to SearchService / models must
+# not change what it does.
+
+PG_TRGM_INDEX = 'idcard_search_text_trgm_idx'
+SQLITE_FTS_TABLE = 'core_idcard_search'
+
+INDEX_SQL = {
+    'postgresql': [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        f'CREATE INDEX IF NOT EXISTS {PG_TRGM_INDEX} ON core_idcard USING gin (search_text gin_trgm_ops)',
+    ],
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+        f"search_text, content='core_idcard', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON core_idcard BEGIN "
+        f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON core_idcard BEGIN "
+        f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF search_text ON core_idcard BEGIN "
+        f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+        f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text); END",
+        f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+    ],
+}
+
+DROP_INDEX_SQL = {
+    'postgresql': [f'DROP INDEX IF EXISTS {PG_TRGM_INDEX}'],
+    'sqlite': [
+        *(f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au')),
+        f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}',
+    ],
+}
+
+
+def build_search_text(field_data):
+    """Every non-empty field_data value, uppercased, one value per line"""
+    if not field_data:
+        return ''
+    return '\n'.join(str(value).upper() for value in field_data.values() if value)
+
+
+def populate_search_text(apps, schema_editor):
+    IDCard = apps.get_model('core', 'IDCard')
+    batch = []
+    for card in IDCard.objects.only('id', 'field_data').iterator(chunk_size=1000):
+        card.search_text = build_search_text(card.field_data)
+        batch.append(card)
+        if len(batch) >= 1000:
+            IDCard.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        IDCard.objects.bulk_update(batch, ['search_text'])
+
+
+def install_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    try:
+        with transaction.atomic(using=connection.alias):
+            for sql in INDEX_SQL.get(connection.vendor, []):
+                schema_editor.execute(sql)
+    except DatabaseError:
+        pass  # No pg_trgm / FTS5 trigram tokenizer: search falls back to LIKE
+
+
+def drop_search_index(apps, schema_editor):
+    for sql in DROP_INDEX_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_tablestatuscounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='idcard',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        # PostgreSQL: pg_trgm GIN index | SQLite: FTS5 trigram table + triggers
+        migrations.RunPython(install_search_index, drop_search_index),
+    ]
@@ -0,0 +1,142 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:09
+
+from django.db import DatabaseError, migrations, models, transaction
+
+# The search document and index DDL are frozen here as they were when this
+# migration was written - later changes to SearchService / models must
+# not change what it does.
+
+IMAGE_FIELD_TYPES = ('photo', 'mother_photo', 'father_photo', 'barcode', 'qr_code', 'signature', 'image')
+SEARCH_FIELD_CATEGORIES = {
+    'name': ('NAME',),
+    'address': ('ADDRESS',),
+    'mobile': ('MOBILE', 'PHONE', 'MOB'),
+}
+SEARCH_COLUMNS = ['search_text', *(f'search_{category}' for category in SEARCH_FIELD_CATEGORIES)]
+
+SQLITE_FTS_TABLE = 'core_idcard_search'
+SQLITE_FTS_TRIGGERS = [f'{SQLITE_FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au')]
+_columns = ', '.join(SEARCH_COLUMNS)
+_new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+_old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+
+INDEX_SQL = {
+    'postgresql': [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        *(
+            f'CREATE INDEX IF NOT EXISTS idcard_{column}_trgm_idx ON core_idcard USING gin ({column} gin_trgm_ops)'
+            for column in SEARCH_COLUMNS
+        ),
+    ],
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+        f"{_columns}, content='core_idcard', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON core_idcard BEGIN "
+        f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON core_idcard BEGIN "
+        f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au AFTER UPDATE OF {_columns} ON core_idcard BEGIN "
+        f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); "
+        f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+        f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+    ],
+}
+
+
+def drop_index_sql(pg_indexes):
+    return {
+        'postgresql': [f'DROP INDEX IF EXISTS {index}' for index in pg_indexes],
+        'sqlite': [
+            *(f'DROP TRIGGER IF EXISTS {trigger}' for trigger in SQLITE_FTS_TRIGGERS),
+            f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}',
+        ],
+    }
+
+
+def build_search_document(field_data, table_fields):
+    """
+    search_text: every text value; search_<category>: the values of that
+    category's fields. Uppercased, one value per line, image fields left out.
+    """
+    image_fields = {
+        field.get('name') for field in (table_fields or [])
+        if field.get('type') in IMAGE_FIELD_TYPES
+    }
+    document = {column: [] for column in SEARCH_COLUMNS}
+    for field_name, value in (field_data or {}).items():
+        if not value or field_name in image_fields:
+            continue
+        text = str(value).upper()
+        document['search_text'].append(text)
+        name_upper = field_name.upper()
+        for category, keywords in SEARCH_FIELD_CATEGORIES.items():
+            if any(keyword in name_upper for keyword in keywords):
+                document[f'search_{category}'].append(text)
+    return {column: '\n'.join(values) for column, values in document.items()}
+
+
+def drop_single_column_index(apps, schema_editor):
+    """The 0007 index (search_text only)"""
+    for sql in drop_index_sql(['idcard_search_text_trgm_idx']).get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def populate_search_document(apps, schema_editor):
+    IDCard = apps.get_model('core', 'IDCard')
+    batch = []
+    cards = IDCard.objects.select_related('table').only('id', 'field_data', 'table__fields').order_by('id')
+    for card in cards.iterator(chunk_size=1000):
+        for column, text in build_search_document(card.field_data, card.table.fields).items():
+            setattr(card, column, text)
+        batch.append(card)
+        if len(batch) >= 1000:
+            IDCard.objects.bulk_update(batch, SEARCH_COLUMNS)
+            batch = []
+    if batch:
+        IDCard.objects.bulk_update(batch, SEARCH_COLUMNS)
+
+
+def install_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    try:
+        with transaction.atomic(using=connection.alias):
+            for sql in INDEX_SQL.get(connection.vendor, []):
+                schema_editor.execute(sql)
+    except DatabaseError:
+        pass  # No pg_trgm / FTS5 trigram tokenizer: search falls back to LIKE
+
+
+def drop_search_index(apps, schema_editor):
+    pg_indexes = [f'idcard_{column}_trgm_idx' for column in SEARCH_COLUMNS]
+    for sql in drop_index_sql(pg_indexes).get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_idcard_search_text'),
+    ]
+
+    operations = [
+        # The single-column FTS table / trigram index is replaced below
+        migrations.RunPython(drop_single_column_index, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='idcard',
+            name='search_address',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='idcard',
+            name='search_mobile',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='idcard',
+            name='search_name',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        # search_text now skips image fields, so every column is recomputed
+        migrations.RunPython(populate_search_document, migrations.RunPython.noop),
+        migrations.RunPython(install_search_index, drop_search_index),
+    ]
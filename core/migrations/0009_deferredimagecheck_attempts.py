@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_idcard_search_categories'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deferredimagecheck',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Checks that failed to read the photo from storage'),
+        ),
+        migrations.AddField(
+            model_name='deferredimagecheck',
+            name='last_error',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
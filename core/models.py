@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.utils import timezone
 import uuid
 import random
 import string
@@ -48,6 +50,49 @@ def generate_unique_suffix():
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
 
 
+# Global search filters: a field belongs to a category when its name contains one of these
+SEARCH_FIELD_CATEGORIES = {
+    'name': ('NAME',),
+    'address': ('ADDRESS',),
+    'mobile': ('MOBILE', 'PHONE', 'MOB'),
+}
+
+
+def build_search_document(field_data, table_fields=None):
+    """
+    Normalized text that card search runs against, one entry per IDCard
+    search column: `search_text` holds every text value, `search_<category>`
+    only the values of that category's fields. Values are uppercased, one
+    per line (a query never contains a newline, so matches can't span two
+    values). Image fields (by type in table_fields) are left out.
+    """
+    from .services.base import BaseService
+    
+    image_fields = {
+        field.get('name') for field in (table_fields or [])
+        if field.get('type') in BaseService.IMAGE_FIELD_TYPES
+    }
+    document = {'search_text': []}
+    document.update({f'search_{category}': [] for category in SEARCH_FIELD_CATEGORIES})
+    
+    for field_name, value in (field_data or {}).items():
+        if not value or field_name in image_fields:
+            continue
+        text = str(value).upper()
+        document['search_text'].append(text)
+        name_upper = field_name.upper()
+        for category, keywords in SEARCH_FIELD_CATEGORIES.items():
+            if any(keyword in name_upper for keyword in keywords):
+                document[f'search_{category}'].append(text)
+    
+    return {column: '\n'.join(values) for column, values in document.items()}
+
+
+def build_search_text(field_data, table_fields=None):
+    """IDCard.search_text for field_data (see build_search_document)"""
+    return build_search_document(field_data, table_fields)['search_text']
+
+
 class User(AbstractUser):
     """
     Custom user model with role support
@@ -228,6 +273,9 @@ class Client(models.Model):
         if not self.image_folder_code:
             return
         
+        # Forget the deduplicated images stored in this folder
+        StoredImage.objects.filter(folder=f"adarshimg/{self.image_folder_code}").delete()
+        
         folder_path = os.path.join(settings.MEDIA_ROOT, f"adarshimg/{self.image_folder_code}")
         if os.path.exists(folder_path):
             try:
@@ -403,7 +451,8 @@ class IDCard(models.Model):
         ('reprint', 'Reprint'),
     ]
     
-    table = models.ForeignKey(IDCardTable, on_delete=models.CASCADE, related_name='id_cards')
+    # Indexed through the (table, id) composite index below
+    table = models.ForeignKey(IDCardTable, on_delete=models.CASCADE, related_name='id_cards', db_index=False)
     # Dynamic field data stored as JSON (based on table's field configuration)
     field_data = models.JSONField(default=dict, help_text='Dynamic field values based on table fields')
     # Common fields
@@ -411,6 +460,11 @@ class IDCard(models.Model):
     # Original photo name from Excel (for matching during image reupload)
     original_photo_name = models.CharField(max_length=255, blank=True, null=True, help_text='Original photo name from Excel for matching')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    # Derived from field_data on save (see build_search_document); indexed for search
+    search_text = models.TextField(blank=True, default='', editable=False)
+    search_name = models.TextField(blank=True, default='', editable=False)
+    search_address = models.TextField(blank=True, default='', editable=False)
+    search_mobile = models.TextField(blank=True, default='', editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -429,22 +483,25 @@ class IDCard(models.Model):
         """Get the client this card belongs to via table -> group"""
         return self.table.group.client
     
+    @staticmethod
+    def image_paths(field_data):
+        """Stored image paths referenced by a card's field_data"""
+        for value in (field_data or {}).values():
+            if value and isinstance(value, str) and value not in ['NOT_FOUND', '']:
+                # Check if it looks like an image path
+                if 'adarshimg/' in value or 'id_card_images/' in value:
+                    yield value
+    
     def delete_images(self):
         """Delete all image files associated with this card"""
         from django.core.files.storage import default_storage
+        from .services.image_service import ImageService
         
-        # Delete images from field_data
-        if self.field_data:
-            for field_name, value in self.field_data.items():
-                if value and isinstance(value, str) and value not in ['NOT_FOUND', '']:
-                    # Check if it looks like an image path
-                    if 'adarshimg/' in value or 'id_card_images/' in value:
-                        try:
-                            if default_storage.exists(value):
-                                default_storage.delete(value)
-                                print(f"Deleted image: {value}")
-                        except Exception as e:
-                            print(f"Warning: Could not delete image {value}: {e}")
+        # Release images from field_data (shared copies are kept while other cards use them)
+        for value in self.image_paths(self.field_data):
+            result = ImageService.delete_image(value)
+            if not result.success:
+                print(f"Warning: Could not delete image {value}: {result.message}")
         
         # Delete legacy photo field if exists
         if self.photo:
@@ -455,13 +512,219 @@ class IDCard(models.Model):
             except Exception as e:
                 print(f"Warning: Could not delete photo: {e}")
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can move the table counter
+        instance._saved_status = instance.__dict__.get('status')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # Saves limited to other columns (e.g. status) keep the search
+        # document as is - and don't need the table loaded
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'field_data' in update_fields:
+            document = build_search_document(self.field_data, self.table.fields)
+            for column, text in document.items():
+                setattr(self, column, text)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *document}
+        
+        adding = self._state.adding
+        old_status = getattr(self, '_saved_status', None)
+        
+        if not adding and (old_status is None or old_status == self.status):
+            super().save(*args, **kwargs)
+            return
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                TableStatusCounter.adjust(self.table_id, {self.status: 1})
+            else:
+                TableStatusCounter.adjust(self.table_id, {old_status: -1, self.status: 1})
+        self._saved_status = self.status
+    
     def delete(self, *args, **kwargs):
         # Delete images before deleting card
         self.delete_images()
-        super().delete(*args, **kwargs)
+        status = getattr(self, '_saved_status', None) or self.status
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            TableStatusCounter.adjust(self.table_id, {status: -1})
+        return result
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Card listings, exports and Select All: WHERE table_id = ? [AND status = ?] ORDER BY id
+            models.Index(fields=['table', 'id'], name='idcard_table_id_idx'),
+            models.Index(fields=['table', 'status', 'id'], name='idcard_table_status_id_idx'),
+        ]
+
+
+class TableStatusCounter(models.Model):
+    """
+    Denormalized card counts per status for one table, so status badges cost
+    a primary-key lookup instead of a COUNT/GROUP BY over IDCard.
+    
+    Kept in sync by IDCard.save()/delete() and by the bulk paths (bulk status
+    change, bulk delete, bulk_create imports). `rebuild_status_counters`
+    recomputes them from IDCard if they ever drift.
+    """
+    STATUSES = [status for status, _ in IDCard.STATUS_CHOICES]
+    
+    table = models.OneToOneField(IDCardTable, on_delete=models.CASCADE, primary_key=True, related_name='status_counter')
+    pending = models.IntegerField(default=0)
+    verified = models.IntegerField(default=0)
+    pool = models.IntegerField(default=0)
+    approved = models.IntegerField(default=0)
+    download = models.IntegerField(default=0)
+    reprint = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.table.name}: {self.as_dict()}"
+    
+    def as_dict(self):
+        """Counts by status plus 'total'"""
+        counts = {status: getattr(self, status) for status in self.STATUSES}
+        counts['total'] = sum(counts.values())
+        return counts
+    
+    @classmethod
+    def adjust(cls, table_id, deltas):
+        """
+        Apply {status: +/-n} changes for a table. Call it after the cards
+        were written (ideally in the same transaction); a missing counter
+        row is rebuilt from IDCard, which already includes the change.
+        """
+        deltas = {status: n for status, n in deltas.items() if n and status in cls.STATUSES}
+        if not deltas:
+            return
+        
+        updated = cls.objects.filter(table_id=table_id).update(
+            updated_at=timezone.now(),
+            **{status: F(status) + n for status, n in deltas.items()}
+        )
+        if not updated:
+            cls.rebuild(table_id)
+        
+        from .services.stats_service import StatsService
+        transaction.on_commit(lambda: StatsService.apply_card_deltas(deltas))
+    
+    @classmethod
+    def rebuild(cls, table_id):
+        """Recompute a table's counter from IDCard (one GROUP BY)"""
+        counts = {status: 0 for status in cls.STATUSES}
+        rows = IDCard.objects.filter(table_id=table_id).order_by().values('status').annotate(n=Count('id'))
+        for row in rows:
+            if row['status'] in counts:
+                counts[row['status']] = row['n']
+        
+        counter, _ = cls.objects.update_or_create(table_id=table_id, defaults=counts)
+        
+        from .services.stats_service import StatsService
+        transaction.on_commit(StatsService.invalidate)
+        return counter
+    
+    @classmethod
+    def counts_for(cls, table_id):
+        """Status counts for a table, building the counter on first use"""
+        counter = cls.objects.filter(table_id=table_id).first() or cls.rebuild(table_id)
+        return counter.as_dict()
+
+
+class ImportJob(models.Model):
+    """
+    Background bulk upload job - queued by the upload API and processed
+    by the `run_import_worker` management command
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    table = models.ForeignKey(IDCardTable, on_delete=models.CASCADE, related_name='import_jobs')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+
+    # Uploaded source files (storage paths, removed once the job finishes)
+    data_file = models.CharField(max_length=500)
+    original_file_name = models.CharField(max_length=255)
+    zip_files = models.JSONField(default=dict, help_text='Photo ZIP storage paths by image field: {field_name: path}')
+
+    # Progress counters (updated while the job runs)
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    rows_processed = models.PositiveIntegerField(default=0)
+    cards_created = models.PositiveIntegerField(default=0)
+    photos_matched = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, help_text='First row errors reported by the importer')
+    matched_fields = models.JSONField(default=list)
+    message = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Import #{self.id} - {self.table.name} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+
+class StoredImage(models.Model):
+    """
+    Content-addressed index of card images: one file per distinct image
+    (SHA-256 of the stored bytes) per client folder, shared by reference count.
+    The file keeps the path it was first saved under, so field_data values
+    never change when a copy is reused.
+    """
+    folder = models.CharField(max_length=255, help_text='Client image folder, e.g. adarshimg/ABCDE12345')
+    sha256 = models.CharField(max_length=64)
+    path = models.CharField(max_length=500, unique=True)
+    size = models.PositiveIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.path} (x{self.ref_count})"
+
+    class Meta:
+        unique_together = ['folder', 'sha256']
+
+
+class DeferredImageCheck(models.Model):
+    """
+    Photo accepted by the fast (header-only) validation during a bulk upload.
+    The import worker fully decodes it later and resets broken photos to
+    PENDING:<reference> so they can be re-uploaded.
+    """
+    table = models.ForeignKey(IDCardTable, on_delete=models.CASCADE, related_name='deferred_image_checks')
+    field_name = models.CharField(max_length=100)
+    image_path = models.CharField(max_length=500)
+    reference = models.CharField(max_length=255, blank=True, default='', help_text='Photo reference from the upload sheet')
+    attempts = models.PositiveSmallIntegerField(default=0, help_text='Checks that failed to read the photo from storage')
+    last_error = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.image_path} ({self.field_name})"
+
+    class Meta:
+        ordering = ['id']
 
 
 class WebsiteSettings(models.Model):
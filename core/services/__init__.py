@@ -15,6 +15,8 @@
 #     image_service.py     - Image upload, processing, filename generation
 #     export_service.py    - DOCX, XLSX, ZIP export operations
 #     import_service.py    - Bulk upload from Excel/CSV with photos
+#     search_service.py    - Card search index (trigram / FTS5)
+#     stats_service.py     - Cached dashboard statistics
 #     permission_service.py - Permission checking utilities
 # =============================================================================
 
@@ -25,18 +27,24 @@ from .staff_service import StaffService
 from .idcard_service import IDCardService
 from .export_service import ExportService
 from .import_service import ImportService
+from .search_service import SearchService
+from .stats_service import StatsService
 from .permission_service import PermissionService
-from .base import StreamingZipIndex
+from .base import StreamingZipIndex, StreamingSheetReader, BulkCardWriter
 
 __all__ = [
     'ServiceResult',
     'BaseService',
     'StreamingZipIndex',
+    'StreamingSheetReader',
+    'BulkCardWriter',
     'ImageService',
     'ClientService',
     'StaffService',
     'IDCardService',
     'ExportService',
     'ImportService',
+    'SearchService',
+    'StatsService',
     'PermissionService',
 ]
@@ -4,7 +4,16 @@ Contains: ServiceResult dataclass, BaseService class, common utilities
 """
 from dataclasses import dataclass, field
 from typing import Any, Optional, Dict, List, Union
+import os
 import re
+import shutil
+import tempfile
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+
+from ..models import IDCard, TableStatusCounter, build_search_document
 
 
 @dataclass
@@ -339,51 +348,128 @@ class StreamingZipIndex:
                 image_bytes = photo_info['bytes']
     
     This is preferred over loading entire ZIP into memory for large uploads.
+    
+    When an image_pool is given and the archive is on disk, photos queued
+    with prefetch() (the references of the next sheet rows) are validated,
+    re-encoded (ingest policy) and thumbnailed in the pool, at most
+    ImageService.POOL_WINDOW at a time; get_photo() then only collects the
+    finished result for the row. Members no row references are never read.
     """
     
     VALID_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
     
-    def __init__(self, zip_file):
+    def __init__(self, zip_file, image_pool=None):
         """
         Initialize with a file-like object or path.
         
         Args:
             zip_file: Django uploaded file, file-like object, or path string
+            image_pool: Optional ProcessPoolExecutor (see ImageService.get_image_pool)
         """
-        import zipfile
-        from io import BytesIO
-        
         self._zip_file = zip_file
         self._zf = None
         self._index = {}  # normalized_key -> zip_info
         self._raw_index = {}  # normalized_key -> {ext, original_name, zip_filename}
+        self._zip_path = None  # Set when the archive is a file on disk
+        self._image_pool = image_pool
+        self._pending = {}  # zip_filename -> Future from the image pool
+        self._unsubmitted = deque()  # Prefetched zip_filenames not yet handed to the pool
+        self._queued = set()  # Same names as _unsubmitted, for lookups
+        self._collected = set()  # zip_filenames already returned by get_photo
+        self._ingest_policy = None
+        # Header-only validation; the full decode is deferred (settings.IMAGE_FAST_VALIDATION)
+        self.fast_validation = getattr(settings, 'IMAGE_FAST_VALIDATION', False)
         
     def __enter__(self):
         import zipfile
-        from io import BytesIO
         
-        # Handle different input types
-        if hasattr(self._zip_file, 'read'):
-            # File-like object - need to read into BytesIO for ZipFile
-            content = self._zip_file.read()
-            self._zf = zipfile.ZipFile(BytesIO(content), 'r')
+        # Handle different input types. The archive is never read as a whole:
+        # ZipFile only parses the central directory and seeks to a member
+        # when it is actually requested.
+        if hasattr(self._zip_file, 'temporary_file_path'):
+            # Large Django upload already spooled to disk - open the temp file directly
+            self._zip_path = self._zip_file.temporary_file_path()
+            self._zf = zipfile.ZipFile(self._zip_path, 'r')
+        elif hasattr(self._zip_file, 'read'):
+            # Seekable file-like object (in-memory upload, open file)
+            if hasattr(self._zip_file, 'seek'):
+                self._zip_file.seek(0)
+            self._zf = zipfile.ZipFile(self._zip_file, 'r')
+            # Files opened from disk (e.g. default_storage.open) can be shared with the pool
+            name = getattr(self._zip_file, 'name', None)
+            if isinstance(name, str) and os.path.isabs(name) and os.path.isfile(name):
+                self._zip_path = name
         else:
             # Assume path string
+            self._zip_path = str(self._zip_file)
             self._zf = zipfile.ZipFile(self._zip_file, 'r')
         
         # Build lightweight index (just filenames, no content extraction)
         self._build_index()
+        
+        from ..services.image_service import ImageService
+        self._ingest_policy = ImageService.get_ingest_policy()
+        
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
+        # Drop work for photos no row asked for
+        for future in self._pending.values():
+            future.cancel()
+        self._pending = {}
+        self._unsubmitted.clear()
+        self._queued.clear()
         if self._zf:
             self._zf.close()
         return False
     
+    def prefetch(self, key: str):
+        """
+        Queue a photo for the image pool ahead of the row that will ask for
+        it. No-op without a pool (or for in-memory ZIPs) and for unknown keys.
+        """
+        from ..services.image_service import ImageService
+        
+        if self._image_pool is None or not self._zip_path:
+            return
+        normalized = BaseService.normalize_image_identifier(key) if key else None
+        if not normalized or normalized not in self._index:
+            return
+        name = self._index[normalized].filename
+        if name in self._collected or name in self._pending or name in self._queued:
+            return
+        self._queued.add(name)
+        self._unsubmitted.append(name)
+        if len(self._unsubmitted) >= ImageService.POOL_CHUNK_SIZE:
+            self._submit_more()
+    
+    def _submit_more(self, flush: bool = False):
+        """
+        Keep up to POOL_WINDOW prefetched photos queued in the image pool.
+        Only full chunks are sent unless flush is set.
+        """
+        from ..services.image_service import ImageService
+        
+        while self._unsubmitted and len(self._pending) < ImageService.POOL_WINDOW:
+            if not flush and len(self._unsubmitted) < ImageService.POOL_CHUNK_SIZE:
+                break
+            chunk = []
+            while self._unsubmitted and len(chunk) < ImageService.POOL_CHUNK_SIZE:
+                name = self._unsubmitted.popleft()
+                self._queued.discard(name)
+                if name not in self._collected:
+                    chunk.append(name)
+            if chunk:
+                self._pending.update(ImageService.submit_zip_members(
+                    self._image_pool,
+                    self._zip_path,
+                    chunk,
+                    fast=self.fast_validation,
+                    ingest_policy=self._ingest_policy
+                ))
+    
     def _build_index(self):
         """Build the filename index without extracting content."""
-        import os
-        
         for zip_info in self._zf.infolist():
             if zip_info.is_dir():
                 continue
@@ -412,6 +498,9 @@ class StreamingZipIndex:
         normalized = BaseService.normalize_image_identifier(key) if key else None
         return normalized in self._index if normalized else False
     
+    def __len__(self) -> int:
+        return len(self._index)
+    
     def keys(self):
         """Get all normalized keys."""
         return self._index.keys()
@@ -425,7 +514,13 @@ class StreamingZipIndex:
             validate: Whether to validate the image bytes
             
         Returns:
-            Dict with {bytes, ext, original_name} or None if not found/invalid
+            Dict with {bytes, ext, original_name, thumb_bytes, export_bytes,
+            needs_full_check}
+            or None if not found/invalid. When validated, bytes/ext are the
+            photo after the ingest policy (see ImageService.apply_ingest_policy).
+            thumb_bytes / export_bytes are None when validate=False or they
+            could not be built. needs_full_check is True when only the fast header
+            check ran.
         """
         from ..services.image_service import ImageService
         
@@ -437,17 +532,48 @@ class StreamingZipIndex:
         raw_info = self._raw_index[normalized]
         
         try:
-            image_bytes = self._zf.read(zip_info.filename)
+            thumb_bytes = None
+            export_bytes = None
+            inspection = None
+            
+            ext = raw_info['ext']
+            
+            # Collect the result from the image pool if this member was queued
+            if zip_info.filename in self._queued:
+                self._submit_more(flush=True)  # Send the last partial chunk
+            self._collected.add(zip_info.filename)
+            future = self._pending.pop(zip_info.filename, None)
+            if future is not None:
+                if validate:
+                    try:
+                        inspection = future.result().pop(zip_info.filename)
+                    except Exception:
+                        inspection = None  # Pool failed - fall back to inline processing
+                self._submit_more()
             
+            image_bytes = None
             if validate:
-                is_valid, error_msg = ImageService.validate_image_bytes(image_bytes)
+                if inspection is None:
+                    image_bytes = self._zf.read(zip_info)
+                    inspection = ImageService.inspect_image(
+                        image_bytes, fast=self.fast_validation, ingest_policy=self._ingest_policy
+                    )
+                is_valid, error_msg, thumb_bytes, stored, export_bytes = inspection
                 if not is_valid:
                     return None
+                if stored:
+                    image_bytes, ext = stored
+            
+            if image_bytes is None:
+                image_bytes = self._zf.read(zip_info)
             
             return {
                 'bytes': image_bytes,
-                'ext': raw_info['ext'],
-                'original_name': raw_info['original_name']
+                'ext': ext,
+                'original_name': raw_info['original_name'],
+                'thumb_bytes': thumb_bytes,
+                'export_bytes': export_bytes,
+                'needs_full_check': validate and self.fast_validation
             }
         except Exception:
             return None
@@ -463,3 +589,205 @@ class StreamingZipIndex:
         if not normalized or normalized not in self._raw_index:
             return None
         return self._raw_index[normalized].copy()
+
+
+class StreamingSheetReader:
+    """
+    Reads the first sheet of an Excel upload (.xlsx or .xls) row by row.
+    
+    XLSX files are opened with openpyxl in read_only/data_only mode, so rows
+    are parsed lazily from the sheet XML instead of building the full cell
+    graph. XLS files are opened from disk with xlrd on_demand (memory-mapped,
+    only the first sheet is loaded); file-like sources are spooled to a
+    temporary file first.
+    
+    Usage:
+        with StreamingSheetReader(uploaded_file) as sheet:
+            headers = sheet.headers
+            for row in sheet.rows():   # tuples of cell values, header excluded
+                ...
+    """
+    
+    def __init__(self, data_file):
+        """
+        Args:
+            data_file: Django uploaded file, file-like object, or path string
+        """
+        self._data_file = data_file
+        self._wb = None
+        self._ws = None
+        self._spooled_path = None
+        self.is_xls = False
+        self.headers = []
+        self.row_count = None  # Data rows declared by the file (estimate, may be None)
+    
+    def __enter__(self):
+        source = self._data_file
+        if hasattr(source, 'temporary_file_path'):
+            # Large Django upload already spooled to disk
+            source = source.temporary_file_path()
+        
+        # Detect the real format from magic bytes (extensions are often wrong)
+        if hasattr(source, 'read'):
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            magic_bytes = source.read(4)
+            if hasattr(source, 'seek'):
+                source.seek(0)
+        else:
+            with open(source, 'rb') as f:
+                magic_bytes = f.read(4)
+        
+        if len(magic_bytes) < 4:
+            raise ValueError('File is too small or empty.')
+        
+        if magic_bytes[:2] == b'PK':
+            self._open_xlsx(source)
+        else:
+            self.is_xls = True
+            self._open_xls(source)
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+    
+    def _open_xlsx(self, source):
+        import openpyxl
+        
+        self._wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        self._ws = self._wb.active
+        
+        declared_rows = self._ws.max_row
+        if declared_rows and declared_rows > 1:
+            self.row_count = declared_rows - 1
+        
+        # Some writers store a wrong <dimension>; don't let it truncate the rows
+        self._ws.reset_dimensions()
+        
+        header_row = next(self._ws.iter_rows(max_row=1, values_only=True), ())
+        self.headers = [str(value).strip() for value in header_row if value]
+    
+    def _open_xls(self, source):
+        import xlrd
+        
+        if hasattr(source, 'read'):
+            # Spool to disk in chunks so xlrd can map the file instead of
+            # holding the whole upload in memory
+            with tempfile.NamedTemporaryFile(suffix='.xls', delete=False) as spooled:
+                self._spooled_path = spooled.name
+                shutil.copyfileobj(source, spooled, 1024 * 1024)
+            source = self._spooled_path
+        self._wb = xlrd.open_workbook(source, on_demand=True)
+        self._ws = self._wb.sheet_by_index(0)
+        
+        self.row_count = max(self._ws.nrows - 1, 0)
+        if self._ws.nrows:
+            self.headers = [str(value).strip() for value in self._ws.row_values(0) if value]
+    
+    def rows(self):
+        """Yield data rows (after the header) as tuples of cell values"""
+        if self.is_xls:
+            for row_idx in range(1, self._ws.nrows):
+                yield tuple(self._ws.row_values(row_idx))
+        else:
+            yield from self._ws.iter_rows(min_row=2, values_only=True)
+    
+    def close(self):
+        if self._wb is not None:
+            if self.is_xls:
+                self._wb.release_resources()
+            else:
+                self._wb.close()
+            self._wb = None
+        if self._spooled_path:
+            try:
+                os.remove(self._spooled_path)
+            except OSError:
+                pass
+            self._spooled_path = None
+
+
+class BulkCardWriter:
+    """
+    Buffers new ID cards and inserts them with bulk_create in chunks.
+    
+    Each chunk is written in its own transaction, so a 20k-row import costs
+    a few dozen round trips instead of 20k autocommits. If a chunk fails,
+    its rows are retried one at a time so the error is reported against
+    the row that caused it.
+    
+    Usage:
+        errors = []
+        with BulkCardWriter(table, errors) as writer:
+            for row_num, field_data in rows:
+                writer.add(row_num, field_data)
+        cards_created = writer.created
+    """
+    
+    def __init__(self, table, errors: List[str], batch_size: int = None, status: str = 'pending'):
+        self.table = table
+        self.errors = errors
+        self.batch_size = max(1, batch_size or getattr(settings, 'IMPORT_BATCH_SIZE', 500))
+        self.status = status
+        self.created = 0
+        self._pending = []  # [(row_num, IDCard)]
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Only write the remaining rows when the import finished normally
+        if exc_type is None:
+            self.flush()
+        else:
+            pending, self._pending = self._pending, []
+            for _, card in pending:
+                self._release_images(card)
+        return False
+    
+    @staticmethod
+    def _release_images(card):
+        """Drop the image references of a card that was never written"""
+        from .image_service import ImageService
+        ImageService.delete_images(IDCard.image_paths(card.field_data))
+    
+    @property
+    def queued(self) -> int:
+        """Cards created so far plus cards waiting in the buffer"""
+        return self.created + len(self._pending)
+    
+    def add(self, row_num: int, field_data: dict):
+        """Queue a card; writes the chunk once batch_size rows are buffered"""
+        self._pending.append((row_num, IDCard(
+            table=self.table, field_data=field_data, status=self.status,
+            **build_search_document(field_data, self.table.fields)
+        )))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        """Write all buffered cards"""
+        if not self._pending:
+            return
+        
+        pending, self._pending = self._pending, []
+        try:
+            with transaction.atomic():
+                IDCard.objects.bulk_create([card for _, card in pending])
+                TableStatusCounter.adjust(self.table.id, {self.status: len(pending)})
+            self.created += len(pending)
+        except Exception:
+            # Retry row by row so the failing rows can be reported
+            for row_num, card in pending:
+                # bulk_create marks the cards as saved even when it rolls
+                # back; reset that so save() inserts them and counts them
+                card.pk = None
+                card._state.adding = True
+                try:
+                    with transaction.atomic():
+                        card.save(force_insert=True)
+                    self.created += 1
+                except Exception as e:
+                    self.errors.append(f'Row {row_num}: {str(e)}')
+                    self._release_images(card)
@@ -4,17 +4,30 @@ Contains: DOCX, XLSX, and ZIP export operations for ID Cards
 """
 import os
 import base64
+import logging
 import re
+import shutil
+import tempfile
+import time
+import zipfile
+from copy import deepcopy
 from io import BytesIO
+from itertools import chain
 from datetime import datetime
 from typing import Dict, Any, List, Optional
+from xml.sax.saxutils import escape as xml_escape
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.core.files.storage import default_storage
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 
 from ..models import IDCardTable, IDCard
 from .base import BaseService, ServiceResult
+from .idcard_service import IDCardService
+from .image_service import ImageService
+
+logger = logging.getLogger(__name__)
 
 
 class ExportService(BaseService):
@@ -24,110 +37,137 @@ class ExportService(BaseService):
     Supported formats:
     - DOCX: Word document with images and table layout
     - XLSX: Excel spreadsheet (text fields only)
-    - ZIP: Images organized by field name
+    - ZIP: Images organized by field name (base64 JSON or streamed)
     """
     
     ENTRIES_PER_PAGE = 7  # Cards per page in DOCX
+    STREAM_COPY_CHUNK = 64 * 1024  # Bytes copied per read when streaming images
+    
+    # Formats that are already compressed - deflating them again costs CPU
+    # for a ~1% size gain, so image ZIPs store them as is
+    PRECOMPRESSED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+    
+    @staticmethod
+    def store_compressed_default() -> bool:
+        """Whether image ZIPs store JPEG/PNG/WebP without recompressing"""
+        return getattr(settings, 'EXPORT_ZIP_STORE_COMPRESSED', True)
+    
+    @staticmethod
+    def docx_stream_min_cards() -> int:
+        """DOCX exports of at least this many cards are streamed (0 = never)"""
+        return getattr(settings, 'EXPORT_DOCX_STREAM_MIN_CARDS', 1000)
+    
+    @classmethod
+    def zip_compress_type(cls, filename: str, store_compressed: bool = True) -> int:
+        """ZIP_STORED for already-compressed images, ZIP_DEFLATED for anything else"""
+        if store_compressed and os.path.splitext(filename)[1].lower() in cls.PRECOMPRESSED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+    
+    # ==================== XLSX EXPORT ====================
+    
+    XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    # Besides IMAGE_FIELD_TYPES, columns with these names are left out of Excel exports
+    XLSX_IMAGE_FIELD_NAMES = (
+        'PHOTO', 'SIGNATURE', 'IMAGE', 'PIC', 'PICTURE', 'SIGN', 'MOTHER PHOTO', 'FATHER PHOTO',
+        'M PHOTO', 'F PHOTO', 'BARCODE', 'QR CODE', 'QR',
+    )
+    XLSX_HEADER_STYLE = 'Card Header'
+    XLSX_DATA_STYLE = 'Card Data'
     
     @classmethod
     def export_xlsx(
         cls, 
         table_id: int, 
-        card_ids: List[int]
+        card_ids: Optional[List[int]] = None,
+        selection: Optional[Dict[str, Any]] = None
     ) -> ServiceResult:
         """
-        Export selected cards as Excel file.
+        Export selected cards as Excel file: text fields only, auto-sized
+        columns, frozen header row.
+        
+        The workbook is write-only: rows go to a temporary file as they are
+        read from the database, every cell uses one of two named styles and
+        the column widths come from a pre-pass over the values, so memory
+        stays flat however many cards are exported.
+        
+        Args:
+            selection: Selection handle used instead of card_ids
+                (see IDCardService.select_cards)
         
         Returns:
-            ServiceResult with 'response' key containing HttpResponse
+            ServiceResult with 'response' key containing FileResponse
         """
         try:
-            import openpyxl
             from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, Border, Side
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
             from openpyxl.utils import get_column_letter
             
             table = get_object_or_404(IDCardTable, id=table_id)
             
-            if not card_ids:
+            if not card_ids and not selection:
                 return ServiceResult(success=False, message='No cards selected!')
             
-            cards = IDCard.objects.filter(table=table, id__in=card_ids).order_by('id')
+            cards = IDCardService.select_cards(table, card_ids, selection).order_by('id')
             if not cards.exists():
                 return ServiceResult(success=False, message='No cards found!')
             
-            # Get text fields only
-            text_fields = cls.get_text_fields(table.fields or [])
-            
-            # Create workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = table.name[:31]
-            
-            # Styles
-            header_font = Font(name='Calibri', size=11, bold=True)
-            header_alignment = Alignment(horizontal='center', vertical='center')
-            data_font = Font(name='Calibri', size=10)
-            data_alignment = Alignment(horizontal='left', vertical='center')
-            thin_border = Border(
-                left=Side(style='thin', color='CCCCCC'),
-                right=Side(style='thin', color='CCCCCC'),
-                top=Side(style='thin', color='CCCCCC'),
-                bottom=Side(style='thin', color='CCCCCC')
-            )
-            
-            # Track column widths
-            column_widths = {}
+            headers = [f['name'] for f in cls.xlsx_text_fields(table.fields or [])]
+            field_data_rows = cards.values_list('field_data', flat=True)
+            column_widths = cls.xlsx_column_widths(headers, field_data_rows.iterator(chunk_size=2000))
             
-            # Header row
-            headers = [f['name'] for f in text_fields]
-            for col_idx, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = thin_border
-                column_widths[col_idx] = len(str(header)) + 2
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet(table.name[:31])  # Excel sheet names max 31 chars
             
-            # Data rows
-            for row_idx, card in enumerate(cards, 2):
-                field_data = card.field_data or {}
-                
-                for col_idx, field in enumerate(text_fields, 1):
-                    value = field_data.get(field['name'], '')
-                    value_str = str(value).upper() if value else ''
-                    
-                    cell = ws.cell(row=row_idx, column=col_idx, value=value_str)
-                    cell.font = data_font
-                    cell.alignment = data_alignment
-                    cell.border = thin_border
-                    
-                    # Track max width
-                    current_width = min(len(value_str) + 2, 50)
-                    column_widths[col_idx] = max(column_widths.get(col_idx, 8), current_width)
+            thin = Side(style='thin', color='CCCCCC')
+            border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            wb.add_named_style(NamedStyle(
+                name=cls.XLSX_HEADER_STYLE,
+                font=Font(name='Calibri', size=11, bold=True),
+                alignment=Alignment(horizontal='center', vertical='center'),
+                border=border,
+            ))
+            wb.add_named_style(NamedStyle(
+                name=cls.XLSX_DATA_STYLE,
+                font=Font(name='Calibri', size=10),
+                alignment=Alignment(horizontal='left', vertical='center', wrap_text=False),
+                border=border,
+            ))
             
-            # Apply column widths
-            for col_idx, width in column_widths.items():
-                col_letter = get_column_letter(col_idx)
-                ws.column_dimensions[col_letter].width = max(8, width * 1.1)
+            def styled_cell(value, style):
+                cell = WriteOnlyCell(ws, value)
+                cell.style = style
+                return cell
             
+            # Write-only sheets need column and row formatting before the first row
+            for col_idx, width in enumerate(column_widths, 1):
+                ws.column_dimensions[get_column_letter(col_idx)].width = max(8, width * 1.1)
             ws.row_dimensions[1].height = 25
             ws.freeze_panes = 'A2'
             
-            # Save to buffer
-            xlsx_buffer = BytesIO()
-            wb.save(xlsx_buffer)
-            xlsx_buffer.seek(0)
+            ws.append([styled_cell(header, cls.XLSX_HEADER_STYLE) for header in headers])
+            
+            # One cell per column, refilled for every card - appended rows
+            # are written out immediately
+            data_cells = [styled_cell(None, cls.XLSX_DATA_STYLE) for _ in headers]
+            for field_data in field_data_rows.iterator(chunk_size=2000):
+                field_data = field_data or {}
+                for cell, header in zip(data_cells, headers):
+                    value = field_data.get(header, '')
+                    cell.value = str(value).upper() if value else ''
+                ws.append(data_cells)
+            
+            xlsx_file = tempfile.TemporaryFile()
+            wb.save(xlsx_file)
+            xlsx_file.seek(0)
             
-            # Generate filename
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"{table.name}_{timestamp}.xlsx"
             
-            response = HttpResponse(
-                xlsx_buffer.getvalue(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+            # Streamed from the temporary file (Content-Length set from its size)
+            response = FileResponse(xlsx_file, content_type=cls.XLSX_CONTENT_TYPE)
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            response['Content-Length'] = len(xlsx_buffer.getvalue())
             
             return ServiceResult(
                 success=True,
@@ -142,20 +182,55 @@ class ExportService(BaseService):
         except Exception as e:
             return ServiceResult(success=False, message=str(e))
     
+    @classmethod
+    def xlsx_text_fields(cls, table_fields: List[dict]) -> List[dict]:
+        """Table fields exported to Excel (everything but image columns)"""
+        return [
+            f for f in table_fields
+            if f['name'].upper() not in cls.XLSX_IMAGE_FIELD_NAMES
+            and f.get('type', 'text') not in cls.IMAGE_FIELD_TYPES
+        ]
+    
+    @staticmethod
+    def xlsx_column_widths(headers: List[str], field_data_rows) -> List[int]:
+        """
+        Width (in characters, before padding) of each column: the header
+        plus 2, or the longest value plus 2 capped at 50.
+        
+        Args:
+            field_data_rows: Iterable of the cards' field_data (read once)
+        """
+        longest = [0] * len(headers)
+        for field_data in field_data_rows:
+            field_data = field_data or {}
+            for col_idx, header in enumerate(headers):
+                value = field_data.get(header, '')
+                if value:
+                    length = len(str(value).upper())
+                    if length > longest[col_idx]:
+                        longest[col_idx] = length
+        return [max(len(header) + 2, min(length + 2, 50)) for header, length in zip(headers, longest)]
+    
     @classmethod
     def export_images_zip(
         cls, 
         table_id: int, 
-        card_ids: List[int]
+        card_ids: List[int],
+        store_compressed: Optional[bool] = None
     ) -> ServiceResult:
         """
         Export images as separate ZIP files for each image column.
         
+        Args:
+            store_compressed: Store JPEG/PNG/WebP without deflating
+                (None = EXPORT_ZIP_STORE_COMPRESSED setting)
+        
         Returns:
             ServiceResult with 'zip_files' list (base64 encoded)
         """
         try:
-            import zipfile
+            if store_compressed is None:
+                store_compressed = cls.store_compressed_default()
             
             table = get_object_or_404(IDCardTable, id=table_id)
             
@@ -197,7 +272,10 @@ class ExportService(BaseService):
                                         
                                         if img_data and len(img_data) >= 100:
                                             download_filename = os.path.basename(img_path)
-                                            zf.writestr(download_filename, img_data)
+                                            zf.writestr(
+                                                download_filename, img_data,
+                                                compress_type=cls.zip_compress_type(download_filename, store_compressed)
+                                            )
                                             images_in_field += 1
                             except Exception:
                                 continue
@@ -239,6 +317,132 @@ class ExportService(BaseService):
         except Exception as e:
             return ServiceResult(success=False, message=str(e))
     
+    @classmethod
+    def stream_images_zip(
+        cls,
+        table_id: int,
+        card_ids: Optional[List[int]] = None,
+        store_compressed: Optional[bool] = None,
+        selection: Optional[Dict[str, Any]] = None
+    ) -> ServiceResult:
+        """
+        Export images as ONE streamed ZIP with a folder per image column.
+        
+        Entries are written while they are read from storage, so memory
+        stays flat and the first bytes reach the client immediately.
+        
+        Args:
+            table_id: Table to export
+            card_ids: Selected cards
+            store_compressed: Store JPEG/PNG/WebP without deflating
+                (None = EXPORT_ZIP_STORE_COMPRESSED setting)
+            selection: Selection handle used instead of card_ids
+                (see IDCardService.select_cards)
+        
+        Returns:
+            ServiceResult with 'response' key containing StreamingHttpResponse
+        """
+        try:
+            if store_compressed is None:
+                store_compressed = cls.store_compressed_default()
+            
+            table = get_object_or_404(IDCardTable, id=table_id)
+            
+            # A whole-table export needs an explicit (Select All) selection
+            if not selection and not card_ids:
+                return ServiceResult(success=False, message='No cards selected!')
+            cards = IDCardService.select_cards(table, card_ids, selection)
+            cards = cards.order_by('id').only('id', 'field_data')
+            
+            image_fields = cls.get_image_field_names(table.fields or [])
+            if not image_fields:
+                return ServiceResult(
+                    success=False,
+                    message='No image fields found in this table!'
+                )
+            
+            # Look for the first image up front so an empty export is still
+            # reported as an error instead of an empty ZIP
+            entries = cls._iter_image_entries(cards, image_fields)
+            first_entry = next(entries, None)
+            if first_entry is None:
+                return ServiceResult(
+                    success=False,
+                    message='No images found for selected cards!'
+                )
+            
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            zip_filename = f"{cls.clean_filename_for_export(table.name)}_IMAGES_{timestamp}.zip"
+            
+            response = StreamingHttpResponse(
+                cls.generate_zip_stream(chain([first_entry], entries), store_compressed),
+                content_type='application/zip'
+            )
+            response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
+            response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+            
+            return ServiceResult(
+                success=True,
+                data={'response': response}
+            )
+            
+        except Exception as e:
+            return ServiceResult(success=False, message=str(e))
+    
+    @classmethod
+    def _iter_image_entries(cls, cards, image_fields: List[str]):
+        """Yield (archive_name, storage_path) for every stored image of the cards"""
+        folders = {field: cls._get_readable_field_name(field) for field in image_fields}
+        seen = set()
+        
+        for card in cards.iterator(chunk_size=500):
+            field_data = card.field_data or {}
+            for img_field in image_fields:
+                img_path = field_data.get(img_field, '')
+                if not isinstance(img_path, str) or '/' not in img_path:
+                    continue  # Empty, NOT_FOUND or PENDING:<ref>
+                
+                archive_name = f"{folders[img_field]}/{os.path.basename(img_path)}"
+                if archive_name in seen:
+                    continue  # Identical image shared by several cards
+                
+                try:
+                    if default_storage.exists(img_path) and default_storage.size(img_path) >= 100:
+                        seen.add(archive_name)
+                        yield archive_name, img_path
+                except Exception:
+                    continue
+    
+    @classmethod
+    def generate_zip_stream(cls, entries, store_compressed: bool = True, storage=None):
+        """
+        Write ZIP entries one by one, yielding the bytes produced so far.
+        
+        Args:
+            entries: Iterable of (archive_name, storage_path)
+            store_compressed: Store JPEG/PNG/WebP without deflating
+            storage: Storage to read from (default_storage if None)
+        """
+        storage = storage or default_storage
+        stream = _ZipStreamBuffer()
+        
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for archive_name, img_path in entries:
+                zinfo = zipfile.ZipInfo(archive_name, date_time=time.localtime()[:6])
+                zinfo.compress_type = cls.zip_compress_type(archive_name, store_compressed)
+                zinfo.external_attr = 0o600 << 16
+                try:
+                    with storage.open(img_path, 'rb') as src:
+                        with zf.open(zinfo, 'w') as dest:
+                            shutil.copyfileobj(src, dest, cls.STREAM_COPY_CHUNK)
+                except Exception as e:
+                    logger.warning("Error streaming image %s: %s", img_path, e)
+                    continue
+                yield stream.drain()
+        
+        # Central directory
+        yield stream.drain()
+    
     @staticmethod
     def _get_readable_field_name(field_name: str) -> str:
         """Convert field name to readable format for filename"""
@@ -250,60 +454,970 @@ class ExportService(BaseService):
         }
         return mappings.get(name_upper, name_upper.replace(' ', '_'))
     
+    # ==================== DOCX EXPORT ====================
+    
+    DOCX_TABLE_WIDTH_CM = 27.5  # Usable width of landscape A4 with 1cm margins
+    DOCX_ROW_HEIGHT_CM = 2.5  # Data rows; images are the same height (no gap)
+    # Besides IMAGE_FIELD_TYPES, columns with these names are laid out as images
+    DOCX_IMAGE_FIELD_NAMES = ('PHOTO', 'SIGNATURE', 'IMAGE', 'PIC', 'PICTURE', 'SIGN')
+    DOCX_CONTENT_TYPES = {
+        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        # Same package under a .doc name - opens in Word 2007+ compatibility mode
+        'doc': 'application/msword',
+    }
+    
     @classmethod
     def export_docx(
-        cls, 
-        table_id: int, 
-        card_ids: List[int],
-        doc_format: str = 'docx'
+        cls,
+        table_id: int,
+        card_ids: Optional[List[int]] = None,
+        doc_format: str = 'docx',
+        selection: Optional[Dict[str, Any]] = None
     ) -> ServiceResult:
         """
-        Export selected cards as Word document.
+        Export selected cards as Word document: landscape A4, 7 cards per
+        page, text columns first and images on the right.
         
-        This is a complex operation - the full implementation is in the
-        original view. This provides a cleaner interface.
+        Exports of EXPORT_DOCX_STREAM_MIN_CARDS cards or more are streamed
+        (see generate_docx_stream) instead of built in memory.
+        
+        Args:
+            doc_format: 'docx' or 'doc'
+            selection: Selection handle used instead of card_ids
+                (see IDCardService.select_cards)
         
         Returns:
             ServiceResult with 'response' key containing HttpResponse
+            or StreamingHttpResponse
         """
-        # NOTE: The DOCX export is quite complex (300+ lines of formatting).
-        # For a full refactor, consider keeping this in a separate module
-        # or maintaining the current implementation for now.
-        # 
-        # Key points for refactoring:
-        # 1. Document setup (page orientation, margins)
-        # 2. Header/footer generation
-        # 3. Table creation with dynamic columns
-        # 4. Image embedding with proper sizing
-        # 5. Pagination (7 entries per page)
-        
         try:
-            from docx import Document
-            from docx.shared import Inches, Cm, Pt, RGBColor
-            from docx.enum.table import WD_TABLE_ALIGNMENT
-            from docx.enum.text import WD_ALIGN_PARAGRAPH
-            
             table = get_object_or_404(IDCardTable, id=table_id)
             
-            if not card_ids:
+            if not card_ids and not selection:
                 return ServiceResult(success=False, message='No cards selected!')
             
-            cards = IDCard.objects.filter(table=table, id__in=card_ids).order_by('id')
-            if not cards.exists():
+            # Database order (first uploaded = first shown)
+            cards = IDCardService.select_cards(table, card_ids, selection).order_by('id')
+            card_count = cards.count()
+            if not card_count:
                 return ServiceResult(success=False, message='No cards found!')
             
-            # For full implementation, call the original view function
-            # or implement the full DOCX generation here
+            extension = 'doc' if doc_format == 'doc' else 'docx'
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f"{table.name}_{timestamp}.{extension}"
+            
+            stream_min_cards = cls.docx_stream_min_cards()
+            if stream_min_cards and card_count >= stream_min_cards:
+                import docx  # noqa: F401 - report a missing library before the stream starts
+                
+                response = StreamingHttpResponse(
+                    cls.generate_docx_stream(table, cards),
+                    content_type=cls.DOCX_CONTENT_TYPES[extension]
+                )
+                response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+            else:
+                doc_buffer = BytesIO()
+                cls.build_docx(table, list(cards)).save(doc_buffer)
+                content = doc_buffer.getvalue()
+                
+                response = HttpResponse(content, content_type=cls.DOCX_CONTENT_TYPES[extension])
+                response['Content-Length'] = len(content)
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
             
             return ServiceResult(
-                success=False,
-                message='DOCX export requires full implementation - use original view'
+                success=True,
+                data={'response': response}
             )
             
         except ImportError:
             return ServiceResult(
                 success=False,
-                message='python-docx library not installed. Run: pip install python-docx'
+                message='python-docx or Pillow library not installed. Run: pip install python-docx Pillow'
             )
         except Exception as e:
             return ServiceResult(success=False, message=str(e))
+    
+    @classmethod
+    def build_docx(cls, table: IDCardTable, cards: List[IDCard], renditions=None):
+        """
+        Build the export Document for cards (in the given order).
+        
+        Args:
+            renditions: Callable taking an iterable of photo paths and
+                yielding (path, bytes or exception) in the same order
+                (default: ImageService.iter_export_renditions)
+        
+        Returns:
+            python-docx Document
+        """
+        from docx import Document
+        
+        ordered_fields = cls.docx_ordered_fields(table.fields or [])
+        institution_name = table.group.client.name if table.group and table.group.client else "Institution"
+        
+        document = Document()
+        column_widths = cls.docx_column_widths(ordered_fields, (card.field_data or {} for card in cards))
+        writer = _DocxCardWriter(document, ordered_fields, column_widths)
+        writer.write_page_setup(institution_name, table.name)
+        
+        image_fields = [field['name'] for field in ordered_fields if field['is_image']]
+        
+        def image_paths():
+            for card in cards:
+                field_data = card.field_data or {}
+                for field_name in image_fields:
+                    img_path = field_data.get(field_name, '')
+                    if _DocxCardWriter.has_image(img_path):
+                        yield img_path
+        
+        # Photos are prepared in the export pool ahead of the writer below,
+        # in the same order the image cells are filled
+        writer.write_cards(cards, (renditions or ImageService.iter_export_renditions)(image_paths()))
+        return document
+    
+    @classmethod
+    def generate_docx_stream(cls, table: IDCardTable, cards, renditions=None):
+        """
+        Write the same document as build_docx as a streamed ZIP package,
+        yielding the bytes produced so far.
+        
+        Nothing holds the whole document: a first pass over the cards sizes
+        the columns and lists the photos, the photos are written to the
+        package as they are prepared, then document.xml is written one page
+        at a time in a second pass.
+        
+        Args:
+            cards: Queryset of the cards, in export order
+            renditions: As in build_docx
+        """
+        ordered_fields = cls.docx_ordered_fields(table.fields or [])
+        image_fields = [field['name'] for field in ordered_fields if field['is_image']]
+        institution_name = table.group.client.name if table.group and table.group.client else "Institution"
+        
+        image_paths = {}  # Distinct photos in first-use order
+        
+        def field_data_rows():
+            for field_data in cards.values_list('field_data', flat=True).iterator(chunk_size=2000):
+                field_data = field_data or {}
+                for field_name in image_fields:
+                    img_path = field_data.get(field_name, '')
+                    if _DocxCardWriter.has_image(img_path):
+                        image_paths[img_path] = None
+                yield field_data
+        
+        column_widths = cls.docx_column_widths(ordered_fields, field_data_rows())
+        writer = _DocxStreamWriter(ordered_fields, column_widths, institution_name, table.name)
+        store_compressed = cls.store_compressed_default()
+        stream = _ZipStreamBuffer()
+        
+        def entry(name, compress_type=zipfile.ZIP_DEFLATED):
+            zinfo = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            zinfo.compress_type = compress_type
+            zinfo.external_attr = 0o600 << 16
+            return zinfo
+        
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name, blob in writer.package_entries():
+                zf.writestr(entry(name), blob)
+            yield stream.drain()
+            
+            for img_path, rendition in (renditions or ImageService.iter_export_renditions)(iter(image_paths)):
+                media = writer.add_image(img_path, rendition)
+                if media:
+                    name, blob = media
+                    zf.writestr(entry(name, cls.zip_compress_type(name, store_compressed)), blob)
+                    yield stream.drain()
+            image_paths.clear()
+            
+            zf.writestr(entry(writer.DOCUMENT_RELS), writer.document_rels())
+            with zf.open(entry(writer.DOCUMENT), 'w') as dest:
+                for xml in writer.document_xml(cards.only('id', 'field_data').iterator(chunk_size=500)):
+                    dest.write(xml.encode('utf-8'))
+                    data = stream.drain()
+                    if data:
+                        yield data
+        
+        # Central directory
+        yield stream.drain()
+    
+    @classmethod
+    def docx_ordered_fields(cls, table_fields: List[dict]) -> List[Dict[str, Any]]:
+        """Table fields as {name, type, is_image}: text fields first, image fields last"""
+        text_fields = []
+        image_fields = []
+        for f in table_fields:
+            field_type = f.get('type', 'text')
+            is_image = field_type in cls.IMAGE_FIELD_TYPES or f['name'].upper() in cls.DOCX_IMAGE_FIELD_NAMES
+            field_info = {'name': f['name'], 'type': field_type, 'is_image': is_image}
+            (image_fields if is_image else text_fields).append(field_info)
+        return text_fields + image_fields
+    
+    @classmethod
+    def docx_column_widths(cls, ordered_fields: List[Dict[str, Any]], field_data_rows) -> Dict[int, float]:
+        """
+        Column widths in cm (Sr No first), proportional to the longest value
+        of each text column; image columns get a fixed share.
+        
+        Args:
+            field_data_rows: Iterable of the cards' field_data (read once)
+        """
+        column_max_lengths = {0: 5}  # Sr No.
+        text_columns = []
+        for idx, field in enumerate(ordered_fields, 1):
+            if field['is_image']:
+                column_max_lengths[idx] = 12
+            else:
+                column_max_lengths[idx] = len(field['name'])  # Start with header length
+                text_columns.append((idx, field['name']))
+        
+        for field_data in field_data_rows:
+            for idx, field_name in text_columns:
+                length = len(str(field_data.get(field_name, '')))
+                if length > column_max_lengths[idx]:
+                    column_max_lengths[idx] = length
+        
+        for idx, _ in text_columns:
+            column_max_lengths[idx] = min(column_max_lengths[idx], 50)  # Cap very long text
+        
+        total_chars = sum(column_max_lengths.values())
+        return {
+            idx: max(1.5, min((chars / total_chars) * cls.DOCX_TABLE_WIDTH_CM, 8.0))
+            for idx, chars in column_max_lengths.items()
+        }
+
+
+class _DocxXml:
+    """
+    OOXML fragments parsed once per document.
+    
+    parse_xml() on every cell of every row was most of the writer's time;
+    each fragment is parsed on first use and later uses get a deep copy of
+    the parsed element. '{ns}' in a fragment stands for the w: namespace
+    declaration.
+    """
+    
+    def __init__(self):
+        from docx.oxml.ns import nsdecls
+        
+        self._ns = nsdecls('w')
+        self._parsed = {}
+    
+    def element(self, xml: str):
+        parsed = self._parsed.get(xml)
+        if parsed is None:
+            from docx.oxml import parse_xml
+            
+            parsed = self._parsed[xml] = parse_xml(xml.format(ns=self._ns))
+        return deepcopy(parsed)
+    
+    def cell_margins(self, top=0, bottom=0, left=28, right=28):
+        """Cell margins in twips (1/20 of a point). 28 twips ≈ 1px"""
+        return self.element(
+            '<w:tcMar {ns}>'
+            f'<w:top w:w="{top}" w:type="dxa"/>'
+            f'<w:bottom w:w="{bottom}" w:type="dxa"/>'
+            f'<w:left w:w="{left}" w:type="dxa"/>'
+            f'<w:right w:w="{right}" w:type="dxa"/>'
+            '</w:tcMar>'
+        )
+    
+    def vertical_alignment(self, align='center'):
+        """'top', 'center' or 'bottom'"""
+        return self.element(f'<w:vAlign {{ns}} w:val="{align}"/>')
+    
+    def spacing(self, before=0, after=0, line=240, rule='auto'):
+        """Paragraph spacing in twips"""
+        return self.element(
+            f'<w:spacing {{ns}} w:before="{before}" w:after="{after}" w:line="{line}" w:lineRule="{rule}"/>'
+        )
+    
+    def row_height(self, twips: int):
+        return self.element(f'<w:trHeight {{ns}} w:val="{twips}" w:hRule="exact"/>')
+    
+    def table_borders(self):
+        """All table borders 0.5pt (sz is in eighths of a point)"""
+        return self.element(
+            '<w:tblBorders {ns}>'
+            '<w:top w:val="single" w:sz="4" w:color="000000"/>'
+            '<w:left w:val="single" w:sz="4" w:color="000000"/>'
+            '<w:bottom w:val="single" w:sz="4" w:color="000000"/>'
+            '<w:right w:val="single" w:sz="4" w:color="000000"/>'
+            '<w:insideH w:val="single" w:sz="4" w:color="000000"/>'
+            '<w:insideV w:val="single" w:sz="4" w:color="000000"/>'
+            '</w:tblBorders>'
+        )
+    
+    def no_cell_borders(self):
+        return self.element(
+            '<w:tcBorders {ns}>'
+            '<w:top w:val="nil"/>'
+            '<w:left w:val="nil"/>'
+            '<w:bottom w:val="nil"/>'
+            '<w:right w:val="nil"/>'
+            '</w:tcBorders>'
+        )
+    
+    def right_tab(self, pos: int):
+        return self.element(f'<w:tabs {{ns}}><w:tab w:val="right" w:pos="{pos}"/></w:tabs>')
+
+
+class _DocxCardWriter:
+    """
+    Writes the card tables of a DOCX export.
+    
+    The page table (header row included), a data row and the label
+    paragraph for missing images are built once with python-docx and then
+    deep-copied, so a card costs a row copy plus its text and pictures.
+    """
+    
+    LABEL_COLOR = (150, 150, 150)  # [No Image] / [Error]
+    XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+    
+    def __init__(self, document, ordered_fields: List[Dict[str, Any]], column_widths: Dict[int, float]):
+        self.document = document
+        self.fields = ordered_fields
+        self.column_widths = column_widths
+        self.xml = _DocxXml()
+        self.pictures = _DocxPictures(document)
+        self._body = document.element.body
+        
+        # Remove default empty paragraph that Word creates
+        if document.paragraphs:
+            p = document.paragraphs[0]._element
+            p.getparent().remove(p)
+    
+    @staticmethod
+    def has_image(img_path) -> bool:
+        return bool(img_path and img_path != 'NOT_FOUND' and img_path.strip())
+    
+    # ---------- page layout ----------
+    
+    def write_page_setup(self, institution_name: str, table_name: str):
+        """Landscape A4, header (institute, table, date) and footer (note, page X of Y)"""
+        from docx.enum.section import WD_ORIENT
+        from docx.enum.table import WD_TABLE_ALIGNMENT
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+        from docx.shared import Cm, Pt, RGBColor
+        
+        section = self.document.sections[0]
+        # Swap width and height for landscape
+        new_width, new_height = section.page_height, section.page_width
+        section.page_width = new_width
+        section.page_height = new_height
+        section.orientation = WD_ORIENT.LANDSCAPE
+        
+        section.left_margin = Cm(1)
+        section.right_margin = Cm(1)
+        section.top_margin = Cm(0.8)
+        section.bottom_margin = Cm(0.3)  # Minimal gap between content and footer
+        
+        # Header/Footer distance from edge
+        section.header_distance = Cm(0.3)
+        section.footer_distance = Cm(1)
+        
+        # Header: INSTITUTE NAME | table name (date) | brand
+        header = section.header
+        header.is_linked_to_previous = False
+        
+        header_table = header.add_table(rows=1, cols=3, width=Cm(ExportService.DOCX_TABLE_WIDTH_CM))
+        header_table.autofit = False
+        header_table.alignment = WD_TABLE_ALIGNMENT.CENTER
+        header_cells = header_table.rows[0].cells
+        header_cells[0].width = Cm(9)
+        header_cells[1].width = Cm(11)
+        header_cells[2].width = Cm(7.5)
+        
+        current_date = datetime.now().strftime('%d-%m-%Y')
+        header_texts = (
+            (f'INSTITUTE NAME: {institution_name}', 10, WD_ALIGN_PARAGRAPH.LEFT),
+            (f'{table_name} ({current_date})', 11, WD_ALIGN_PARAGRAPH.CENTER),
+            ('ADARSH ID CARDS', 10, WD_ALIGN_PARAGRAPH.RIGHT),
+        )
+        for cell, (text, size, alignment) in zip(header_cells, header_texts):
+            para = cell.paragraphs[0]
+            run = para.add_run(text)
+            run.bold = True
+            run.font.name = 'Arial'
+            run.font.size = Pt(size)
+            run.font.color.rgb = RGBColor(0, 0, 0)
+            para.alignment = alignment
+            para._p.get_or_add_pPr().append(self.xml.spacing(0, 0, 240))
+        
+        # No borders, vertically centred, no top/bottom cell margins
+        for cell in header_cells:
+            tcPr = cell._tc.get_or_add_tcPr()
+            tcPr.append(self.xml.no_cell_borders())
+            tcPr.append(self.xml.vertical_alignment('center'))
+            tcPr.append(self.xml.element(
+                '<w:tcMar {ns}>'
+                '<w:top w:w="0" w:type="dxa"/>'
+                '<w:bottom w:w="0" w:type="dxa"/>'
+                '</w:tcMar>'
+            ))
+        
+        footer = section.footer
+        footer.is_linked_to_previous = False
+        
+        # Footer line 1 - note (7pt)
+        footer_para1 = footer.add_paragraph()
+        note_run = footer_para1.add_run('Note: This document is computer generated. Please verify all details before printing ID cards.')
+        note_run.font.name = 'Arial'
+        note_run.font.size = Pt(7)
+        note_run.font.color.rgb = RGBColor(0, 0, 0)
+        footer_para1.alignment = WD_ALIGN_PARAGRAPH.LEFT
+        footer_para1._p.get_or_add_pPr().append(self.xml.spacing(0, 0, 180, 'exact'))
+        
+        # Footer line 2 - generated date + copyright, then Page X of Y at a right tab
+        footer_para2 = footer.add_paragraph()
+        pPr2 = footer_para2._p.get_or_add_pPr()
+        pPr2.append(self.xml.spacing(0, 0, 180, 'exact'))
+        pPr2.append(self.xml.right_tab(14400))
+        
+        left_run = footer_para2.add_run('Generated on: ' + datetime.now().strftime('%d-%b-%Y %I:%M %p') + ' | © Adarsh ID Cards Management System - All Rights Reserved')
+        left_run.font.name = 'Arial'
+        left_run.font.size = Pt(7)
+        left_run.font.color.rgb = RGBColor(0, 0, 0)
+        
+        footer_para2.add_run('\t')
+        
+        def page_text(text):
+            run = footer_para2.add_run(text)
+            run.font.name = 'Arial'
+            run.font.size = Pt(9)
+            run.font.bold = True
+            run.font.color.rgb = RGBColor(0, 0, 0)
+        
+        def page_field(instruction):
+            run = footer_para2.add_run()
+            run.font.size = Pt(9)
+            run.font.bold = True
+            for tag, value in (('w:fldChar', 'begin'), ('w:instrText', instruction), ('w:fldChar', 'separate'), ('w:fldChar', 'end')):
+                element = OxmlElement(tag)
+                if tag == 'w:instrText':
+                    element.set(qn('xml:space'), 'preserve')
+                    element.text = value
+                else:
+                    element.set(qn('w:fldCharType'), value)
+                run._r.append(element)
+        
+        page_text('Page ')
+        page_field('PAGE')
+        page_text(' of ')
+        page_field('NUMPAGES')
+    
+    # ---------- card tables ----------
+    
+    def write_cards(self, cards: List[IDCard], renditions):
+        """One table of ENTRIES_PER_PAGE cards per page; renditions as in build_docx"""
+        table_proto, row_proto, label_proto, page_break_proto = self._build_prototypes()
+        
+        tbl = None
+        for card_idx, card in enumerate(cards):
+            if card_idx % ExportService.ENTRIES_PER_PAGE == 0:
+                if tbl is not None:
+                    self._body._insert_p(deepcopy(page_break_proto))
+                tbl = deepcopy(table_proto)
+                self._body._insert_tbl(tbl)
+            
+            tr = deepcopy(row_proto)
+            tcs = tr.tc_lst
+            self._set_run_text(tcs[0].p_lst[0].r_lst[0], str(card_idx + 1))  # Sr No
+            
+            field_data = card.field_data or {}
+            for tc, field in zip(tcs[1:], self.fields):
+                if not field['is_image']:
+                    value = field_data.get(field['name'], '')
+                    self._set_run_text(tc.p_lst[0].r_lst[0], str(value).upper() if value else '')
+                    continue
+                
+                img_path = field_data.get(field['name'], '')
+                if not self.has_image(img_path):
+                    continue  # Empty cell (white background)
+                
+                try:
+                    _, rendition = next(renditions)
+                    if isinstance(rendition, Exception):
+                        raise rendition
+                    # Export-sized JPEG with the 0.5pt black frame (see ImageService);
+                    # shared photos are embedded once
+                    self.pictures.add(tc.p_lst[0].add_r(), img_path, rendition, height=self._image_height)
+                except FileNotFoundError:
+                    self._replace_with_label(tc, label_proto, '[No Image]')
+                except Exception as img_err:
+                    print(f"Image processing error for {img_path}: {img_err}")
+                    self._replace_with_label(tc, label_proto, '[Error]')
+            
+            tbl.append(tr)
+    
+    @classmethod
+    def _set_run_text(cls, r, text: str):
+        """
+        Same result as `r.text = text` for a prototype run ending in a w:t,
+        without python-docx's per-character appender for plain text
+        """
+        if '\t' in text or '\n' in text or '\r' in text:
+            r.text = text  # Tabs / line breaks become w:tab / w:br
+            return
+        t = r[-1]
+        if not text:
+            r.remove(t)
+            return
+        t.text = text
+        if len(text.strip()) < len(text):
+            t.set(cls.XML_SPACE, 'preserve')
+    
+    @staticmethod
+    def _replace_with_label(tc, label_proto, text: str):
+        for p in tc.p_lst:
+            tc.remove(p)
+        p = deepcopy(label_proto)
+        p.r_lst[0].text = text
+        tc.append(p)
+    
+    def _build_prototypes(self):
+        """
+        Build (page table, data row, image label paragraph, page break
+        paragraph) with python-docx on the real document, then detach them
+        """
+        from docx.enum.table import WD_TABLE_ALIGNMENT
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+        from docx.shared import Cm, Pt, RGBColor
+        from docx.table import _Cell
+        
+        row_height = Cm(ExportService.DOCX_ROW_HEIGHT_CM)
+        self._image_height = row_height
+        
+        def style_text_cell(cell, text, left_right, bold=False):
+            cell.text = text
+            paragraph = cell.paragraphs[0]
+            run = paragraph.runs[0]
+            if bold:
+                run.bold = True
+            run.font.name = 'Arial'
+            run.font.size = Pt(9)
+            run.font.color.rgb = RGBColor(0, 0, 0)
+            tcPr = cell._tc.get_or_add_tcPr()
+            tcPr.append(self.xml.cell_margins(0, 0, left_right, left_right))
+            tcPr.append(self.xml.vertical_alignment('center'))
+            return paragraph
+        
+        table = self.document.add_table(rows=1, cols=1 + len(self.fields))
+        table.style = 'Table Grid'
+        table.alignment = WD_TABLE_ALIGNMENT.CENTER
+        
+        # Table borders 0.5pt
+        tblPr = table._tbl.tblPr
+        for child in tblPr:
+            if 'tblBorders' in child.tag:
+                tblPr.remove(child)
+                break
+        tblPr.append(self.xml.table_borders())
+        
+        # Header row - no background, bold Arial
+        for col_idx, cell in enumerate(table.rows[0].cells):
+            name = 'Sr No.' if col_idx == 0 else self.fields[col_idx - 1]['name']
+            cell.text = name
+            paragraph = cell.paragraphs[0]
+            paragraph.runs[0].bold = True
+            paragraph.runs[0].font.name = 'Arial'
+            paragraph.runs[0].font.size = Pt(9)
+            paragraph.runs[0].font.color.rgb = RGBColor(0, 0, 0)
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            tcPr = cell._tc.get_or_add_tcPr()
+            tcPr.append(self.xml.cell_margins(0, 0, 14, 14))
+            tcPr.append(self.xml.vertical_alignment('center'))
+            paragraph._p.get_or_add_pPr().append(self.xml.spacing(0, 0))
+            cell.width = Cm(self.column_widths[col_idx])
+        
+        # Data row - fixed height
+        row = table.add_row()
+        row._tr.get_or_add_trPr().append(self.xml.row_height(int(row_height.twips)))
+        cells = row.cells
+        
+        # Sr No - minimal padding
+        cells[0].text = '0'
+        paragraph = cells[0].paragraphs[0]
+        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        paragraph.runs[0].font.name = 'Arial'
+        paragraph.runs[0].font.size = Pt(9)
+        paragraph.runs[0].font.color.rgb = RGBColor(0, 0, 0)
+        tcPr = cells[0]._tc.get_or_add_tcPr()
+        tcPr.append(self.xml.cell_margins(0, 0, 14, 14))
+        tcPr.append(self.xml.vertical_alignment('center'))
+        paragraph._p.get_or_add_pPr().append(self.xml.spacing(0, 0))
+        cells[0].width = Cm(self.column_widths[0])
+        
+        image_cell = None
+        for col_idx, (cell, field) in enumerate(zip(cells[1:], self.fields), 1):
+            cell.width = Cm(self.column_widths[col_idx])
+            tcPr = cell._tc.get_or_add_tcPr()
+            if field['is_image']:
+                # No padding - image touches borders
+                tcPr.append(self.xml.cell_margins(0, 0, 0, 0))
+                tcPr.append(self.xml.vertical_alignment('center'))
+                paragraph = cell.paragraphs[0]
+                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                if image_cell is None:
+                    image_cell = cell
+            else:
+                cell.text = 'X'
+                tcPr.append(self.xml.cell_margins(0, 0, 28, 28))
+                tcPr.append(self.xml.vertical_alignment('center'))
+                paragraph = cell.paragraphs[0]
+                paragraph.runs[0].font.name = 'Arial'
+                paragraph.runs[0].font.size = Pt(9)
+                paragraph.runs[0].font.color.rgb = RGBColor(0, 0, 0)
+            paragraph._p.get_or_add_pPr().append(self.xml.spacing(0, 0))
+        
+        # [No Image] / [Error] label replacing an image cell's paragraph
+        label_proto = None
+        if image_cell is not None:
+            label_cell = _Cell(deepcopy(image_cell._tc), None)
+            label_cell.text = 'X'
+            paragraph = label_cell.paragraphs[0]
+            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            paragraph.runs[0].font.size = Pt(8)
+            paragraph.runs[0].font.color.rgb = RGBColor(*self.LABEL_COLOR)
+            paragraph._p.get_or_add_pPr().append(self.xml.spacing(0, 0))
+            label_proto = label_cell._tc.p_lst[0]
+        
+        # Page break between tables (not a separate spaced paragraph)
+        page_break = self.document.add_paragraph()
+        page_break._p.get_or_add_pPr().append(self.xml.spacing(0, 0, 0))
+        br = OxmlElement('w:br')
+        br.set(qn('w:type'), 'page')
+        page_break.add_run()._r.append(br)
+        
+        tbl, tr, p = table._tbl, row._tr, page_break._p
+        tbl.remove(tr)
+        self._body.remove(tbl)
+        self._body.remove(p)
+        return tbl, tr, label_proto, p
+
+
+class _DocxPictures:
+    """
+    Adds pictures to a python-docx document body in constant time each.
+    
+    run.add_picture() re-hashes every image already in the package to find
+    duplicates and scans the whole body for the next shape id, so a 2,000
+    card export spends most of its time there. Here duplicates are found by
+    the caller's key (the photo path), ids are counted as they are used and
+    the drawing XML of a repeated image is copied instead of re-parsed.
+    """
+    
+    def __init__(self, document):
+        self._part = document.part
+        self._image_parts = self._part.package.image_parts
+        self._by_key = {}
+        self._inlines = {}
+        self._next_shape_id = self._part.next_id
+        self._next_image_number = len(self._image_parts) + 1
+    
+    def add(self, r, key: str, image_bytes: bytes, width=None, height=None):
+        """Append the image to the w:r element, scaled like run.add_picture(stream, width, height)"""
+        from docx.image.image import Image as DocxImage
+        from docx.opc.constants import RELATIONSHIP_TYPE as RT
+        from docx.opc.packuri import PackURI
+        from docx.oxml.shape import CT_Inline
+        from docx.parts.image import ImagePart
+        
+        entry = self._by_key.get(key)
+        if entry is None:
+            image = DocxImage.from_blob(image_bytes)
+            partname = PackURI(f'/word/media/image{self._next_image_number}.{image.ext}')
+            self._next_image_number += 1
+            image_part = ImagePart.from_image(image, partname)
+            self._image_parts.append(image_part)
+            entry = self._by_key[key] = (self._part.relate_to(image_part, RT.IMAGE), image)
+        
+        # The wp:inline XML only differs in the shape id - build it once per image
+        inline = self._inlines.get((key, width, height))
+        if inline is None:
+            rId, image = entry
+            cx, cy = image.scaled_dimensions(width, height)
+            inline = self._inlines[(key, width, height)] = CT_Inline.new_pic_inline(0, rId, image.filename, cx, cy)
+        
+        inline = deepcopy(inline)
+        inline.docPr.id = self._next_shape_id
+        inline.docPr.name = 'Picture %d' % self._next_shape_id
+        self._next_shape_id += 1
+        r.add_drawing(inline)
+
+
+class _DocxStreamWriter:
+    """
+    Writes the DOCX package of an export as separate entries for a
+    streamed ZIP, without building the document tree.
+    
+    The page setup, page table, data row and labels are built exactly as in
+    build_docx (on an empty python-docx document) and serialized once; each
+    card is then rendered by filling those XML fragments with its values.
+    Photos are added first (add_image) so document.xml can reference them
+    while it is written.
+    """
+    
+    DOCUMENT = 'word/document.xml'
+    DOCUMENT_RELS = 'word/_rels/document.xml.rels'
+    IMAGE_REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/image'
+    # Every extension python-docx gives an image (bmp, gif, jpg, png, tiff)
+    IMAGE_CONTENT_TYPES = {
+        'bmp': 'image/bmp', 'gif': 'image/gif', 'jpg': 'image/jpeg', 'png': 'image/png', 'tiff': 'image/tiff',
+    }
+    LABELS = ('[No Image]', '[Error]')
+    # Placeholders serialized into the fragments and replaced per card / picture
+    TEXT_MARK = '\ue000'
+    PICTURE_MARKS = {'rId': '\ue001', 'filename': '\ue002', 'cx': 1234567891, 'cy': 1234567892, 'shape_id': 1234567893}
+    # Characters XML 1.0 cannot hold; python-docx would refuse them mid-stream
+    INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+    
+    def __init__(self, ordered_fields: List[Dict[str, Any]], column_widths: Dict[int, float],
+                 institution_name: str, table_name: str):
+        from docx import Document
+        from lxml import etree
+        
+        document = Document()
+        writer = _DocxCardWriter(document, ordered_fields, column_widths)
+        writer.write_page_setup(institution_name, table_name)
+        table_proto, row_proto, label_proto, page_break_proto = writer._build_prototypes()
+        
+        self.fields = ordered_fields
+        self._package = document.part.package
+        self._part = document.part
+        self._root_nsmap = document.element.nsmap
+        self._image_height = writer._image_height
+        
+        # document.xml before and after the card tables
+        marker = etree.Comment('cards')
+        document.element.body.sectPr.addprevious(marker)
+        self._head, self._tail = etree.tostring(
+            document.element, encoding='UTF-8', standalone=True
+        ).decode('utf-8').split('<!--cards-->')
+        marker.getparent().remove(marker)
+        
+        tbl = self._fragment(table_proto)
+        split_at = tbl.rindex('</w:tbl>')
+        self._table_open, self._table_close = tbl[:split_at], tbl[split_at:]
+        self._page_break = self._fragment(page_break_proto)
+        
+        tcs = row_proto.tc_lst
+        for tc in tcs:
+            row_proto.remove(tc)
+        tr = self._fragment(row_proto)
+        split_at = tr.rindex('</w:tr>')
+        self._row_open, self._row_close = tr[:split_at], tr[split_at:]
+        
+        # Per column: ('text', proto tc, before, after) or
+        # ('image', empty cell, before picture, after picture, {label: cell})
+        self._sr_no_cell = self._text_cell_template(tcs[0])
+        self._cells = []
+        for tc, field in zip(tcs[1:], ordered_fields):
+            if not field['is_image']:
+                self._cells.append(self._text_cell_template(tc))
+                continue
+            empty = self._fragment(tc)
+            split_at = empty.rindex('</w:p>')
+            labels = {}
+            for label in self.LABELS:
+                label_tc = deepcopy(tc)
+                _DocxCardWriter._replace_with_label(label_tc, label_proto, label)
+                labels[label] = self._fragment(label_tc)
+            self._cells.append(('image', empty, empty[:split_at], empty[split_at:], labels))
+        
+        self._images = {}  # path -> (rId, cx, cy, filename) or a label
+        self._media = []  # (rId, target) of the image relationships
+        self._next_rid = 1 + max(int(rId[3:]) for rId in self._part.rels if rId[3:].isdigit())
+        self._next_shape_id = self._part.next_id
+        self._inline_template = None
+    
+    # ---------- package ----------
+    
+    def package_entries(self):
+        """(name, bytes) of every package entry except document.xml and its relationships"""
+        from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI, PackURI
+        from docx.opc.part import Part
+        from docx.opc.pkgwriter import _ContentTypesItem
+        
+        parts = list(self._package.iter_parts())
+        for part in parts:
+            part.before_marshal()
+        image_types = [
+            Part(PackURI(f'/word/media/image.{ext}'), content_type)
+            for ext, content_type in self.IMAGE_CONTENT_TYPES.items()
+        ]
+        
+        yield CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(parts + image_types).blob
+        yield PACKAGE_URI.rels_uri.membername, self._package.rels.xml
+        for part in parts:
+            if part is self._part:
+                continue
+            yield part.partname.membername, part.blob
+            if len(part.rels):
+                yield part.partname.rels_uri.membername, part.rels.xml
+    
+    def add_image(self, img_path: str, rendition):
+        """
+        Register a photo (bytes or the exception preparing it raised).
+        Returns the (name, bytes) media entry to write, or None.
+        """
+        from docx.image.image import Image as DocxImage
+        
+        if isinstance(rendition, FileNotFoundError):
+            self._images[img_path] = '[No Image]'
+            return None
+        try:
+            if isinstance(rendition, Exception):
+                raise rendition
+            image = DocxImage.from_blob(rendition)
+        except Exception as img_err:
+            logger.warning("Image processing error for %s: %s", img_path, img_err)
+            self._images[img_path] = '[Error]'
+            return None
+        
+        rId = f'rId{self._next_rid}'
+        self._next_rid += 1
+        target = f'media/image{len(self._media) + 1}.{image.ext}'
+        self._media.append((rId, target))
+        cx, cy = image.scaled_dimensions(None, self._image_height)
+        self._images[img_path] = (rId, cx, cy, image.filename)
+        return f'word/{target}', rendition
+    
+    def document_rels(self) -> bytes:
+        """word/_rels/document.xml.rels with the photos added so far"""
+        rels = self._part.rels.xml
+        split_at = rels.rindex(b'</Relationships>')
+        return b''.join(chain(
+            [rels[:split_at]],
+            (f'<Relationship Id="{rId}" Type="{self.IMAGE_REL_TYPE}" Target="{target}"/>'.encode()
+             for rId, target in self._media),
+            [rels[split_at:]],
+        ))
+    
+    # ---------- document.xml ----------
+    
+    def document_xml(self, cards):
+        """Yield word/document.xml in pieces: the head, then one page of cards at a time"""
+        yield self._head
+        page = []
+        for card_idx, card in enumerate(cards):
+            if card_idx % ExportService.ENTRIES_PER_PAGE == 0:
+                if page:
+                    page.append(self._table_close)
+                    yield ''.join(page)
+                    page = [self._page_break]
+                page.append(self._table_open)
+            self._append_row(page, card_idx, card.field_data or {})
+        if page:
+            page.append(self._table_close)
+        page.append(self._tail)
+        yield ''.join(page)
+    
+    def _append_row(self, out: List[str], card_idx: int, field_data: dict):
+        out.append(self._row_open)
+        out.append(self._text_cell(self._sr_no_cell, str(card_idx + 1)))
+        for cell, field in zip(self._cells, self.fields):
+            if cell[0] == 'text':
+                value = field_data.get(field['name'], '')
+                out.append(self._text_cell(cell, str(value).upper() if value else ''))
+                continue
+            
+            img_path = field_data.get(field['name'], '')
+            if not _DocxCardWriter.has_image(img_path):
+                out.append(cell[1])  # Empty cell (white background)
+                continue
+            image = self._images.get(img_path, '[No Image]')  # Card edited after the first pass
+            if isinstance(image, str):
+                out.append(cell[4][image])
+                continue
+            out.append(cell[2])
+            out.append('<w:r><w:drawing>')
+            out.append(self._inline(*image))
+            out.append('</w:drawing></w:r>')
+            out.append(cell[3])
+        out.append(self._row_close)
+    
+    def _text_cell_template(self, tc):
+        tc = deepcopy(tc)
+        tc.p_lst[0].r_lst[0][-1].text = self.TEXT_MARK
+        before, after = self._fragment(tc).split(f'<w:t>{self.TEXT_MARK}</w:t>')
+        return ('text', tc, before, after)
+    
+    def _text_cell(self, cell, text: str) -> str:
+        """Same XML as _DocxCardWriter._set_run_text gives the prototype cell"""
+        _, tc, before, after = cell
+        text = self.INVALID_XML_CHARS.sub('', text)
+        if not text:
+            return before + after
+        if '\t' in text or '\n' in text or '\r' in text:
+            tc = deepcopy(tc)
+            _DocxCardWriter._set_run_text(tc.p_lst[0].r_lst[0], text)
+            return self._fragment(tc)
+        start = '<w:t xml:space="preserve">' if len(text.strip()) < len(text) else '<w:t>'
+        return f'{before}{start}{xml_escape(text)}</w:t>{after}'
+    
+    def _inline(self, rId: str, cx: int, cy: int, filename: str) -> str:
+        """wp:inline of a picture - python-docx's XML, with a new shape id"""
+        if self._inline_template is None:
+            from docx.oxml.shape import CT_Inline
+            
+            marks = self.PICTURE_MARKS
+            inline = CT_Inline.new_pic_inline(
+                marks['shape_id'], marks['rId'], marks['filename'], marks['cx'], marks['cy']
+            )
+            template = self._fragment(inline).replace('{', '{{').replace('}', '}}')
+            for name, mark in marks.items():
+                template = template.replace(str(mark), f'{{{name}}}')
+            self._inline_template = template
+        
+        shape_id = self._next_shape_id
+        self._next_shape_id += 1
+        return self._inline_template.format(rId=rId, filename=filename, cx=cx, cy=cy, shape_id=shape_id)
+    
+    def _fragment(self, element) -> str:
+        """
+        Serialize a detached element for the body of this document, leaving
+        out the namespace declarations the document root already makes
+        """
+        from lxml import etree
+        
+        xml = etree.tostring(element, encoding='unicode')
+        end = xml.index('>')
+        start_tag = xml[:end]
+        for prefix, uri in element.nsmap.items():
+            if prefix and self._root_nsmap.get(prefix) == uri:
+                start_tag = start_tag.replace(f' xmlns:{prefix}="{uri}"', '')
+        return start_tag + xml[end:]
+
+
+class _ZipStreamBuffer:
+    """
+    Write-only, non-seekable file object for zipfile.
+    
+    zipfile falls back to data descriptors when it cannot seek, so each
+    entry can be handed to the client as soon as it has been written.
+    """
+    
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        """Return (and forget) everything written since the last drain"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
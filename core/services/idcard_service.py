@@ -6,11 +6,13 @@ from typing import Dict, Any, Optional, List
 import json
 
 from django.shortcuts import get_object_or_404
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, Max
 
-from ..models import IDCardGroup, IDCardTable, IDCard
+from ..models import IDCardGroup, IDCardTable, IDCard, TableStatusCounter
 from .base import BaseService, ServiceResult
 from .image_service import ImageService
+from .search_service import SearchService
 
 
 class IDCardService(BaseService):
@@ -28,6 +30,7 @@ class IDCardService(BaseService):
     MAX_FIELDS_PER_TABLE = 20
     VALID_FIELD_TYPES = ['text', 'number', 'date', 'email', 'image', 'textarea']
     VALID_STATUSES = ['pending', 'verified', 'pool', 'approved', 'download', 'reprint']
+    SEARCH_RESULT_LIMIT = 100
     
     # ==================== ID Card Table Operations ====================
     
@@ -257,15 +260,78 @@ class IDCardService(BaseService):
         
         return data
     
+    # Leading columns of every columnar row; the table's fields follow in schema order
+    COLUMNAR_CARD_COLUMNS = ['id', 'status', 'photo', 'created_at', 'updated_at']
+    
+    @classmethod
+    def serialize_cards_columnar(cls, cards: List[IDCard], table_fields: List[dict]) -> Dict[str, Any]:
+        """
+        Serialize cards as one schema plus value arrays (the format=columnar
+        list response). Each row is COLUMNAR_CARD_COLUMNS followed by the
+        field values in `fields` order - the same values as ordered_fields,
+        with timestamps as Unix seconds and status labels sent once.
+        """
+        table_fields = table_fields or []
+        fields = [
+            {'name': field['name'], 'type': 'image' if cls.is_image_field(field) else field.get('type', 'text')}
+            for field in table_fields
+        ]
+        names = [(field['name'], field['name'].upper()) for field in table_fields]
+        
+        rows = []
+        for card in cards:
+            field_data = card.field_data or {}
+            normalized = None
+            row = [
+                card.id,
+                card.status,
+                card.photo.url if card.photo else None,
+                int(card.created_at.timestamp()),
+                int(card.updated_at.timestamp()),
+            ]
+            for name, name_upper in names:
+                value = field_data.get(name, '')
+                if not value:
+                    # Same case-insensitive fallback as serialize_card
+                    if normalized is None:
+                        normalized = {k.upper(): v for k, v in field_data.items()}
+                    value = normalized.get(name_upper, '')
+                row.append(value)
+            rows.append(row)
+        
+        return {
+            'columns': cls.COLUMNAR_CARD_COLUMNS + [field['name'] for field in fields],
+            'fields': fields,
+            'status_labels': dict(IDCard.STATUS_CHOICES),
+            'rows': rows,
+        }
+    
     @classmethod
     def list_cards(
         cls, 
         table_id: int, 
         status_filter: str = None,
         offset: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after_id: Optional[int] = None,
+        include_count: bool = True,
+        columnar: bool = False
     ) -> ServiceResult:
-        """List ID Cards for a table with pagination"""
+        """
+        List ID Cards for a table with pagination.
+        
+        Two paging modes:
+        - offset: cards_query[offset:offset + limit] (cost grows with offset)
+        - cursor: after_id = id of the last card already loaded; seeks on the
+          (table, status, id) index, so every page costs the same. offset is
+          then only used to number the rows (sr_no).
+        
+        include_count=False skips the status counts (total_count and
+        status_counts are returned as None).
+        
+        columnar=True replaces `cards` with the serialize_cards_columnar
+        payload plus `first_sr_no` (row i has sr_no first_sr_no + i).
+        """
         try:
             table = get_object_or_404(IDCardTable, id=table_id)
             
@@ -275,29 +341,43 @@ class IDCardService(BaseService):
             if status_filter and status_filter in cls.VALID_STATUSES:
                 cards_query = cards_query.filter(status=status_filter)
             
-            total_count = cards_query.count()
-            cards = cards_query[offset:offset + limit]
+            # Counts come from the table's counter row (no COUNT over IDCard)
+            status_counts = TableStatusCounter.counts_for(table.id) if include_count else None
+            total_count = (
+                status_counts.get(status_filter or 'total', status_counts['total'])
+                if include_count else None
+            )
             
-            # Serialize cards
-            card_list = []
-            for idx, card in enumerate(cards):
-                card_list.append(cls.serialize_card(
-                    card, 
-                    sr_no=offset + idx + 1,
-                    table_fields=table.fields
-                ))
+            # Fetch one extra row to know whether another page exists
+            if after_id is not None:
+                page = list(cards_query.filter(id__gt=after_id)[:limit + 1])
+            else:
+                page = list(cards_query[offset:offset + limit + 1])
+            has_more = len(page) > limit
+            cards = page[:limit]
             
-            # Get status counts
-            status_counts = cls.get_status_counts(table)
+            # Serialize cards
+            if columnar:
+                page_data = {
+                    'format': 'columnar',
+                    'first_sr_no': offset + 1,
+                    **cls.serialize_cards_columnar(cards, table.fields),
+                }
+            else:
+                page_data = {'cards': [
+                    cls.serialize_card(card, sr_no=offset + idx + 1, table_fields=table.fields)
+                    for idx, card in enumerate(cards)
+                ]}
             
             return ServiceResult(
                 success=True,
                 data={
-                    'cards': card_list,
+                    **page_data,
                     'total_count': total_count,
                     'offset': offset,
                     'limit': limit,
-                    'has_more': offset + limit < total_count,
+                    'has_more': has_more,
+                    'next_after_id': cards[-1].id if cards else after_id,
                     'status_counts': status_counts,
                     'table': cls.serialize_table(table),
                 }
@@ -308,38 +388,72 @@ class IDCardService(BaseService):
     
     @classmethod
     def get_status_counts(cls, table: IDCardTable) -> Dict[str, int]:
-        """Get count of cards by status for a table"""
-        counts = {status: 0 for status in cls.VALID_STATUSES}
-        counts['total'] = 0
-        
-        # Efficient aggregation
-        status_agg = IDCard.objects.filter(table=table).values('status').annotate(count=Count('id'))
-        
-        for item in status_agg:
-            counts[item['status']] = item['count']
-            counts['total'] += item['count']
-        
-        return counts
+        """Get count of cards by status for a table (from its TableStatusCounter row)"""
+        return TableStatusCounter.counts_for(table.id)
     
     @classmethod
     def get_all_card_ids(cls, table_id: int, status_filter: str = None) -> ServiceResult:
-        """Get all card IDs for a table (for Select All)"""
+        """
+        Select All: a `selection` handle for every card of the table (in the
+        status) plus their count. The ids themselves are never sent - bulk
+        endpoints take the handle instead (see select_cards).
+        """
         try:
             table = get_object_or_404(IDCardTable, id=table_id)
             
+            status = status_filter if status_filter in cls.VALID_STATUSES else None
             cards_query = IDCard.objects.filter(table=table)
-            if status_filter and status_filter in cls.VALID_STATUSES:
-                cards_query = cards_query.filter(status=status_filter)
+            if status:
+                cards_query = cards_query.filter(status=status)
             
-            card_ids = list(cards_query.values_list('id', flat=True))
+            totals = cards_query.order_by().aggregate(total=Count('id'), max_id=Max('id'))
             
             return ServiceResult(
                 success=True,
-                data={'card_ids': card_ids, 'total_count': len(card_ids)}
+                data={
+                    'total_count': totals['total'],
+                    'selection': {
+                        'status': status,
+                        'max_id': totals['max_id'] or 0,
+                    },
+                }
             )
         except Exception as e:
             return ServiceResult(success=False, message=str(e))
     
+    @classmethod
+    def select_cards(
+        cls,
+        table: IDCardTable,
+        card_ids: List[int] = None,
+        selection: Dict[str, Any] = None
+    ):
+        """
+        Queryset of the cards a bulk request targets.
+        
+        selection is a filter spec - {"status": ..., "max_id": ...,
+        "exclude_ids": [...]}, all keys optional - turned into one set-based
+        predicate (table_id = ? AND status = ? AND id <= ? AND id NOT IN
+        (exclusions)) instead of an IN list of every id. max_id pins the
+        selection to the cards that existed when it was made. Without a
+        selection, the explicit card_ids are used.
+        """
+        cards = IDCard.objects.filter(table=table)
+        if not selection:
+            return cards.filter(id__in=card_ids or [])
+        
+        status = selection.get('status')
+        if status:
+            if status not in cls.VALID_STATUSES:
+                raise ValueError(f'Invalid selection status: {status}')
+            cards = cards.filter(status=status)
+        if selection.get('max_id') is not None:
+            cards = cards.filter(id__lte=int(selection['max_id']))
+        exclude_ids = selection.get('exclude_ids') or []
+        if exclude_ids:
+            cards = cards.exclude(id__in=[int(card_id) for card_id in exclude_ids])
+        return cards
+    
     @classmethod
     def create_card(
         cls, 
@@ -510,7 +624,7 @@ class IDCardService(BaseService):
             
             card = get_object_or_404(IDCard, id=card_id)
             card.status = new_status
-            card.save()
+            card.save(update_fields=['status', 'updated_at'])
             
             return ServiceResult(
                 success=True,
@@ -528,18 +642,32 @@ class IDCardService(BaseService):
         cls, 
         table_id: int, 
         card_ids: List[int], 
-        new_status: str
+        new_status: str,
+        selection: Dict[str, Any] = None
     ) -> ServiceResult:
-        """Change status of multiple ID Cards"""
+        """Change status of multiple ID Cards (card_ids or a selection, see select_cards)"""
         try:
             if new_status not in cls.VALID_STATUSES:
                 return ServiceResult(success=False, message='Invalid status!')
             
             table = get_object_or_404(IDCardTable, id=table_id)
-            updated_count = IDCard.objects.filter(
-                table=table, 
-                id__in=card_ids
-            ).update(status=new_status)
+            cards = cls.select_cards(table, card_ids, selection)
+            
+            # Move cards one current status at a time so the counter
+            # deltas match exactly what each UPDATE changed
+            updated_count = 0
+            deltas = {}
+            with transaction.atomic():
+                current = cards.order_by().values('status').annotate(n=Count('id'))
+                for row in current:
+                    if row['status'] == new_status:
+                        updated_count += row['n']
+                        continue
+                    moved = cards.filter(status=row['status']).update(status=new_status)
+                    deltas[row['status']] = -moved
+                    deltas[new_status] = deltas.get(new_status, 0) + moved
+                    updated_count += moved
+                TableStatusCounter.adjust(table.id, deltas)
             
             return ServiceResult(
                 success=True,
@@ -554,19 +682,36 @@ class IDCardService(BaseService):
         cls, 
         table_id: int, 
         card_ids: List[int] = None, 
-        delete_all: bool = False
+        delete_all: bool = False,
+        selection: Dict[str, Any] = None
     ) -> ServiceResult:
-        """Delete multiple ID Cards"""
+        """Delete multiple ID Cards (card_ids or a selection, see select_cards)"""
         try:
             table = get_object_or_404(IDCardTable, id=table_id)
-            
-            if delete_all:
-                deleted_count, _ = IDCard.objects.filter(table=table).delete()
-            else:
-                deleted_count, _ = IDCard.objects.filter(
-                    table=table, 
-                    id__in=card_ids or []
-                ).delete()
+            cards = IDCard.objects.filter(table=table) if delete_all else cls.select_cards(table, card_ids, selection)
+            
+            with transaction.atomic():
+                # Queryset deletes skip IDCard.delete(), so release the images
+                # here - files are only removed once the delete has committed
+                image_paths = [
+                    path
+                    for field_data in cards.values_list('field_data', flat=True).iterator()
+                    for path in IDCard.image_paths(field_data)
+                ]
+                transaction.on_commit(lambda: ImageService.delete_images(image_paths))
+                
+                if delete_all:
+                    deleted_count, _ = cards.delete()
+                    TableStatusCounter.rebuild(table.id)
+                else:
+                    # Delete per status so the counter deltas are exact
+                    deleted_count = 0
+                    deltas = {}
+                    for status in cards.order_by().values_list('status', flat=True).distinct():
+                        removed, _ = cards.filter(status=status).delete()
+                        deltas[status] = -removed
+                        deleted_count += removed
+                    TableStatusCounter.adjust(table.id, deltas)
             
             return ServiceResult(
                 success=True,
@@ -577,8 +722,13 @@ class IDCardService(BaseService):
             return ServiceResult(success=False, message=str(e))
     
     @classmethod
-    def search_cards(cls, table_id: int, query: str) -> ServiceResult:
-        """Search ID Cards across all statuses"""
+    def search_cards(cls, table_id: int, query: str, limit: int = None) -> ServiceResult:
+        """
+        Search ID Cards across all statuses.
+        
+        Matching runs in the database on the indexed search_text column
+        (see SearchService); only the first `limit` matches are loaded.
+        """
         try:
             if not query or len(query) < 2:
                 return ServiceResult(
@@ -589,17 +739,27 @@ class IDCardService(BaseService):
             
             table = get_object_or_404(IDCardTable, id=table_id)
             query_upper = query.strip().upper()
+            limit = limit or cls.SEARCH_RESULT_LIMIT
+            
+            cards = SearchService.filter_cards(
+                IDCard.objects.filter(table=table), query_upper
+            ).order_by('id')
+            cards = list(cards[:limit + 1])
+            has_more = len(cards) > limit
             
-            cards = IDCard.objects.filter(table=table)
+            # Image paths are not part of the search document
+            image_fields = {f.get('name') for f in table.fields or [] if f.get('type') in cls.IMAGE_FIELD_TYPES}
             
             results = []
-            for card in cards:
+            for card in cards[:limit]:
                 field_data = card.field_data or {}
                 match_found = False
                 matched_field = ''
                 matched_value = ''
                 
                 for field_name, field_value in field_data.items():
+                    if field_name in image_fields:
+                        continue
                     if field_value and query_upper in str(field_value).upper():
                         match_found = True
                         matched_field = field_name
@@ -630,6 +790,7 @@ class IDCardService(BaseService):
                 data={
                     'results': results,
                     'count': len(results),
+                    'has_more': has_more,
                     'query': query
                 }
             )
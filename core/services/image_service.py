@@ -1,17 +1,27 @@
 """
 Image Service Module
-Contains: Image filename generation, validation, saving, and folder management
+Contains: Image filename generation, validation, saving, folder management,
+export renditions, and the worker pools used to validate/thumbnail uploaded
+photos and to prepare export images in parallel
 """
+import hashlib
 import os
 import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List, Dict, Iterable, Iterator, Union
 from io import BytesIO
 
 from django.conf import settings
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.fields.json import KeyTransform
 
+from ..models import IDCard, DeferredImageCheck, StoredImage
 from .base import BaseService, ServiceResult
 
 
@@ -22,8 +32,9 @@ class ImageService(BaseService):
     Responsibilities:
     - Generate unique filenames for images
     - Validate image data
-    - Save images to client folders
+    - Save images to client folders (identical images stored once)
     - Delete old images when updating
+    - Cache export-sized copies for DOCX exports
     """
     
     @staticmethod
@@ -120,14 +131,21 @@ class ImageService(BaseService):
         except Exception:
             return f"updated_{uuid.uuid4().hex[:12]}{new_ext or '.jpg'}"
     
-    @staticmethod
-    def validate_image_bytes(image_bytes: bytes) -> Tuple[bool, Optional[str]]:
+    @classmethod
+    def validate_image_bytes(cls, image_bytes: bytes, fast: bool = False) -> Tuple[bool, Optional[str]]:
         """
         Validate that image bytes represent a valid image.
         
+        Args:
+            image_bytes: Raw image data
+            fast: Only check the header and end-of-file marker (see quick_check_image)
+        
         Returns:
             Tuple of (is_valid, error_message)
         """
+        if fast:
+            return cls.quick_check_image(image_bytes)
+        
         try:
             if not image_bytes or len(image_bytes) < 100:
                 return False, "Image data is empty or too small"
@@ -145,6 +163,264 @@ class ImageService(BaseService):
         except Exception as e:
             return False, str(e)
     
+    @staticmethod
+    def quick_check_image(image_bytes: bytes) -> Tuple[bool, Optional[str]]:
+        """
+        Cheap validation without decoding the pixel data.
+        
+        Checks the format signature and dimensions from the header, and
+        catches truncated uploads by looking for the format's end marker
+        (JPEG EOI, PNG IEND, GIF trailer). Other formats use PIL verify(),
+        which walks the file structure without decoding.
+        
+        Returns:
+            Tuple of (is_valid, error_message)
+        """
+        try:
+            if not image_bytes or len(image_bytes) < 100:
+                return False, "Image data is empty or too small"
+            
+            from PIL import Image
+            
+            img = Image.open(BytesIO(image_bytes))  # Parses the header only
+            width, height = img.size
+            if width <= 0 or height <= 0:
+                return False, "Image has no dimensions"
+            
+            tail = image_bytes[-64:].rstrip(b'\x00\r\n\t ')
+            if img.format == 'JPEG':
+                if not tail.endswith(b'\xff\xd9'):
+                    return False, "Image is truncated (missing JPEG end marker)"
+            elif img.format == 'PNG':
+                if b'IEND' not in tail:
+                    return False, "Image is truncated (missing PNG end chunk)"
+            elif img.format == 'GIF':
+                if not tail.endswith(b'\x3b'):
+                    return False, "Image is truncated (missing GIF trailer)"
+            else:
+                img.verify()
+            
+            return True, None
+        except Exception as e:
+            return False, str(e)
+    
+    @classmethod
+    def inspect_image(
+        cls,
+        image_bytes: bytes,
+        thumbnail_size: tuple = None,
+        fast: bool = False,
+        ingest_policy: Optional[Dict[str, int]] = None
+    ) -> Tuple[bool, Optional[str], Optional[bytes], Optional[Tuple[bytes, str]], Optional[bytes]]:
+        """
+        Validate image bytes, apply the ingest policy and build a thumbnail
+        and export rendition from a single decode.
+        
+        Used by the bulk upload pipeline (runs inside the image process pool).
+        With fast=True only the header is validated (quick_check_image) and
+        JPEG thumbnails are decoded at reduced scale.
+        
+        Args:
+            ingest_policy: Result of get_ingest_policy() (None = store as is)
+        
+        Returns:
+            Tuple of (is_valid, error_message, thumbnail_bytes, stored,
+            export_bytes) where stored is (bytes, ext) of the re-encoded
+            photo, or None when the original bytes should be stored unchanged
+        """
+        try:
+            if fast:
+                is_valid, error = cls.quick_check_image(image_bytes)
+                if not is_valid:
+                    return False, error, None, None, None
+            elif not image_bytes or len(image_bytes) < 100:
+                return False, "Image data is empty or too small", None, None, None
+            
+            from PIL import Image
+            
+            img = Image.open(BytesIO(image_bytes))
+            if not fast:
+                img.load()  # Full decode - fails on truncated/corrupt data
+        except Exception as e:
+            return False, str(e), None, None, None
+        
+        stored = None
+        if ingest_policy:
+            try:
+                reencoded = cls._reencode_for_storage(img, ingest_policy, image_bytes)
+                if reencoded:
+                    img, stored = reencoded[0], reencoded[1:]
+            except Exception:
+                stored = None  # Keep the original bytes
+        
+        # Export rendition first: its draft scale is larger than the thumbnail's
+        try:
+            export_bytes = cls._encode_export_rendition(img, cls.export_rendition_height())
+        except Exception:
+            export_bytes = None  # Built on demand at export time instead
+        
+        try:
+            thumb_bytes = cls._encode_thumbnail(img, thumbnail_size or cls.THUMBNAIL_SIZE)
+        except Exception:
+            thumb_bytes = None  # Thumbnail is non-critical
+        
+        return True, None, thumb_bytes, stored, export_bytes
+    
+    # ==================== INGEST POLICY ====================
+    
+    # Info keys PIL exposes for metadata we strip on ingest
+    METADATA_INFO_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+    
+    @staticmethod
+    def get_ingest_policy() -> Optional[Dict[str, int]]:
+        """
+        Current ingest policy from settings, or None when disabled.
+        
+        Returns:
+            Dict with max_edge (0 = no resize) and quality (JPEG quality)
+        """
+        if not getattr(settings, 'IMAGE_INGEST_ENABLED', True):
+            return None
+        return {
+            'max_edge': getattr(settings, 'IMAGE_INGEST_MAX_EDGE', 1600),
+            'quality': getattr(settings, 'IMAGE_INGEST_JPEG_QUALITY', 85),
+        }
+    
+    @classmethod
+    def apply_ingest_policy(cls, image_bytes: bytes, ext: str) -> Tuple[bytes, str]:
+        """
+        Downscale / re-encode an uploaded photo before it is stored.
+        
+        Applies the EXIF orientation, caps the long edge at
+        IMAGE_INGEST_MAX_EDGE and strips EXIF/XMP metadata. Small, clean
+        JPEG/PNG files are returned unchanged.
+        
+        Args:
+            image_bytes: Uploaded image data
+            ext: Extension of the upload (returned when nothing changes)
+        
+        Returns:
+            Tuple of (bytes_to_store, extension)
+        """
+        policy = cls.get_ingest_policy()
+        if not policy:
+            return image_bytes, ext
+        
+        try:
+            from PIL import Image
+            
+            reencoded = cls._reencode_for_storage(Image.open(BytesIO(image_bytes)), policy, image_bytes)
+        except Exception:
+            return image_bytes, ext  # Not decodable here - store the original
+        
+        if not reencoded:
+            return image_bytes, ext
+        return reencoded[1], reencoded[2]
+    
+    @classmethod
+    def _reencode_for_storage(cls, img, policy: Dict[str, int], image_bytes: bytes = None):
+        """
+        Apply the ingest policy to an opened PIL image.
+        
+        The decision is made from header info only. A JPEG that just carries
+        metadata has it cut out of the file without decoding; only oversized,
+        rotated or non-JPEG/PNG images are decoded (oversized JPEGs at draft
+        scale) and re-encoded. Only JPEG input is re-encoded as JPEG; lossless
+        sources (PNG/GIF/BMP/WebP - barcodes, QR codes, signatures) are saved
+        as PNG so no compression artefacts are added.
+        
+        Args:
+            image_bytes: The file img was opened from (enables the lossless
+                metadata strip)
+        
+        Returns:
+            Tuple of (processed_image, bytes, ext) or None if the original
+            file can be stored as is
+        """
+        from PIL import Image, ImageOps
+        
+        max_edge = policy.get('max_edge') or 0
+        too_big = bool(max_edge) and max(img.size) > max_edge
+        rotated = img.getexif().get(0x0112, 1) != 1  # EXIF Orientation tag
+        has_metadata = any(key in img.info for key in cls.METADATA_INFO_KEYS)
+        
+        if img.format in ('JPEG', 'PNG') and not (too_big or rotated or has_metadata):
+            return None
+        
+        if img.format == 'JPEG' and image_bytes and not (too_big or rotated):
+            stripped = cls._strip_jpeg_metadata(image_bytes)
+            if stripped:
+                return img, stripped, '.jpg'
+        
+        icc_profile = img.info.get('icc_profile')  # Kept so colours don't shift
+        is_jpeg = img.format == 'JPEG'  # Lost once the image is transposed/resized
+        
+        if too_big:
+            # Let the JPEG decoder scale down while decoding (no-op once loaded)
+            img.draft(None, (max_edge, max_edge))
+        img = ImageOps.exif_transpose(img)
+        if too_big:
+            if img.mode in ('1', 'P'):
+                # Palette/bilevel images only resize with nearest neighbour
+                has_alpha = img.mode == 'P' and 'transparency' in img.info
+                img = img.convert('RGBA' if has_alpha else 'RGB')
+            img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        
+        output = BytesIO()
+        if not is_jpeg:
+            has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+            if img.mode not in ('1', 'L', 'LA', 'P', 'RGB', 'RGBA'):
+                img = img.convert('RGBA' if has_alpha else 'RGB')
+            img.save(output, format='PNG', optimize=True, icc_profile=icc_profile)
+            return img, output.getvalue(), '.png'
+        
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.save(
+            output, format='JPEG', quality=policy.get('quality') or 85,
+            optimize=True, icc_profile=icc_profile
+        )
+        return img, output.getvalue(), '.jpg'
+    
+    # JPEG segments dropped by _strip_jpeg_metadata: APP1 (EXIF/XMP),
+    # APP13 (Photoshop/IPTC) and COM. APP2 (ICC profile) is kept.
+    JPEG_METADATA_MARKERS = (0xE1, 0xED, 0xFE)
+    
+    @classmethod
+    def _strip_jpeg_metadata(cls, image_bytes: bytes) -> Optional[bytes]:
+        """
+        Copy a JPEG without its metadata segments, leaving the compressed
+        image data untouched (no decode, no quality loss).
+        
+        Returns:
+            The stripped file, or None if the segment structure can't be
+            walked (the caller re-encodes instead)
+        """
+        if image_bytes[:2] != b'\xff\xd8':
+            return None
+        
+        output = bytearray(b'\xff\xd8')
+        pos = 2
+        while pos + 4 <= len(image_bytes):
+            if image_bytes[pos] != 0xFF:
+                return None
+            marker = image_bytes[pos + 1]
+            if marker == 0xFF:
+                pos += 1  # Fill byte
+                continue
+            if marker == 0xDA:
+                # Start of scan: the rest is entropy-coded data
+                output += image_bytes[pos:]
+                return bytes(output)
+            length = int.from_bytes(image_bytes[pos + 2:pos + 4], 'big')
+            end = pos + 2 + length
+            if length < 2 or end > len(image_bytes):
+                return None
+            if marker not in cls.JPEG_METADATA_MARKERS:
+                output += image_bytes[pos:end]
+            pos = end
+        return None
+    
     @staticmethod
     def get_client_image_folder(client) -> str:
         """
@@ -165,6 +441,85 @@ class ImageService(BaseService):
         
         return folder_path
     
+    # ==================== DEDUPLICATED STORE ====================
+    
+    @staticmethod
+    def content_hash(image_bytes: bytes) -> str:
+        """SHA-256 hex digest used to key StoredImage rows"""
+        return hashlib.sha256(image_bytes).hexdigest()
+    
+    @classmethod
+    def store_image(cls, file_path: str, image_bytes: bytes) -> Tuple[str, bool]:
+        """
+        Save image bytes, reusing an identical image already stored in the
+        same client folder.
+        
+        The first copy keeps the path it was saved under; later uploads of
+        the same bytes get that path back and only bump its reference count.
+        
+        Args:
+            file_path: Path to save under if the image is new
+                (e.g. 'adarshimg/ABCDE12345/14325123456101.jpg')
+            image_bytes: Final bytes to store (after the ingest policy)
+        
+        Returns:
+            Tuple of (saved_path, reused)
+        """
+        folder = os.path.dirname(file_path)
+        digest = cls.content_hash(image_bytes)
+        
+        with transaction.atomic():
+            stored = StoredImage.objects.select_for_update().filter(
+                folder=folder, sha256=digest
+            ).first()
+            
+            if stored and default_storage.exists(stored.path):
+                StoredImage.objects.filter(pk=stored.pk).update(ref_count=F('ref_count') + 1)
+                return stored.path, True
+            
+            saved_path = default_storage.save(file_path, ContentFile(image_bytes))
+            if stored:
+                # The shared file vanished from disk - start over with this copy
+                stored.path = saved_path
+                stored.size = len(image_bytes)
+                stored.ref_count = 1
+                stored.save(update_fields=['path', 'size', 'ref_count'])
+            else:
+                try:
+                    with transaction.atomic():
+                        StoredImage.objects.create(
+                            folder=folder, sha256=digest, path=saved_path,
+                            size=len(image_bytes), ref_count=1
+                        )
+                except IntegrityError:
+                    # A concurrent upload stored the same image first (SQLite
+                    # ignores select_for_update) - share its copy instead
+                    default_storage.delete(saved_path)
+                    stored = StoredImage.objects.get(folder=folder, sha256=digest)
+                    StoredImage.objects.filter(pk=stored.pk).update(ref_count=F('ref_count') + 1)
+                    return stored.path, True
+            return saved_path, False
+    
+    @staticmethod
+    def release_image(image_path: str) -> bool:
+        """
+        Drop one reference to a stored image.
+        
+        Returns:
+            True if the file is no longer used and can be deleted, False if
+            other cards still point at it. Images saved before deduplication
+            have no StoredImage row and are always deletable.
+        """
+        with transaction.atomic():
+            stored = StoredImage.objects.select_for_update().filter(path=image_path).first()
+            if not stored:
+                return True
+            if stored.ref_count > 1:
+                StoredImage.objects.filter(pk=stored.pk).update(ref_count=F('ref_count') - 1)
+                return False
+            stored.delete()
+            return True
+    
     @classmethod
     def save_image(
         cls,
@@ -189,33 +544,33 @@ class ImageService(BaseService):
             folder = cls.get_client_image_folder(client)
             
             # Get extension
-            if hasattr(file_content, 'name'):
+            if hasattr(file_content, 'name') and file_content.name:
                 original_ext = os.path.splitext(file_content.name)[1].lower() or '.jpg'
             else:
                 original_ext = '.jpg'
             
+            # Downscale / strip metadata before storing (may switch the extension)
+            image_bytes, original_ext = cls.apply_ingest_policy(file_content.read(), original_ext)
+            file_content = ContentFile(image_bytes)
+            
             # Generate filename
             if existing_path and existing_path not in ['NOT_FOUND', '', 'PENDING']:
                 new_filename = cls.generate_updated_filename(existing_path, original_ext)
                 
-                # Delete old image
-                try:
-                    if default_storage.exists(existing_path):
-                        default_storage.delete(existing_path)
-                except Exception as del_err:
-                    pass  # Continue even if delete fails
+                # Delete old image (kept if other cards share it)
+                cls.delete_image(existing_path)
             else:
                 new_filename = cls.generate_filename(batch_counter, original_ext)
             
             file_path = f"{folder}/{new_filename}"
             
-            # Save the image
-            saved_path = default_storage.save(file_path, file_content)
+            # Save the image (or reuse an identical one)
+            saved_path, _ = cls.store_image(file_path, image_bytes)
             
             return ServiceResult(
                 success=True,
                 message='Image saved successfully',
-                data={'path': saved_path, 'filename': new_filename}
+                data={'path': saved_path, 'filename': os.path.basename(saved_path)}
             )
             
         except Exception as e:
@@ -239,21 +594,42 @@ class ImageService(BaseService):
     
     @classmethod
     def delete_image(cls, image_path: str) -> ServiceResult:
-        """Delete an image from storage (including its thumbnail if exists)"""
+        """
+        Delete an image from storage (including its thumbnail if exists).
+        Shared images are only removed once the last card stops using them.
+        """
         try:
+            if image_path and not cls.release_image(image_path):
+                return ServiceResult(success=True, message='Image still used by other cards')
+            
             if image_path and default_storage.exists(image_path):
                 default_storage.delete(image_path)
                 
-                # Also delete thumbnail if exists
-                thumb_path = cls.get_thumbnail_path(image_path)
-                if thumb_path and default_storage.exists(thumb_path):
-                    default_storage.delete(thumb_path)
+                # Also delete thumbnail and export rendition if they exist
+                for derived_path in (cls.get_thumbnail_path(image_path), cls.get_export_rendition_path(image_path)):
+                    if derived_path and default_storage.exists(derived_path):
+                        default_storage.delete(derived_path)
                     
                 return ServiceResult(success=True, message='Image deleted')
             return ServiceResult(success=True, message='Image not found, nothing to delete')
         except Exception as e:
             return ServiceResult(success=False, message=f'Failed to delete image: {str(e)}')
     
+    @classmethod
+    def delete_images(cls, image_paths: Iterable[str]) -> int:
+        """
+        delete_image() for each path, for cards removed without
+        IDCard.delete() (queryset deletes, rolled back import rows).
+        
+        Returns:
+            Number of paths that failed to delete
+        """
+        failed = 0
+        for image_path in image_paths:
+            if not cls.delete_image(image_path).success:
+                failed += 1
+        return failed
+    
     # ==================== THUMBNAIL OPERATIONS ====================
     
     THUMBNAIL_SIZE = (150, 150)  # Max width x height (maintains aspect ratio)
@@ -296,37 +672,61 @@ class ImageService(BaseService):
         try:
             from PIL import Image
             
-            if not max_size:
-                max_size = cls.THUMBNAIL_SIZE
-            
             # Open the image
             img = Image.open(BytesIO(image_bytes))
             
-            # Convert to RGB if necessary (handles RGBA, palette images)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Create white background for transparent images
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Create thumbnail (maintains aspect ratio)
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Save to bytes
-            output = BytesIO()
-            img.save(output, format='JPEG', quality=85, optimize=True)
-            output.seek(0)
-            
-            return output.read()
+            return cls._encode_thumbnail(img, max_size or cls.THUMBNAIL_SIZE)
             
         except Exception as e:
             # Thumbnail generation is non-critical, return None on failure
             return None
     
+    @staticmethod
+    def _encode_thumbnail(img, max_size: tuple) -> bytes:
+        """Resize an opened PIL image to a JPEG thumbnail"""
+        from PIL import Image
+        
+        # Let the JPEG decoder scale down while decoding (no-op once loaded)
+        img.draft(None, max_size)
+        
+        img = ImageService._flatten_to_rgb(img)
+        
+        # Create thumbnail (maintains aspect ratio)
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        
+        # Save to bytes
+        output = BytesIO()
+        img.save(output, format='JPEG', quality=85, optimize=True)
+        return output.getvalue()
+    
+    @staticmethod
+    def _flatten_to_rgb(img):
+        """Convert to RGB, putting transparent images on a white background"""
+        from PIL import Image
+        
+        if img.mode in ('RGBA', 'LA', 'P'):
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+            return background
+        if img.mode != 'RGB':
+            return img.convert('RGB')
+        return img
+    
+    @classmethod
+    def save_thumbnail_for(cls, image_path: str, thumb_bytes: Optional[bytes]) -> Optional[str]:
+        """Save pre-generated thumbnail bytes next to an already saved image"""
+        thumb_path = cls.get_thumbnail_path(image_path)
+        if not thumb_bytes or not thumb_path:
+            return None
+        try:
+            if default_storage.exists(thumb_path):
+                return thumb_path  # Image is shared and already has one
+            return default_storage.save(thumb_path, ContentFile(thumb_bytes))
+        except Exception:
+            return None
+    
     @classmethod
     def save_image_with_thumbnail(
         cls,
@@ -365,35 +765,29 @@ class ImageService(BaseService):
             if ext not in BaseService.VALID_IMAGE_EXTENSIONS:
                 ext = '.jpg'
             
+            # Downscale / strip metadata before storing (may switch the extension)
+            image_bytes, ext = cls.apply_ingest_policy(image_bytes, ext)
+            
             # Generate filename
             if existing_path and existing_path not in ['NOT_FOUND', '', 'PENDING']:
                 new_filename = cls.generate_updated_filename(existing_path, ext)
                 
-                # Delete old image and its thumbnail
-                try:
-                    if default_storage.exists(existing_path):
-                        default_storage.delete(existing_path)
-                    old_thumb = cls.get_thumbnail_path(existing_path)
-                    if old_thumb and default_storage.exists(old_thumb):
-                        default_storage.delete(old_thumb)
-                except Exception:
-                    pass  # Continue even if delete fails
+                # Delete old image and its thumbnail (kept if other cards share them)
+                cls.delete_image(existing_path)
             else:
                 new_filename = cls.generate_filename(batch_counter, ext)
             
             file_path = f"{folder}/{new_filename}"
-            thumb_path = None
             
-            # Save main image
-            saved_path = default_storage.save(file_path, ContentFile(image_bytes))
+            # Save main image (or reuse an identical one)
+            saved_path, reused = cls.store_image(file_path, image_bytes)
             
-            # Generate and save thumbnail
-            thumb_bytes = cls.generate_thumbnail(image_bytes)
-            if thumb_bytes:
-                thumb_filename = cls.get_thumbnail_path(new_filename)
-                if thumb_filename:
-                    thumb_file_path = f"{folder}/{thumb_filename}"
-                    thumb_path = default_storage.save(thumb_file_path, ContentFile(thumb_bytes))
+            # Generate and save thumbnail (and warm the export rendition)
+            if reused:
+                thumb_path = cls.ensure_thumbnail_exists(saved_path)
+            else:
+                thumb_path = cls.save_thumbnail_for(saved_path, cls.generate_thumbnail(image_bytes))
+                cls.warm_export_rendition(saved_path, image_bytes)
             
             return ServiceResult(
                 success=True,
@@ -401,7 +795,7 @@ class ImageService(BaseService):
                 data={
                     'path': saved_path,
                     'thumb_path': thumb_path,
-                    'filename': new_filename
+                    'filename': os.path.basename(saved_path)
                 }
             )
             
@@ -463,3 +857,398 @@ class ImageService(BaseService):
             pass
         
         return None
+
+    # ==================== EXPORT RENDITIONS ====================
+    
+    # Export-sized JPEG kept next to each photo ({name}_export.jpg) so DOCX
+    # exports embed ready bytes instead of decoding and resizing originals.
+    # A rendition older than its photo is stale and rebuilt on next use.
+    EXPORT_RENDITION_SUFFIX = '_export'
+    EXPORT_RENDITION_QUALITY = 90
+    
+    @staticmethod
+    def export_rendition_height() -> int:
+        """Rendition height in pixels (settings.EXPORT_RENDITION_HEIGHT)"""
+        return max(1, getattr(settings, 'EXPORT_RENDITION_HEIGHT', 300))
+    
+    @classmethod
+    def get_export_rendition_path(cls, original_path: str) -> Optional[str]:
+        """
+        Get the export rendition path for an original image path.
+        
+        Returns:
+            Rendition path (e.g., 'adarshimg/ABCDE12345/14325123456101_export.jpg')
+            or None if original_path is invalid
+        """
+        if not original_path or original_path in ['NOT_FOUND', '', 'PENDING']:
+            return None
+        if original_path.startswith('PENDING:'):
+            return None
+        
+        base_name, _ = os.path.splitext(original_path)
+        return f"{base_name}{cls.EXPORT_RENDITION_SUFFIX}.jpg"
+    
+    @classmethod
+    def generate_export_rendition(cls, image_bytes: bytes) -> Optional[bytes]:
+        """
+        Build the export rendition from image bytes.
+        
+        Returns:
+            JPEG bytes or None if the image is empty or can't be decoded
+        """
+        if not image_bytes or len(image_bytes) < 100:
+            return None
+        try:
+            from PIL import Image
+            
+            return cls._encode_export_rendition(Image.open(BytesIO(image_bytes)), cls.export_rendition_height())
+        except Exception:
+            return None
+    
+    @classmethod
+    def _encode_export_rendition(cls, img, height: int) -> bytes:
+        """
+        Scale an opened PIL image down to height (never up), add the 1px
+        black frame used in DOCX exports and encode it as JPEG.
+        """
+        from PIL import Image, ImageOps
+        
+        if img.height > height:
+            width = max(1, round(img.width * height / img.height))
+            img.draft(None, (width, height))  # Reduced-scale JPEG decode (no-op once loaded)
+            img = cls._flatten_to_rgb(img)
+            img = img.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=2.0)  # Same fast pre-reduce as Image.thumbnail
+        else:
+            img = cls._flatten_to_rgb(img)
+        
+        img = ImageOps.expand(img, border=1, fill='black')
+        
+        output = BytesIO()
+        img.save(output, format='JPEG', quality=cls.EXPORT_RENDITION_QUALITY)
+        return output.getvalue()
+    
+    @classmethod
+    def save_export_rendition_for(cls, image_path: str, rendition_bytes: Optional[bytes]) -> Optional[str]:
+        """Save pre-generated rendition bytes next to an already saved image"""
+        rendition_path = cls.get_export_rendition_path(image_path)
+        if not rendition_bytes or not rendition_path:
+            return None
+        try:
+            if default_storage.exists(rendition_path):
+                return rendition_path  # Image is shared and already has one
+            return default_storage.save(rendition_path, ContentFile(rendition_bytes))
+        except Exception:
+            return None
+    
+    @classmethod
+    def warm_export_rendition(cls, image_path: str, image_bytes: bytes) -> Optional[str]:
+        """Build and save the rendition for a just-saved image unless it already has one"""
+        rendition_path = cls.get_export_rendition_path(image_path)
+        if not rendition_path:
+            return None
+        try:
+            if default_storage.exists(rendition_path):
+                return rendition_path
+        except Exception:
+            return None
+        return cls.save_export_rendition_for(image_path, cls.generate_export_rendition(image_bytes))
+    
+    @classmethod
+    def get_export_rendition(cls, image_path: str) -> bytes:
+        """
+        Export rendition bytes for an image, built and cached on a miss or
+        when the cached copy is older than the image.
+        
+        Raises:
+            FileNotFoundError: The image does not exist
+            ValueError: The image can't be decoded
+        """
+        rendition_path = cls.get_export_rendition_path(image_path)
+        if not rendition_path:
+            raise FileNotFoundError(image_path)
+        
+        image_mtime = cls._modified_time(image_path)
+        if image_mtime is None and not default_storage.exists(image_path):
+            raise FileNotFoundError(image_path)
+        
+        try:
+            rendition_mtime = cls._modified_time(rendition_path)
+            if image_mtime is None or rendition_mtime is None or rendition_mtime >= image_mtime:
+                with default_storage.open(rendition_path, 'rb') as f:
+                    return f.read()
+            default_storage.delete(rendition_path)  # Stale: the image was replaced in place
+        except (FileNotFoundError, OSError):
+            pass
+        
+        with default_storage.open(image_path, 'rb') as f:
+            rendition_bytes = cls.generate_export_rendition(f.read())
+        if rendition_bytes is None:
+            raise ValueError('Image data is empty or could not be decoded')
+        
+        try:
+            saved_path = default_storage.save(rendition_path, ContentFile(rendition_bytes))
+            if saved_path != rendition_path:
+                default_storage.delete(saved_path)  # A concurrent export saved it first
+        except Exception:
+            pass  # Cache write is best effort
+        return rendition_bytes
+    
+    # Renditions prepared ahead of the DOCX writer (bounds the bytes held in memory)
+    EXPORT_PREFETCH_WINDOW = 32
+    
+    @classmethod
+    def get_export_pool(cls) -> Optional[ThreadPoolExecutor]:
+        """
+        Shared thread pool for preparing export renditions.
+        
+        Threads are enough here: the work is storage reads plus Pillow
+        decode/resize/encode, which release the GIL. Sized by
+        settings.EXPORT_IMAGE_WORKERS; returns None when disabled (0 or 1).
+        """
+        global _export_pool
+        
+        workers = getattr(settings, 'EXPORT_IMAGE_WORKERS', 0)
+        if workers <= 1:
+            return None
+        
+        if _export_pool is None:
+            _export_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export-image')
+        return _export_pool
+    
+    @classmethod
+    def iter_export_renditions(cls, image_paths: Iterable[str]) -> Iterator[Tuple[str, Union[bytes, Exception]]]:
+        """
+        Yield (path, rendition bytes) for each path, in order. If a rendition
+        can't be produced the exception (see get_export_rendition) is yielded
+        in place of the bytes.
+        
+        With the export pool, up to EXPORT_PREFETCH_WINDOW renditions are
+        prepared ahead of the consumer, so image work runs in parallel with
+        the (serial) document writer.
+        """
+        pool = cls.get_export_pool()
+        if pool is None:
+            for path in image_paths:
+                yield path, cls._export_rendition_or_error(path)
+            return
+        
+        pending = deque()
+        try:
+            for path in image_paths:
+                pending.append((path, pool.submit(cls._export_rendition_or_error, path)))
+                if len(pending) >= cls.EXPORT_PREFETCH_WINDOW:
+                    done_path, future = pending.popleft()
+                    yield done_path, future.result()
+            while pending:
+                done_path, future = pending.popleft()
+                yield done_path, future.result()
+        finally:
+            # Consumer stopped early (client gone, writer error) - drop queued work
+            for _, future in pending:
+                future.cancel()
+    
+    @classmethod
+    def _export_rendition_or_error(cls, image_path: str) -> Union[bytes, Exception]:
+        try:
+            return cls.get_export_rendition(image_path)
+        except Exception as e:
+            return e
+    
+    @staticmethod
+    def _modified_time(path: str):
+        """
+        Storage modification time of path, or None if the storage backend
+        can't report one. Raises FileNotFoundError/OSError if path is missing.
+        """
+        try:
+            return default_storage.get_modified_time(path)
+        except NotImplementedError:
+            return None
+    
+    # ==================== PARALLEL IMAGE PROCESSING ====================
+    
+    # ZIP members handed to a pool worker per task (amortizes IPC overhead)
+    POOL_CHUNK_SIZE = 8
+    # Max photos queued/finished but not yet collected by the row matcher
+    # (bounds the re-encoded bytes held in memory)
+    POOL_WINDOW = 128
+    
+    @classmethod
+    def get_image_pool(cls) -> Optional[ProcessPoolExecutor]:
+        """
+        Shared process pool for validating and thumbnailing uploaded photos.
+        
+        Sized by settings.IMPORT_IMAGE_WORKERS. Only processes that called
+        enable_image_pool() (the import worker) get one - web workers must not
+        fork a pool per request. Returns None otherwise, or when the pool is
+        disabled (0 or 1 workers), so callers fall back to inline processing.
+        """
+        global _image_pool
+        
+        workers = getattr(settings, 'IMPORT_IMAGE_WORKERS', 0)
+        if not _image_pool_enabled or workers <= 1:
+            return None
+        
+        # A crashed worker breaks the executor for good - start a fresh one
+        if _image_pool is not None and getattr(_image_pool, '_broken', False):
+            _image_pool.shutdown(wait=False, cancel_futures=True)
+            _image_pool = None
+        
+        if _image_pool is None:
+            _image_pool = ProcessPoolExecutor(max_workers=workers)
+        return _image_pool
+    
+    @staticmethod
+    def enable_image_pool():
+        """Allow get_image_pool() in this process (called by run_import_worker)"""
+        global _image_pool_enabled
+        _image_pool_enabled = True
+    
+    @classmethod
+    def submit_zip_members(
+        cls,
+        pool: ProcessPoolExecutor,
+        zip_path: str,
+        member_names: List[str],
+        fast: bool = False,
+        ingest_policy: Optional[Dict[str, int]] = None
+    ) -> Dict[str, object]:
+        """
+        Queue ZIP members for validation + thumbnailing in the pool.
+        
+        Workers open the archive from zip_path themselves, so image bytes are
+        never pickled across processes.
+        
+        Returns:
+            Dict mapping member name to the Future of its chunk. The future
+            resolves to {member_name: inspect_image() result}.
+        """
+        futures = {}
+        for start in range(0, len(member_names), cls.POOL_CHUNK_SIZE):
+            chunk = member_names[start:start + cls.POOL_CHUNK_SIZE]
+            future = pool.submit(
+                _inspect_zip_members, zip_path, chunk, cls.THUMBNAIL_SIZE, fast, ingest_policy
+            )
+            for name in chunk:
+                futures[name] = future
+        return futures
+    
+    # ==================== DEFERRED FULL VALIDATION ====================
+    
+    @staticmethod
+    def fast_validation_enabled() -> bool:
+        """Whether bulk uploads accept photos on a header-only check"""
+        return getattr(settings, 'IMAGE_FAST_VALIDATION', False)
+    
+    @staticmethod
+    def defer_full_validation(table, checks: List[Dict[str, str]]) -> int:
+        """
+        Record photos that were only header-checked during an import.
+        
+        Args:
+            table: IDCardTable the photos belong to
+            checks: List of {field_name, image_path, reference}
+        
+        Returns:
+            Number of checks queued
+        """
+        if not checks:
+            return 0
+        DeferredImageCheck.objects.bulk_create([
+            DeferredImageCheck(
+                table=table,
+                field_name=check['field_name'],
+                image_path=check['image_path'],
+                reference=(check.get('reference') or '')[:255],
+            )
+            for check in checks
+        ], batch_size=500)
+        return len(checks)
+    
+    # Storage errors tolerated per deferred check before it is left alone
+    DEFERRED_CHECK_MAX_ATTEMPTS = 5
+    
+    @classmethod
+    def run_deferred_checks(cls, limit: int = 100) -> Tuple[int, int]:
+        """
+        Fully decode photos queued by defer_full_validation.
+        
+        Broken photos are deleted and the card field is reset to
+        PENDING:<reference> so the normal re-upload flow can replace them.
+        A check whose photo can't be read from storage is kept, with the
+        error recorded, and retried on a later pass.
+        
+        Returns:
+            Tuple of (photos_checked, photos_broken)
+        """
+        checks = list(
+            DeferredImageCheck.objects
+            .filter(attempts__lt=cls.DEFERRED_CHECK_MAX_ATTEMPTS)
+            .order_by('attempts', 'id')[:limit]
+        )
+        done = []
+        broken = 0
+        
+        for check in checks:
+            try:
+                with default_storage.open(check.image_path, 'rb') as f:
+                    image_bytes = f.read()
+            except FileNotFoundError:
+                done.append(check.id)  # Photo was replaced or removed since the import
+                continue
+            except OSError as e:
+                DeferredImageCheck.objects.filter(pk=check.pk).update(
+                    attempts=F('attempts') + 1, last_error=str(e)[:255]
+                )
+                continue
+            
+            done.append(check.id)
+            is_valid, _ = cls.validate_image_bytes(image_bytes)
+            if is_valid:
+                continue
+            
+            broken += 1
+            # One check per saved reference - identical photos share a path,
+            # so reset a single card and drop a single reference. The field
+            # name comes from the sheet, so it is passed as a key, not a lookup.
+            card = (
+                IDCard.objects.select_related('table')
+                .alias(checked_value=KeyTransform(check.field_name, 'field_data'))
+                .filter(table_id=check.table_id, checked_value=check.image_path)
+                .first()
+            )
+            if card:
+                card.field_data[check.field_name] = f'PENDING:{check.reference}' if check.reference else ''
+                card.save(update_fields=['field_data', 'updated_at'])
+                cls.delete_image(check.image_path)
+        
+        DeferredImageCheck.objects.filter(id__in=done).delete()
+        return len(done), broken
+
+
+# Process pool shared by all imports in this process (created on first use)
+_image_pool = None
+_image_pool_enabled = False
+
+# Thread pool shared by all exports in this process (created on first use)
+_export_pool = None
+
+
+def _inspect_zip_members(
+    zip_path: str,
+    member_names: List[str],
+    thumbnail_size: tuple,
+    fast: bool = False,
+    ingest_policy: Optional[Dict[str, int]] = None
+) -> Dict[str, tuple]:
+    """Pool worker: validate, thumbnail and render a chunk of ZIP members"""
+    results = {}
+    with zipfile.ZipFile(zip_path, 'r') as zf:
+        for name in member_names:
+            try:
+                image_bytes = zf.read(name)
+            except Exception as e:
+                results[name] = (False, str(e), None, None, None)
+                continue
+            results[name] = ImageService.inspect_image(image_bytes, thumbnail_size, fast, ingest_policy)
+    return results
@@ -1,21 +1,24 @@
 """
 Import Service Module
-Contains: Bulk upload from Excel/CSV with ZIP photo matching
+Contains: Bulk upload from Excel/CSV with ZIP photo matching, background import jobs
 """
 import os
 import re
 import json
+import uuid
 import zipfile
-from io import BytesIO
+from collections import deque
+from contextlib import ExitStack
+from io import BytesIO, TextIOWrapper
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable, Iterable, Iterator
 
 from django.shortcuts import get_object_or_404
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
+from django.utils import timezone
 
-from ..models import IDCardTable, IDCard
-from .base import BaseService, ServiceResult
+from ..models import IDCardTable, IDCard, ImportJob
+from .base import BaseService, ServiceResult, StreamingZipIndex, StreamingSheetReader, BulkCardWriter
 from .image_service import ImageService
 
 
@@ -32,13 +35,17 @@ class ImportService(BaseService):
     - Multiple image fields support
     """
     
+    # Rows between progress callbacks during bulk_upload
+    PROGRESS_EVERY = 50
+    
     @classmethod
     def bulk_upload(
         cls,
         table_id: int,
         data_file,
         zip_files: Dict[str, Any] = None,
-        zip_field_names: List[str] = None
+        zip_field_names: List[str] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> ServiceResult:
         """
         Bulk upload ID Cards from Excel/CSV with optional photo ZIPs.
@@ -48,10 +55,14 @@ class ImportService(BaseService):
             data_file: Uploaded Excel/CSV file
             zip_files: Dict mapping field names to uploaded ZIP files
             zip_field_names: List of field names that have ZIP files
+            progress_callback: Optional callable receiving a dict of counters
+                (total_rows, rows_processed, cards_created, photos_matched,
+                error_count) every PROGRESS_EVERY rows
         
         Returns:
             ServiceResult with upload statistics
         """
+        file_stack = None
         try:
             table = get_object_or_404(IDCardTable, id=table_id)
             client = table.group.client
@@ -63,18 +74,20 @@ class ImportService(BaseService):
             text_fields = [f['name'] for f in table.fields if not cls.is_image_field(f)]
             image_fields = cls.get_image_field_names(table.fields)
             
-            # Extract photos from ZIP files
-            zip_photos_by_field = cls._extract_zip_photos(
+            # Index photo ZIPs (members are read on demand while matching rows).
+            # The stack also keeps the spreadsheet open while its rows stream in.
+            file_stack = ExitStack()
+            zip_photos_by_field = cls._open_zip_indexes(
+                file_stack,
                 zip_files or {}, 
-                zip_field_names or [],
-                image_fields
+                zip_field_names or []
             )
             
             # Parse data file
             if file_name.endswith(('.xlsx', '.xls')):
-                parse_result = cls._parse_excel(data_file, text_fields, image_fields)
+                parse_result = cls._parse_excel(data_file, text_fields, image_fields, file_stack)
             elif file_name.endswith('.csv'):
-                parse_result = cls._parse_csv(data_file, text_fields, image_fields)
+                parse_result = cls._parse_csv(data_file, text_fields, image_fields, file_stack)
             else:
                 return ServiceResult(
                     success=False,
@@ -84,37 +97,59 @@ class ImportService(BaseService):
             if not parse_result['success']:
                 return ServiceResult(success=False, message=parse_result['message'])
             
-            # Create cards
-            cards_created = 0
+            # Create cards (written in bulk_create chunks)
             total_photos_matched = 0
             errors = []
-            
-            for row_num, row_data in enumerate(parse_result['rows'], start=2):
-                try:
-                    field_data = row_data['field_data']
-                    image_refs = row_data.get('image_refs', {})
-                    
-                    # Match and save photos
-                    photos_matched = cls._match_and_save_photos(
-                        field_data,
-                        image_refs,
-                        image_fields,
-                        zip_photos_by_field,
-                        client_image_folder,
-                        cards_created
-                    )
-                    total_photos_matched += photos_matched
+            deferred_checks = []  # Photos accepted by the fast header check
+            total_rows = parse_result.get('total_rows')  # Estimate until all rows are read
+            writer = BulkCardWriter(table, errors)
+            
+            def report_progress(rows_processed):
+                if progress_callback:
+                    progress_callback({
+                        'total_rows': total_rows,
+                        'rows_processed': rows_processed,
+                        'cards_created': writer.created,
+                        'photos_matched': total_photos_matched,
+                        'error_count': len(errors),
+                    })
+            
+            report_progress(0)
+            
+            rows_processed = 0
+            rows = cls._prefetch_row_photos(parse_result['rows'], zip_photos_by_field)
+            with writer:
+                for row_num, row_data in enumerate(rows, start=2):
+                    rows_processed += 1
+                    if row_num > 2 and (row_num - 2) % cls.PROGRESS_EVERY == 0:
+                        report_progress(row_num - 2)
                     
-                    # Create the card
-                    IDCard.objects.create(
-                        table=table,
-                        field_data=field_data,
-                        status='pending'
-                    )
-                    cards_created += 1
-                    
-                except Exception as e:
-                    errors.append(f'Row {row_num}: {str(e)}')
+                    try:
+                        field_data = row_data['field_data']
+                        image_refs = row_data.get('image_refs', {})
+                        
+                        # Match and save photos
+                        photos_matched = cls._match_and_save_photos(
+                            field_data,
+                            image_refs,
+                            image_fields,
+                            zip_photos_by_field,
+                            client_image_folder,
+                            writer.queued,
+                            deferred_checks
+                        )
+                        total_photos_matched += photos_matched
+                        
+                        # Queue the card
+                        writer.add(row_num, field_data)
+                        
+                    except Exception as e:
+                        errors.append(f'Row {row_num}: {str(e)}')
+            
+            cards_created = writer.created
+            total_rows = rows_processed
+            ImageService.defer_full_validation(table, deferred_checks)
+            report_progress(rows_processed)
             
             # Build result message
             photo_msg = f" with {total_photos_matched} photos matched" if total_photos_matched > 0 else ""
@@ -141,49 +176,36 @@ class ImportService(BaseService):
             )
         except Exception as e:
             return ServiceResult(success=False, message=str(e))
+        finally:
+            if file_stack is not None:
+                file_stack.close()
     
     @classmethod
-    def _extract_zip_photos(
+    def _open_zip_indexes(
         cls,
+        zip_stack: ExitStack,
         zip_files: Dict[str, Any],
-        zip_field_names: List[str],
-        image_fields: List[str]
-    ) -> Dict[str, Dict[str, Any]]:
-        """Extract photos from ZIP files into memory"""
+        zip_field_names: List[str]
+    ) -> Dict[str, StreamingZipIndex]:
+        """
+        Open a StreamingZipIndex for each image field's ZIP.
+        
+        Only the archive directory is loaded; image bytes are read when a
+        row matches. Validation and thumbnails run in the image pool when
+        it is enabled. The indexes stay open until zip_stack is closed.
+        """
         zip_photos_by_field = {}
+        image_pool = ImageService.get_image_pool()
         
         for field_name in zip_field_names:
             zip_key = f'photos_zip_{field_name}'
             if zip_key not in zip_files:
                 continue
             
-            zip_file = zip_files[zip_key]
-            zip_photos_by_field[field_name] = {}
-            
             try:
-                zip_content = zip_file.read()
-                with zipfile.ZipFile(BytesIO(zip_content), 'r') as zf:
-                    for zip_info in zf.infolist():
-                        if zip_info.is_dir():
-                            continue
-                        
-                        base_name = os.path.basename(zip_info.filename)
-                        name_without_ext = os.path.splitext(base_name)[0]
-                        ext = os.path.splitext(base_name)[1].lower()
-                        
-                        if ext in cls.VALID_IMAGE_EXTENSIONS:
-                            try:
-                                image_bytes = zf.read(zip_info.filename)
-                                is_valid, _ = ImageService.validate_image_bytes(image_bytes)
-                                
-                                if is_valid:
-                                    # Store with uppercase key for case-insensitive matching
-                                    zip_photos_by_field[field_name][name_without_ext.upper()] = {
-                                        'bytes': image_bytes,
-                                        'ext': ext
-                                    }
-                            except Exception:
-                                continue
+                zip_photos_by_field[field_name] = zip_stack.enter_context(
+                    StreamingZipIndex(zip_files[zip_key], image_pool)
+                )
             except Exception:
                 pass
         
@@ -194,95 +216,57 @@ class ImportService(BaseService):
         cls,
         data_file,
         text_fields: List[str],
-        image_fields: List[str]
+        image_fields: List[str],
+        file_stack: ExitStack
     ) -> Dict[str, Any]:
-        """Parse Excel file (XLSX or XLS)"""
+        """
+        Parse Excel file (XLSX or XLS).
+        
+        The sheet stays open on file_stack; rows are read lazily while the
+        returned 'rows' generator is consumed.
+        """
         try:
-            import openpyxl
-            
-            file_content = data_file.read()
-            
-            if len(file_content) < 4:
-                return {'success': False, 'message': 'File is too small or empty.'}
-            
-            # Detect format
-            magic_bytes = file_content[:4]
-            is_zip = magic_bytes[:2] == b'PK'
-            is_old_xls = (magic_bytes[0] == 0xD0 and magic_bytes[1] == 0xCF)
-            
-            headers = []
-            rows_data = []
-            
-            if is_zip or data_file.name.lower().endswith('.xlsx'):
-                # XLSX format
-                try:
-                    wb = openpyxl.load_workbook(BytesIO(file_content))
-                    ws = wb.active
-                    
-                    for cell in ws[1]:
-                        if cell.value:
-                            headers.append(str(cell.value).strip())
-                    
-                    for row in ws.iter_rows(min_row=2, values_only=True):
-                        rows_data.append(row)
-                except Exception as e:
-                    if not is_zip:
-                        is_old_xls = True
-                    else:
-                        return {'success': False, 'message': f'Error reading XLSX: {str(e)}'}
-            
-            if is_old_xls or (data_file.name.lower().endswith('.xls') and not headers):
-                # XLS format
-                try:
-                    import xlrd
-                    wb = xlrd.open_workbook(file_contents=file_content)
-                    ws = wb.sheet_by_index(0)
-                    
-                    headers = []
-                    for col_idx in range(ws.ncols):
-                        cell_value = ws.cell_value(0, col_idx)
-                        if cell_value:
-                            headers.append(str(cell_value).strip())
-                    
-                    rows_data = []
-                    for row_idx in range(1, ws.nrows):
-                        row = []
-                        for col_idx in range(ws.ncols):
-                            row.append(ws.cell_value(row_idx, col_idx))
-                        rows_data.append(tuple(row))
-                except ImportError:
-                    return {
-                        'success': False,
-                        'message': 'xlrd library not installed for .xls support'
-                    }
-                except Exception as e:
-                    return {'success': False, 'message': f'Error reading XLS: {str(e)}'}
-            
-            if not headers:
-                return {'success': False, 'message': 'Could not read headers from file.'}
-            
-            return cls._process_parsed_data(headers, rows_data, text_fields, image_fields)
-            
+            sheet = file_stack.enter_context(StreamingSheetReader(data_file))
+        except ImportError:
+            return {
+                'success': False,
+                'message': 'xlrd library not installed for .xls support'
+            }
         except Exception as e:
-            return {'success': False, 'message': str(e)}
+            return {'success': False, 'message': f'Error reading Excel file: {str(e)}'}
+        
+        if not sheet.headers:
+            return {'success': False, 'message': 'Could not read headers from file.'}
+        
+        return cls._process_parsed_data(
+            sheet.headers, sheet.rows(), text_fields, image_fields, total_rows=sheet.row_count
+        )
     
     @classmethod
     def _parse_csv(
         cls,
         data_file,
         text_fields: List[str],
-        image_fields: List[str]
+        image_fields: List[str],
+        file_stack: ExitStack
     ) -> Dict[str, Any]:
-        """Parse CSV file"""
+        """
+        Parse CSV file.
+        
+        The file is decoded through a TextIOWrapper kept on file_stack, so
+        rows are read lazily while the returned 'rows' generator is consumed.
+        """
         try:
             import csv
-            from io import StringIO
             
-            content = data_file.read().decode('utf-8-sig')
-            reader = csv.DictReader(StringIO(content))
+            data_file.seek(0)
+            text = TextIOWrapper(data_file, encoding='utf-8-sig', newline='')
+            # Detach on exit so the wrapper never closes the upload itself
+            file_stack.callback(text.detach)
+            reader = csv.DictReader(text)
             
             headers = reader.fieldnames or []
-            rows_data = [(tuple(row.get(h, '') for h in headers)) for row in reader]
+            rows_data = (tuple(row.get(h, '') for h in headers) for row in reader)
             
             return cls._process_parsed_data(headers, rows_data, text_fields, image_fields)
             
@@ -293,11 +277,17 @@ class ImportService(BaseService):
     def _process_parsed_data(
         cls,
         headers: List[str],
-        rows_data: List[tuple],
+        rows_data: Iterable[tuple],
         text_fields: List[str],
-        image_fields: List[str]
+        image_fields: List[str],
+        total_rows: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Process parsed data to build field mappings"""
+        """
+        Build field mappings from the headers.
+        
+        'rows' in the result is a generator - each row is converted only when
+        the caller consumes it, so large sheets are never held in memory.
+        """
         
         # Map headers to fields
         header_to_field = {}
@@ -335,42 +325,43 @@ class ImportService(BaseService):
                 'message': f'No matching columns found! Expected: {", ".join(text_fields)}'
             }
         
-        # Process rows
-        processed_rows = []
-        for row in rows_data:
-            # Skip empty rows
-            if all(cell is None or str(cell).strip() == '' for cell in row):
-                continue
-            
-            field_data = {}
-            image_refs = {}
-            
-            # Extract text field values
-            for col_idx, field_name in header_to_field.items():
-                if col_idx < len(row):
-                    value = cls._convert_cell_value(row[col_idx], field_name)
-                    field_data[field_name] = value
-                else:
-                    field_data[field_name] = ''
-            
-            # Extract image reference values
-            for img_field, col_idx in image_ref_columns.items():
-                if col_idx < len(row):
-                    value = row[col_idx]
-                    if value is not None and str(value).strip():
-                        if isinstance(value, float) and value == int(value):
-                            image_refs[img_field] = str(int(value))
-                        else:
-                            image_refs[img_field] = str(value).strip()
-            
-            processed_rows.append({
-                'field_data': field_data,
-                'image_refs': image_refs
-            })
+        # Process rows lazily
+        def iter_rows():
+            for row in rows_data:
+                # Skip empty rows
+                if all(cell is None or str(cell).strip() == '' for cell in row):
+                    continue
+                
+                field_data = {}
+                image_refs = {}
+                
+                # Extract text field values
+                for col_idx, field_name in header_to_field.items():
+                    if col_idx < len(row):
+                        value = cls._convert_cell_value(row[col_idx], field_name)
+                        field_data[field_name] = value
+                    else:
+                        field_data[field_name] = ''
+                
+                # Extract image reference values
+                for img_field, col_idx in image_ref_columns.items():
+                    if col_idx < len(row):
+                        value = row[col_idx]
+                        if value is not None and str(value).strip():
+                            if isinstance(value, float) and value == int(value):
+                                image_refs[img_field] = str(int(value))
+                            else:
+                                image_refs[img_field] = str(value).strip()
+                
+                yield {
+                    'field_data': field_data,
+                    'image_refs': image_refs
+                }
         
         return {
             'success': True,
-            'rows': processed_rows,
+            'rows': iter_rows(),
+            'total_rows': total_rows,
             'matched_fields': matched_field_names
         }
     
@@ -405,29 +396,60 @@ class ImportService(BaseService):
         
         return str(value).strip().upper()
     
+    @staticmethod
+    def _prefetch_row_photos(
+        rows: Iterable[Dict[str, Any]],
+        zip_photos_by_field: Dict[str, StreamingZipIndex]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield parsed rows unchanged, reading up to POOL_WINDOW rows ahead so
+        the photos they reference are already in the image pool (in sheet
+        order) when their row is matched.
+        """
+        lookahead = deque()
+        for row in rows:
+            for img_field, photo_ref in row.get('image_refs', {}).items():
+                field_zip_index = zip_photos_by_field.get(img_field)
+                if photo_ref and field_zip_index is not None:
+                    field_zip_index.prefetch(photo_ref)
+            lookahead.append(row)
+            if len(lookahead) > ImageService.POOL_WINDOW:
+                yield lookahead.popleft()
+        while lookahead:
+            yield lookahead.popleft()
+    
     @classmethod
     def _match_and_save_photos(
         cls,
         field_data: Dict[str, Any],
         image_refs: Dict[str, str],
         image_fields: List[str],
-        zip_photos_by_field: Dict[str, Dict[str, Any]],
+        zip_photos_by_field: Dict[str, StreamingZipIndex],
         client_image_folder: str,
-        batch_counter: int
+        batch_counter: int,
+        deferred_checks: Optional[List[Dict[str, str]]] = None
     ) -> int:
-        """Match and save photos from ZIP files"""
+        """
+        Match and save photos from ZIP files.
+        
+        Photos that only passed the fast header check are appended to
+        deferred_checks for the worker's full validation pass.
+        """
         photos_matched = 0
         
         for img_field in image_fields:
             photo_ref = image_refs.get(img_field, '')
-            photo_key = photo_ref.upper() if photo_ref else None
+            photo_key = cls.normalize_image_identifier(photo_ref) if photo_ref else None
+            
+            field_zip_index = zip_photos_by_field.get(img_field)
             
-            field_zip_photos = zip_photos_by_field.get(img_field, {})
+            # Read (and validate) the ZIP member only when this row references it
+            photo_info = None
+            if photo_key and field_zip_index and photo_key in field_zip_index:
+                photo_info = field_zip_index.get_photo(photo_key)
             
-            if photo_key and photo_key in field_zip_photos:
+            if photo_info:
                 try:
-                    photo_info = field_zip_photos[photo_key]
-                    
                     new_filename = ImageService.generate_filename(
                         batch_counter + 1,
                         photo_info['ext']
@@ -435,12 +457,17 @@ class ImportService(BaseService):
                     
                     file_path = f"{client_image_folder}/{new_filename}"
                     
-                    saved_path = default_storage.save(
-                        file_path,
-                        ContentFile(photo_info['bytes'])
-                    )
+                    saved_path, _ = ImageService.store_image(file_path, photo_info['bytes'])
                     
                     field_data[img_field] = saved_path
+                    ImageService.save_thumbnail_for(saved_path, photo_info['thumb_bytes'])
+                    ImageService.save_export_rendition_for(saved_path, photo_info['export_bytes'])
+                    if photo_info['needs_full_check'] and deferred_checks is not None:
+                        deferred_checks.append({
+                            'field_name': img_field,
+                            'image_path': saved_path,
+                            'reference': photo_ref,
+                        })
                     photos_matched += 1
                 except Exception:
                     if photo_ref:
@@ -480,9 +507,9 @@ class ImportService(BaseService):
             
             # Get cards
             if card_ids:
-                cards = IDCard.objects.filter(table=table, id__in=card_ids).order_by('id')
+                cards = IDCard.objects.filter(table=table, id__in=card_ids).select_related('table').order_by('id')
             else:
-                cards = IDCard.objects.filter(table=table).order_by('id')
+                cards = IDCard.objects.filter(table=table).select_related('table').order_by('id')
             
             if not cards.exists():
                 return ServiceResult(success=False, message='No cards found!')
@@ -558,6 +585,11 @@ class ImportService(BaseService):
                     if matched_photo:
                         batch_counter += 1
                         
+                        # Downscale / strip metadata (may switch the extension)
+                        stored_bytes, stored_ext = ImageService.apply_ingest_policy(
+                            matched_photo['bytes'], matched_photo['ext']
+                        )
+                        
                         # Determine if update or new
                         existing_path = None
                         if current_value not in ['NOT_FOUND', 'PENDING'] and '/' in current_value:
@@ -566,22 +598,20 @@ class ImportService(BaseService):
                         if existing_path:
                             new_filename = ImageService.generate_updated_filename(
                                 existing_path, 
-                                matched_photo['ext']
+                                stored_ext
                             )
                             # Delete old
                             ImageService.delete_image(existing_path)
                         else:
                             new_filename = ImageService.generate_filename(
                                 batch_counter,
-                                matched_photo['ext']
+                                stored_ext
                             )
                         
                         file_path = f"{client_image_folder}/{new_filename}"
                         
-                        saved_path = default_storage.save(
-                            file_path,
-                            ContentFile(matched_photo['bytes'])
-                        )
+                        saved_path, _ = ImageService.store_image(file_path, stored_bytes)
+                        ImageService.warm_export_rendition(saved_path, stored_bytes)
                         
                         field_data[img_field] = saved_path
                         card_updated = True
@@ -634,3 +664,214 @@ class ImportService(BaseService):
                 matching_keys.append(ref_name)
         
         return matching_keys
+    
+    # ==================== Background Import Jobs ====================
+    
+    JOB_UPLOAD_FOLDER = 'import_jobs'
+    
+    @classmethod
+    def serialize_job(cls, job: ImportJob) -> Dict[str, Any]:
+        """Serialize ImportJob to dict (used by the progress endpoint)"""
+        progress = None
+        if job.total_rows:
+            progress = round(min(job.rows_processed / job.total_rows, 1) * 100, 1)
+        
+        return {
+            'id': job.id,
+            'table_id': job.table_id,
+            'status': job.status,
+            'status_display': job.get_status_display(),
+            'file_name': job.original_file_name,
+            'total_rows': job.total_rows,
+            'rows_processed': job.rows_processed,
+            'progress': progress,
+            'cards_created': job.cards_created,
+            'photos_matched': job.photos_matched,
+            'error_count': job.error_count,
+            'errors': job.errors,
+            'matched_fields': job.matched_fields,
+            'message': job.message,
+            'is_finished': job.is_finished,
+            'created_at': job.created_at.strftime('%d-%b-%Y %I:%M %p'),
+            'started_at': job.started_at.strftime('%d-%b-%Y %I:%M %p') if job.started_at else None,
+            'finished_at': job.finished_at.strftime('%d-%b-%Y %I:%M %p') if job.finished_at else None,
+        }
+    
+    @classmethod
+    def enqueue_job(
+        cls,
+        table_id: int,
+        data_file,
+        zip_files: Dict[str, Any] = None,
+        user=None
+    ) -> ServiceResult:
+        """
+        Store the uploaded files and queue an ImportJob for the worker.
+        
+        Args:
+            table_id: ID of the target table
+            data_file: Uploaded Excel/CSV file
+            zip_files: Dict mapping image field names to uploaded ZIP files
+            user: User who started the upload
+        
+        Returns:
+            ServiceResult with 'job_id' and serialized 'job'
+        """
+        try:
+            table = get_object_or_404(IDCardTable, id=table_id)
+            
+            file_name = data_file.name
+            if not file_name.lower().endswith(('.xlsx', '.xls', '.csv')):
+                return ServiceResult(
+                    success=False,
+                    message='Invalid file format! Please upload .xlsx, .xls, or .csv file.'
+                )
+            
+            # Copy uploads out of the request temp files (streamed in chunks)
+            folder = f"{cls.JOB_UPLOAD_FOLDER}/{uuid.uuid4().hex}"
+            data_path = default_storage.save(f"{folder}/{os.path.basename(file_name)}", data_file)
+            
+            zip_paths = {}
+            for field_name, zip_file in (zip_files or {}).items():
+                zip_paths[field_name] = default_storage.save(
+                    f"{folder}/{cls.clean_filename_for_export(field_name) or 'photos'}.zip",
+                    zip_file
+                )
+            
+            job = ImportJob.objects.create(
+                table=table,
+                created_by=user if user is not None and user.is_authenticated else None,
+                data_file=data_path,
+                original_file_name=file_name,
+                zip_files=zip_paths,
+                message='Waiting for import worker...'
+            )
+            
+            return ServiceResult(
+                success=True,
+                message='Upload received! Cards are being imported in the background.',
+                data={'job_id': job.id, 'job': cls.serialize_job(job)}
+            )
+            
+        except Exception as e:
+            return ServiceResult(success=False, message=str(e))
+    
+    @classmethod
+    def get_job(cls, job_id: int) -> ServiceResult:
+        """Get progress of an import job"""
+        try:
+            job = get_object_or_404(ImportJob, id=job_id)
+            return ServiceResult(success=True, data={'job': cls.serialize_job(job)})
+        except Exception as e:
+            return ServiceResult(success=False, message=str(e))
+    
+    @classmethod
+    def claim_next_job(cls) -> Optional[ImportJob]:
+        """
+        Atomically claim the oldest queued job.
+        
+        Uses a conditional UPDATE so several workers can poll the same
+        database without processing a job twice.
+        """
+        queued_ids = ImportJob.objects.filter(
+            status='queued'
+        ).order_by('created_at', 'id').values_list('id', flat=True)[:10]
+        
+        for job_id in queued_ids:
+            claimed = ImportJob.objects.filter(id=job_id, status='queued').update(
+                status='running',
+                started_at=timezone.now(),
+                updated_at=timezone.now(),
+                message='Importing...'
+            )
+            if claimed:
+                return ImportJob.objects.get(id=job_id)
+        
+        return None
+    
+    @classmethod
+    def fail_stale_jobs(cls, stale_after: timedelta) -> int:
+        """
+        Mark 'running' jobs that stopped reporting progress as failed.
+        
+        They are not re-queued: rows are committed chunk by chunk, so
+        running the file again from row 1 would import the cards (and
+        photos) written before the interruption a second time.
+        """
+        stale_jobs = ImportJob.objects.filter(
+            status='running',
+            updated_at__lt=timezone.now() - stale_after
+        )
+        failed = 0
+        for job in stale_jobs:
+            updated = ImportJob.objects.filter(id=job.id, status='running').update(
+                status='failed',
+                finished_at=timezone.now(),
+                updated_at=timezone.now(),
+                message=(
+                    f'Import interrupted after {job.rows_processed} row(s). Cards imported before '
+                    f'the interruption were kept - upload only the remaining rows again.'
+                )
+            )
+            if updated:
+                failed += 1
+                cls._delete_job_files(job)
+        return failed
+    
+    @classmethod
+    def run_job(cls, job: ImportJob) -> ServiceResult:
+        """
+        Process a claimed import job with bulk_upload, recording progress
+        on the job row as rows are imported.
+        """
+        def save_progress(progress: Dict[str, Any]):
+            ImportJob.objects.filter(id=job.id).update(updated_at=timezone.now(), **progress)
+        
+        opened_files = []
+        try:
+            data_file = default_storage.open(job.data_file, 'rb')
+            opened_files.append(data_file)
+            
+            zip_files = {}
+            for field_name, zip_path in (job.zip_files or {}).items():
+                zip_file = default_storage.open(zip_path, 'rb')
+                opened_files.append(zip_file)
+                zip_files[f'photos_zip_{field_name}'] = zip_file
+            
+            result = cls.bulk_upload(
+                job.table_id,
+                data_file,
+                zip_files=zip_files,
+                zip_field_names=list((job.zip_files or {}).keys()),
+                progress_callback=save_progress
+            )
+        except Exception as e:
+            result = ServiceResult(success=False, message=str(e))
+        finally:
+            for f in opened_files:
+                f.close()
+        
+        job.refresh_from_db()
+        job.status = 'completed' if result.success else 'failed'
+        job.message = result.message
+        job.finished_at = timezone.now()
+        if result.success:
+            job.cards_created = result.data.get('cards_created', 0)
+            job.photos_matched = result.data.get('photos_matched', 0)
+            job.matched_fields = result.data.get('matched_fields', [])
+            job.errors = result.data.get('errors', [])
+            job.error_count = result.data.get('error_count', 0)
+        job.save()
+        
+        cls._delete_job_files(job)
+        return result
+    
+    @classmethod
+    def _delete_job_files(cls, job: ImportJob):
+        """Remove a finished job's uploaded source files from storage"""
+        for path in [job.data_file, *(job.zip_files or {}).values()]:
+            try:
+                if path and default_storage.exists(path):
+                    default_storage.delete(path)
+            except Exception:
+                pass
@@ -0,0 +1,209 @@
+"""
+Search Service Module
+Contains: Database search index for ID cards (IDCard.search_* columns)
+
+IDCard.search_text holds every text field value uppercased, and
+search_name / search_address / search_mobile only the values of that
+category's fields (see models.build_search_document). They are kept up to
+date on save / bulk_create and indexed per database:
+- PostgreSQL: pg_trgm GIN index per column, so `LIKE '%QUERY%'` uses it
+- SQLite: one FTS5 table (trigram tokenizer) over all columns, synced by
+  triggers; category searches use an FTS column filter
+- Anything else (or if the above can't be created): plain LIKE scan
+"""
+from typing import Dict
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from ..models import IDCard, SEARCH_FIELD_CATEGORIES, build_search_document
+from .base import BaseService
+
+
+class SearchService(BaseService):
+    """
+    Service for the card search index.
+
+    Responsibilities:
+    - Create / drop the database-specific index (used by the migration)
+    - Rebuild search_text and the index (`rebuild_search_index` command)
+    - Apply a search query to an IDCard queryset
+    """
+
+    # Search filter ('all' or a SEARCH_FIELD_CATEGORIES key) -> IDCard column
+    SEARCH_COLUMNS = {
+        'all': 'search_text',
+        **{category: f'search_{category}' for category in SEARCH_FIELD_CATEGORIES},
+    }
+    SQLITE_FTS_TABLE = 'core_idcard_search'
+    SQLITE_FTS_TRIGGERS = ('core_idcard_search_ai', 'core_idcard_search_ad', 'core_idcard_search_au')
+    MIN_INDEXED_QUERY = 3  # Trigram indexes can't help shorter queries
+
+    _fts_ready: Dict[str, bool] = {}  # Per database alias
+
+    # ==================== INDEX MANAGEMENT ====================
+
+    @classmethod
+    def install_index(cls, conn=None) -> str:
+        """
+        Create the search index for this database (safe to run again).
+
+        Returns:
+            'trigram', 'fts5' or 'none' (LIKE scan only)
+        """
+        conn = conn or connection
+        cls._fts_ready.pop(conn.alias, None)
+
+        with conn.cursor() as cursor:
+            existing = {
+                column.name for column in
+                conn.introspection.get_table_description(cursor, IDCard._meta.db_table)
+            }
+        if not set(cls.SEARCH_COLUMNS.values()) <= existing:
+            return 'none'  # Earlier migration state: columns are added later
+
+        if conn.vendor == 'postgresql':
+            try:
+                with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+                    cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+                    for column in cls.SEARCH_COLUMNS.values():
+                        cursor.execute(
+                            f'CREATE INDEX IF NOT EXISTS {cls._pg_index_name(column)} '
+                            f'ON core_idcard USING gin ({column} gin_trgm_ops)'
+                        )
+                return 'trigram'
+            except Exception:
+                return 'none'  # pg_trgm not available to this database user
+
+        if conn.vendor == 'sqlite':
+            if cls.sqlite_fts_ready(conn):
+                return 'fts5'
+            cls._fts_ready.pop(conn.alias, None)
+
+            table = cls.SQLITE_FTS_TABLE
+            columns = ', '.join(cls.SEARCH_COLUMNS.values())
+            new_values = ', '.join(f'new.{column}' for column in cls.SEARCH_COLUMNS.values())
+            old_values = ', '.join(f'old.{column}' for column in cls.SEARCH_COLUMNS.values())
+            try:
+                with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+                    cursor.execute(
+                        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+                        f"{columns}, content='core_idcard', content_rowid='id', tokenize='trigram')"
+                    )
+                    cursor.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON core_idcard BEGIN "
+                        f"INSERT INTO {table}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+                    )
+                    cursor.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON core_idcard BEGIN "
+                        f"INSERT INTO {table}({table}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+                    )
+                    cursor.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {columns} ON core_idcard BEGIN "
+                        f"INSERT INTO {table}({table}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+                        f"INSERT INTO {table}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+                    )
+                    cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+                return 'fts5'
+            except Exception:
+                return 'none'  # SQLite built without FTS5 / trigram tokenizer (< 3.34)
+
+        return 'none'
+
+    @classmethod
+    def drop_index(cls, conn=None):
+        """Remove the database-specific search index"""
+        conn = conn or connection
+        cls._fts_ready.pop(conn.alias, None)
+
+        with conn.cursor() as cursor:
+            if conn.vendor == 'postgresql':
+                for column in cls.SEARCH_COLUMNS.values():
+                    cursor.execute(f'DROP INDEX IF EXISTS {cls._pg_index_name(column)}')
+            elif conn.vendor == 'sqlite':
+                for trigger in cls.SQLITE_FTS_TRIGGERS:
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+                cursor.execute(f'DROP TABLE IF EXISTS {cls.SQLITE_FTS_TABLE}')
+
+    @classmethod
+    def refresh_search_text(cls, batch_size: int = 1000) -> int:
+        """
+        Recompute the IDCard search columns from field_data for every card.
+
+        Returns:
+            Number of cards whose search text changed
+        """
+        columns = list(cls.SEARCH_COLUMNS.values())
+        changed = []
+        updated = 0
+        cards = IDCard.objects.select_related('table').order_by('id').only(
+            'id', 'field_data', 'table__fields', *columns
+        )
+
+        for card in cards.iterator(chunk_size=batch_size):
+            document = build_search_document(card.field_data, card.table.fields)
+            if any(getattr(card, column) != text for column, text in document.items()):
+                for column, text in document.items():
+                    setattr(card, column, text)
+                changed.append(card)
+            if len(changed) >= batch_size:
+                IDCard.objects.bulk_update(changed, columns)
+                updated += len(changed)
+                changed = []
+
+        if changed:
+            IDCard.objects.bulk_update(changed, columns)
+            updated += len(changed)
+        return updated
+
+    @staticmethod
+    def _pg_index_name(column: str) -> str:
+        return f'idcard_{column}_trgm_idx'
+
+    @classmethod
+    def sqlite_fts_ready(cls, conn=None) -> bool:
+        """
+        Whether the FTS5 table and its sync triggers exist. SQLite table
+        rebuilds (some ALTERs) drop the triggers - searches then fall back
+        to LIKE until `rebuild_search_index` is run.
+        """
+        conn = conn or connection
+        if conn.alias not in cls._fts_ready:
+            names = {cls.SQLITE_FTS_TABLE, *cls.SQLITE_FTS_TRIGGERS}
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})",
+                    list(names)
+                )
+                found = {row[0] for row in cursor.fetchall()}
+            cls._fts_ready[conn.alias] = found == names
+        return cls._fts_ready[conn.alias]
+
+    # ==================== QUERYING ====================
+
+    @classmethod
+    def filter_cards(cls, queryset, query: str, category: str = 'all', newest: int = None):
+        """
+        Restrict an IDCard queryset to cards with a value containing query,
+        optionally only in one field category ('name', 'address', 'mobile').
+
+        newest: keep only that many matches with the highest ids. Lets the
+        FTS index stop early on common terms; only valid when the caller
+        orders by -id and applies no further filters.
+        """
+        query_upper = query.strip().upper()
+        column = cls.SEARCH_COLUMNS.get(category, cls.SEARCH_COLUMNS['all'])
+
+        if (connection.vendor == 'sqlite' and len(query_upper) >= cls.MIN_INDEXED_QUERY
+                and cls.sqlite_fts_ready()):
+            # Trigram FTS phrase = substring match, restricted to one column
+            phrase = f'{column} : "' + query_upper.replace('"', '""') + '"'
+            sql = f'SELECT rowid FROM {cls.SQLITE_FTS_TABLE} WHERE {cls.SQLITE_FTS_TABLE} MATCH %s'
+            params = [phrase]
+            if newest:
+                sql += ' ORDER BY rowid DESC LIMIT %s'
+                params.append(newest)
+            return queryset.filter(id__in=RawSQL(sql, params))
+
+        # PostgreSQL: LIKE '%QUERY%' served by the column's trigram GIN index
+        return queryset.filter(**{f'{column}__contains': query_upper})
@@ -0,0 +1,110 @@
+"""
+Stats Service Module
+Contains: Cached super-admin dashboard statistics snapshot
+"""
+import time
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from ..models import Client, Staff, IDCardTable, TableStatusCounter
+from .base import BaseService
+
+
+class StatsService(BaseService):
+    """
+    Service for the dashboard statistics snapshot.
+
+    The snapshot is computed in three aggregate queries (clients, staff and
+    the per-table status counters - never the IDCard table itself) and kept
+    in Django's cache for DASHBOARD_STATS_CACHE_TTL seconds. Card status
+    changes are applied to the cached copy as they happen (see
+    TableStatusCounter.adjust); client / staff counts refresh with the TTL.
+
+    Usage:
+        stats = StatsService.dashboard_snapshot()
+        stats['pending_cards']
+    """
+
+    CACHE_KEY = 'dashboard_stats_snapshot'
+
+    # Card status -> snapshot key (statuses not listed only count towards the total)
+    STATUS_KEYS = {
+        'pending': 'pending_cards',
+        'verified': 'verified_cards',
+        'approved': 'approved_cards',
+        'download': 'downloaded_cards',
+    }
+
+    @classmethod
+    def ttl(cls) -> int:
+        return getattr(settings, 'DASHBOARD_STATS_CACHE_TTL', 60)
+
+    @classmethod
+    def dashboard_snapshot(cls) -> Dict[str, int]:
+        """Cached statistics, computed on a miss"""
+        snapshot = cache.get(cls.CACHE_KEY)
+        if snapshot is None:
+            snapshot = cls.compute_snapshot()
+            cache.set(cls.CACHE_KEY, snapshot, cls.ttl())
+        return {key: value for key, value in snapshot.items() if key != 'computed_at'}
+
+    @classmethod
+    def compute_snapshot(cls) -> Dict[str, int]:
+        """Statistics straight from the database"""
+        clients = Client.objects.aggregate(
+            total_clients=Count('id'),
+            active_clients=Count('id', filter=Q(status='active')),
+        )
+        staff = Staff.objects.aggregate(
+            total_staff=Count('id'),
+            active_staff=Count('id', filter=Q(user__is_active=True)),
+        )
+        cards = cls._card_counts()
+        if cards['tables'] != cards['counters']:
+            # Counters are built lazily; build the missing ones once
+            for table_id in IDCardTable.objects.filter(status_counter__isnull=True).values_list('id', flat=True):
+                TableStatusCounter.rebuild(table_id)
+            cards = cls._card_counts()
+
+        snapshot = {**clients, **staff, 'computed_at': time.time()}
+        snapshot['total_id_cards'] = sum(cards[status] or 0 for status in TableStatusCounter.STATUSES)
+        for status, key in cls.STATUS_KEYS.items():
+            snapshot[key] = cards[status] or 0
+        return snapshot
+
+    @classmethod
+    def apply_card_deltas(cls, deltas: Dict[str, int]):
+        """
+        Apply {status: +/-n} card changes to the cached snapshot. The
+        snapshot keeps its original expiry, so any drift (e.g. from
+        concurrent writers) is corrected at the next recompute.
+        """
+        snapshot = cache.get(cls.CACHE_KEY)
+        if snapshot is None:
+            return
+
+        remaining = cls.ttl() - (time.time() - snapshot['computed_at'])
+        if remaining <= 0:
+            cls.invalidate()
+            return
+
+        for status, n in deltas.items():
+            snapshot['total_id_cards'] += n
+            if status in cls.STATUS_KEYS:
+                snapshot[cls.STATUS_KEYS[status]] += n
+        cache.set(cls.CACHE_KEY, snapshot, remaining)
+
+    @classmethod
+    def invalidate(cls):
+        cache.delete(cls.CACHE_KEY)
+
+    @staticmethod
+    def _card_counts() -> Dict[str, int]:
+        return IDCardTable.objects.aggregate(
+            tables=Count('id'),
+            counters=Count('status_counter'),
+            **{status: Sum(f'status_counter__{status}') for status in TableStatusCounter.STATUSES},
+        )
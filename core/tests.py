@@ -1,3 +1,67 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import User, Client, IDCardGroup, IDCardTable, IDCard, TableStatusCounter
+
+
+class RecentClientUpdatesTests(TestCase):
+    """api_recent_client_updates must not issue queries per client"""
+
+    url = '/api/recent-client-updates/?limit=10'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pw', role='super_admin'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_client(self, index, statuses):
+        user = User.objects.create_user(
+            username=f'client{index}', email=f'client{index}@example.com', role='client'
+        )
+        client = Client.objects.create(user=user, name=f'School {index}', status='active')
+        group = IDCardGroup.objects.create(client=client, name='Students')
+        tables = [
+            IDCardTable.objects.create(group=group, name=f'Class {n}', fields=[{'name': 'NAME', 'type': 'text'}])
+            for n in range(2)
+        ]
+        for i, status in enumerate(statuses):
+            IDCard.objects.create(table=tables[i % 2], field_data={'NAME': f'STUDENT {i}'}, status=status)
+        return client, tables
+
+    def get_clients(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return {row['id']: row for row in response.json()['clients']}
+
+    def test_counts_per_client(self):
+        client, tables = self.add_client(0, ['pending', 'pending', 'verified', 'approved', 'download', 'reprint'])
+
+        row = self.get_clients()[client.id]
+        self.assertEqual(
+            (row['pending'], row['verified'], row['approved'], row['downloaded']), (2, 1, 1, 1)
+        )
+        self.assertEqual(row['first_table_id'], tables[-1].id)
+
+    def test_query_count_is_constant(self):
+        for index in range(2):
+            self.add_client(index, ['pending', 'approved', 'download'])
+        self.get_clients()  # Warm-up: the first request may also write the session
+
+        with self.assertNumQueries(3):  # session, user, aggregate
+            self.get_clients()
+
+        for index in range(2, 8):
+            self.add_client(index, ['pending', 'verified'])
+        with self.assertNumQueries(3):
+            self.assertEqual(len(self.get_clients()), 8)
+
+    def test_missing_counters_are_rebuilt(self):
+        client, _ = self.add_client(0, ['pending', 'approved'])
+        TableStatusCounter.objects.all().delete()
+
+        row = self.get_clients()[client.id]
+        self.assertEqual((row['pending'], row['approved']), (1, 1))
+        self.assertEqual(TableStatusCounter.objects.count(), 2)
@@ -88,10 +88,14 @@ urlpatterns = [
     path('api/table/<int:table_id>/cards/search/', views.api_idcard_search, name='api_idcard_search'),
     path('api/table/<int:table_id>/status-counts/', views.api_table_status_counts, name='api_table_status_counts'),
     path('api/table/<int:table_id>/cards/download-images/', views.api_idcard_download_images, name='api_idcard_download_images'),
+    path('api/table/<int:table_id>/cards/download-images/stream/', views.api_idcard_download_images_stream, name='api_idcard_download_images_stream'),
     path('api/table/<int:table_id>/cards/reupload-images/', views.api_idcard_reupload_images, name='api_idcard_reupload_images'),
     path('api/table/<int:table_id>/cards/download-docx/', views.api_idcard_download_docx, name='api_idcard_download_docx'),
     path('api/table/<int:table_id>/cards/download-xlsx/', views.api_idcard_download_xlsx, name='api_idcard_download_xlsx'),
     
+    # Background Import Job APIs
+    path('api/import-jobs/<int:job_id>/', views.api_import_job_status, name='api_import_job_status'),
+    
     # Settings/Profile APIs (for all user types)
     path('api/profile/', views.api_get_profile, name='api_get_profile'),
     path('api/profile/update/', views.api_update_profile, name='api_update_profile'),
@@ -2,4 +2,5 @@
 Core Utilities Package
 """
 from .email_utils import generate_secure_password, send_welcome_email
+from .json_response import json_dumps, FastJsonResponse, api_response
 default_app_config = "core.apps.CoreConfig"
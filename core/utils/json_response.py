@@ -0,0 +1,85 @@
+"""
+JSON Response Utilities
+Contains: Fast JSON encoding and the shared API response helper
+
+orjson is used when it is installed (5-8x faster than the stdlib
+encoder on card pages); otherwise, or for values orjson rejects (e.g.
+integers over 64 bits), the stdlib encoder with DjangoJSONEncoder is used.
+Bodies of API_GZIP_MIN_BYTES or more are gzipped for clients that accept it.
+"""
+import gzip
+import json
+import re
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+_django_encoder = DjangoJSONEncoder()
+_accepts_gzip = re.compile(r'\bgzip\b')
+
+# Level 1 is ~3.5x faster than 6 on card payloads for about the same size
+GZIP_LEVEL = 1
+
+
+def json_dumps(data) -> bytes:
+    """Encode data as compact UTF-8 JSON (same values as JsonResponse)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data,
+                default=_django_encoder.default,
+                # Datetimes go through DjangoJSONEncoder so they format exactly as before
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+
+
+class FastJsonResponse(HttpResponse):
+    """
+    Drop-in for JsonResponse using json_dumps. Pass the request to allow
+    gzip for large bodies.
+    """
+
+    def __init__(self, data, request=None, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=json_dumps(data), **kwargs)
+
+        if request is not None:
+            self.maybe_gzip(request)
+
+    def maybe_gzip(self, request):
+        """Gzip the body if it is large enough and the client accepts gzip"""
+        min_bytes = getattr(settings, 'API_GZIP_MIN_BYTES', 1024)
+        if not min_bytes or len(self.content) < min_bytes or self.has_header('Content-Encoding'):
+            return
+
+        patch_vary_headers(self, ('Accept-Encoding',))
+        if not _accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return
+
+        compressed = gzip.compress(self.content, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(compressed) < len(self.content):
+            self.content = compressed
+            self.headers['Content-Length'] = str(len(compressed))
+            self.headers['Content-Encoding'] = 'gzip'
+
+
+def api_response(request, result, status=None):
+    """
+    FastJsonResponse for a ServiceResult: 200 on success, 400 on failure
+    unless status is given.
+    """
+    if status is None:
+        status = 200 if result.success else 400
+    return FastJsonResponse(result.to_response_dict(), request=request, status=status)
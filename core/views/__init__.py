@@ -69,7 +69,9 @@ from .idcard_api import (
     api_idcard_all_ids,
     api_table_status_counts,
     api_idcard_bulk_upload,
+    api_import_job_status,
     api_idcard_download_images,
+    api_idcard_download_images_stream,
     api_idcard_reupload_images,
     api_idcard_download_docx,
     api_idcard_download_xlsx,
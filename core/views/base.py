@@ -8,8 +8,13 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Q
-from ..models import Client, Staff, IDCardGroup, IDCard, IDCardTable, WebsiteSettings
+from django.db.models import Count, Max, Sum
+from ..models import (
+    Client, Staff, IDCardGroup, IDCard, IDCardTable, TableStatusCounter, WebsiteSettings,
+    SEARCH_FIELD_CATEGORIES,
+)
+from ..services import SearchService, StatsService
+from ..services.base import BaseService
 
 def get_user_role(user):
     """Helper function to get user role display name"""
@@ -86,19 +91,30 @@ def dashboard(request):
     context = {
         'active_page': 'dashboard',
         'user_role': get_user_role(request.user),
-        'total_clients': Client.objects.count(),
-        'total_staff': Staff.objects.count(),
-        'total_id_cards': IDCard.objects.count(),
-        'active_clients': Client.objects.filter(status='active').count(),
-        'pending_cards': IDCard.objects.filter(status='pending').count(),
-        'verified_cards': IDCard.objects.filter(status='verified').count(),
-        'approved_cards': IDCard.objects.filter(status='approved').count(),
-        'downloaded_cards': IDCard.objects.filter(status='download').count(),
-        'active_staff': Staff.objects.filter(user__is_active=True).count(),
+        **StatsService.dashboard_snapshot(),
     }
     return render(request, 'index.html', context)
 
 
+def _recent_clients_with_counts(limit):
+    """
+    Recent active clients with their cards' status counts summed from the
+    per-table counters - one aggregate query however many clients are shown
+    """
+    tables = 'id_card_groups__tables'
+    return list(
+        Client.objects.filter(status='active').order_by('-updated_at').annotate(
+            first_table_id=Max(f'{tables}__id'),  # Newest table
+            table_count=Count(tables),
+            counter_count=Count(f'{tables}__status_counter'),
+            **{
+                f'{status}_count': Sum(f'{tables}__status_counter__{status}')
+                for status in ('pending', 'verified', 'approved', 'download')
+            },
+        )[:limit]
+    )
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 @api_super_admin_required
@@ -107,33 +123,28 @@ def api_recent_client_updates(request):
     try:
         limit = int(request.GET.get('limit', 5))
         
-        # Get recent active clients
-        clients = Client.objects.filter(status='active').order_by('-updated_at')[:limit]
+        clients = _recent_clients_with_counts(limit)
+        
+        # Counters are built lazily; build any missing ones once, then re-read
+        missing = [client.id for client in clients if client.table_count != client.counter_count]
+        if missing:
+            for table_id in IDCardTable.objects.filter(
+                group__client__in=missing, status_counter__isnull=True
+            ).values_list('id', flat=True):
+                TableStatusCounter.rebuild(table_id)
+            clients = _recent_clients_with_counts(limit)
         
         results = []
         for client in clients:
-            # Get all ID card tables for this client through groups
-            tables = IDCardTable.objects.filter(group__client=client)
-            
-            # Get first table ID for linking (if exists)
-            first_table = tables.first()
-            first_table_id = first_table.id if first_table else None
-            
-            # Count cards by status across all tables
-            pending_count = IDCard.objects.filter(table__in=tables, status='pending').count()
-            verified_count = IDCard.objects.filter(table__in=tables, status='verified').count()
-            approved_count = IDCard.objects.filter(table__in=tables, status='approved').count()
-            downloaded_count = IDCard.objects.filter(table__in=tables, status='downloaded').count()
-            
             results.append({
                 'id': client.id,
                 'name': client.name,
                 'initial': client.name[0].upper() if client.name else 'C',
-                'first_table_id': first_table_id,
-                'pending': pending_count,
-                'verified': verified_count,
-                'approved': approved_count,
-                'downloaded': downloaded_count,
+                'first_table_id': client.first_table_id,
+                'pending': client.pending_count or 0,
+                'verified': client.verified_count or 0,
+                'approved': client.approved_count or 0,
+                'downloaded': client.download_count or 0,
             })
         
         return JsonResponse({
@@ -165,73 +176,56 @@ def api_global_search(request):
         
         results = []
         query_upper = query.upper()
+        if filter_type not in SearchService.SEARCH_COLUMNS:
+            filter_type = 'all'
+        keywords = SEARCH_FIELD_CATEGORIES.get(filter_type, ())
         
-        # Use database-level search with field_data JSON contains (case-insensitive via icontains)
-        # This is much faster than loading all records into Python
-        cards = IDCard.objects.select_related(
-            'table', 'table__group', 'table__group__client'
-        ).filter(
-            field_data__icontains=query
-        )[:100]  # Limit at database level for speed
+        # Matched in SQL against the indexed search document (text fields only,
+        # per category), so every row returned here is a result
+        cards = SearchService.filter_cards(
+            IDCard.objects.select_related('table', 'table__group', 'table__group__client'),
+            query, filter_type, newest=50
+        ).order_by('-id')[:50]
         
         for card in cards:
             field_data = card.field_data or {}
+            table_fields = card.table.fields or []
+            image_fields = {f.get('name') for f in table_fields if f.get('type') in BaseService.IMAGE_FIELD_TYPES}
             matched_field = ''
             matched_value = ''
             
             # Find which field matched
             for field_name, field_value in field_data.items():
-                if not field_value:
+                if not field_value or field_name in image_fields:
                     continue
-                    
-                field_name_upper = field_name.upper()
-                field_value_str = str(field_value).upper()
-                
-                # Apply filter
-                if filter_type != 'all':
-                    if filter_type == 'name' and 'NAME' not in field_name_upper:
-                        continue
-                    elif filter_type == 'address' and 'ADDRESS' not in field_name_upper:
-                        continue
-                    elif filter_type == 'mobile' and 'MOBILE' not in field_name_upper and 'PHONE' not in field_name_upper and 'MOB' not in field_name_upper:
-                        continue
-                
-                if query_upper in field_value_str:
+                if keywords and not any(keyword in field_name.upper() for keyword in keywords):
+                    continue
+                if query_upper in str(field_value).upper():
                     matched_field = field_name
                     matched_value = str(field_value)
                     break
             
-            # Skip if filter was applied but no matching field found
-            if filter_type != 'all' and not matched_field:
-                continue
-                
             # Get display name from first text field
             display_name = ''
-            if card.table and card.table.fields:
-                for field in card.table.fields:
-                    if field.get('type') in ['text', 'textarea'] and field.get('name') in field_data:
-                        display_name = field_data.get(field.get('name'), '')
-                        break
+            for field in table_fields:
+                if field.get('type') in ['text', 'textarea'] and field.get('name') in field_data:
+                    display_name = field_data.get(field.get('name'), '')
+                    break
             
-            client_name = card.table.group.client.name if card.table and card.table.group else 'Unknown'
-            table_name = card.table.name if card.table else 'Unknown'
+            client_name = card.table.group.client.name if card.table.group else 'Unknown'
             
             results.append({
                 'type': 'idcard',
                 'id': card.id,
                 'title': display_name or f'Card #{card.id}',
-                'subtitle': f'{client_name} • {table_name} • {card.get_status_display()}',
+                'subtitle': f'{client_name} • {card.table.name} • {card.get_status_display()}',
                 'matched_field': matched_field or 'Field',
                 'matched_value': matched_value or query,
-                'url': f'/table/{card.table.id}/cards/?status={card.status}&highlight={card.id}' if card.table else '#',
+                'url': f'/table/{card.table.id}/cards/?status={card.status}&highlight={card.id}',
                 'icon': 'fa-id-card',
                 'status': card.status,
                 'photo': card.photo.url if card.photo else None
             })
-            
-            # Stop after 50 results for speed
-            if len(results) >= 50:
-                break
         
         # Sort by title
         results.sort(key=lambda x: x['title'])
@@ -291,16 +285,18 @@ def idcard_group(request, client_id):
     """View ID card groups/tables for a specific client with status counts"""
     client = get_object_or_404(Client, id=client_id)
     
-    # Get all tables for this client's groups with status counts
-    tables = IDCardTable.objects.filter(group__client=client).select_related('group').annotate(
-        pending_count=Count('id_cards', filter=Q(id_cards__status='pending')),
-        verified_count=Count('id_cards', filter=Q(id_cards__status='verified')),
-        pool_count=Count('id_cards', filter=Q(id_cards__status='pool')),
-        approved_count=Count('id_cards', filter=Q(id_cards__status='approved')),
-        download_count=Count('id_cards', filter=Q(id_cards__status='download')),
-        reprint_count=Count('id_cards', filter=Q(id_cards__status='reprint')),
-        total_cards=Count('id_cards')
+    # Get all tables for this client's groups with status counts (from the per-table counters)
+    tables = list(
+        IDCardTable.objects.filter(group__client=client).select_related('group', 'status_counter')
     )
+    for table in tables:
+        try:
+            counts = table.status_counter.as_dict()
+        except TableStatusCounter.DoesNotExist:
+            counts = TableStatusCounter.rebuild(table.id).as_dict()
+        for status in TableStatusCounter.STATUSES:
+            setattr(table, f'{status}_count', counts[status])
+        table.total_cards = counts['total']
     
     context = {
         'active_page': 'active_clients',
@@ -326,22 +322,14 @@ def idcard_actions(request, table_id):
     if status_filter and status_filter in ['pending', 'verified', 'pool', 'approved', 'download', 'reprint']:
         id_cards_query = id_cards_query.filter(status=status_filter)
     
-    # Get total count for this status
-    total_count = id_cards_query.count()
-    
     # Only load first batch for initial page render
     id_cards = id_cards_query[:INITIAL_LOAD_LIMIT]
     
-    # Get counts for all statuses
-    status_counts = {
-        'pending': IDCard.objects.filter(table=table, status='pending').count(),
-        'verified': IDCard.objects.filter(table=table, status='verified').count(),
-        'pool': IDCard.objects.filter(table=table, status='pool').count(),
-        'approved': IDCard.objects.filter(table=table, status='approved').count(),
-        'download': IDCard.objects.filter(table=table, status='download').count(),
-        'reprint': IDCard.objects.filter(table=table, status='reprint').count(),
-        'total': IDCard.objects.filter(table=table).count(),
-    }
+    # Get counts for all statuses (one lookup on the table's counter row)
+    status_counts = TableStatusCounter.counts_for(table.id)
+    
+    # Get total count for this status
+    total_count = status_counts.get(status_filter or 'total', status_counts['total'])
     
     # Create a field type lookup from table.fields
     field_types = {field['name']: field['type'] for field in table.fields}
@@ -8,6 +8,7 @@ from django.views.decorators.csrf import csrf_exempt
 import json
 from .base import api_super_admin_required
 from ..services import ClientService
+from ..utils import api_response, FastJsonResponse
 
 
 @csrf_exempt
@@ -33,7 +34,7 @@ def api_client_create(request):
         if result.success and 'email_sent' in result.data:
             response_data['email_sent'] = result.data['email_sent']
         
-        return JsonResponse(response_data, status=200 if result.success else 400)
+        return FastJsonResponse(response_data, request=request, status=200 if result.success else 400)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data'}, status=400)
     except Exception as e:
@@ -46,7 +47,7 @@ def api_client_create(request):
 def api_client_get(request, client_id):
     """API endpoint to get a client's details"""
     result = ClientService.get(client_id, include_permissions=True)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -66,7 +67,7 @@ def api_client_update(request, client_id):
             photo = None
         
         result = ClientService.update(client_id, data, photo=photo)
-        return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+        return api_response(request, result)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data'}, status=400)
     except Exception as e:
@@ -79,7 +80,7 @@ def api_client_update(request, client_id):
 def api_client_delete(request, client_id):
     """API endpoint to delete a client"""
     result = ClientService.delete(client_id)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -88,7 +89,7 @@ def api_client_delete(request, client_id):
 def api_client_toggle_status(request, client_id):
     """API endpoint to toggle client active/inactive status"""
     result = ClientService.toggle_status(client_id)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -97,4 +98,4 @@ def api_client_toggle_status(request, client_id):
 def api_client_staff(request, client_id):
     """API endpoint to get all staff members for a specific client"""
     result = ClientService.get_staff(client_id)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
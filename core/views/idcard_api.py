@@ -8,15 +8,19 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.db import transaction
+from django.conf import settings
+from django.core.files.base import ContentFile
 import json
 import time
 import os
+from contextlib import ExitStack
 from datetime import datetime
 from ..models import IDCardGroup, IDCard, IDCardTable
 from .base import api_super_admin_required
-from ..services import IDCardService
+from ..services import IDCardService, ImportService, ExportService
+from ..utils import api_response
 from ..services.image_service import ImageService
-from ..services.base import BaseService
+from ..services.base import BaseService, StreamingZipIndex, StreamingSheetReader, BulkCardWriter
 
 
 def generate_image_filename(batch_counter, original_ext='.jpg'):
@@ -43,11 +47,21 @@ def get_client_image_folder(client):
 _image_upload_counter = 0
 
 
-def safe_save_image(storage, file_path, file_content, fallback_name=None):
-    """Safely save an image with fallback handling."""
+def safe_save_image(storage, file_path, file_content, fallback_name=None, export_bytes=None):
+    """
+    Safely save an image with fallback handling (identical images are stored once).
+    Also caches its export rendition: export_bytes if given (built by the
+    bulk upload pool), otherwise built from the content.
+    """
     try:
-        saved_path = storage.save(file_path, file_content)
-        renamed_filename = os.path.basename(file_path)
+        file_content.seek(0)
+        image_bytes = file_content.read()
+        saved_path, _ = ImageService.store_image(file_path, image_bytes)
+        if export_bytes:
+            ImageService.save_export_rendition_for(saved_path, export_bytes)
+        else:
+            ImageService.warm_export_rendition(saved_path, image_bytes)
+        renamed_filename = os.path.basename(saved_path)
         return saved_path, renamed_filename, True
     except Exception as e:
         if fallback_name:
@@ -65,6 +79,12 @@ def validate_image_bytes(image_bytes):
     return ImageService.validate_image_bytes(image_bytes)
 
 
+def prepare_uploaded_image(uploaded_file, original_ext):
+    """Apply the image ingest policy to an uploaded file. Returns (ContentFile, ext)."""
+    image_bytes, ext = ImageService.apply_ingest_policy(uploaded_file.read(), original_ext)
+    return ContentFile(image_bytes), ext
+
+
 # ==================== ID CARD TABLE API ENDPOINTS ====================
 
 @csrf_exempt
@@ -75,7 +95,7 @@ def api_idcard_table_create(request, group_id):
     try:
         data = json.loads(request.body)
         result = IDCardService.create_table(group_id, data)
-        return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+        return api_response(request, result)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data!'}, status=400)
     except Exception as e:
@@ -88,7 +108,7 @@ def api_idcard_table_create(request, group_id):
 def api_idcard_table_get(request, table_id):
     """API endpoint to get a single ID Card Table"""
     result = IDCardService.get_table(table_id)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -99,7 +119,7 @@ def api_idcard_table_update(request, table_id):
     try:
         data = json.loads(request.body)
         result = IDCardService.update_table(table_id, data)
-        return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+        return api_response(request, result)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data!'}, status=400)
     except Exception as e:
@@ -112,7 +132,7 @@ def api_idcard_table_update(request, table_id):
 def api_idcard_table_delete(request, table_id):
     """API endpoint to delete an ID Card Table"""
     result = IDCardService.delete_table(table_id)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -121,7 +141,7 @@ def api_idcard_table_delete(request, table_id):
 def api_idcard_table_toggle_status(request, table_id):
     """API endpoint to toggle ID Card Table active/inactive status"""
     result = IDCardService.toggle_table_status(table_id)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -130,7 +150,7 @@ def api_idcard_table_toggle_status(request, table_id):
 def api_idcard_table_list(request, group_id):
     """API endpoint to list all ID Card Tables for a group"""
     result = IDCardService.list_tables(group_id)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
 
 
 # ==================== ID CARD API ENDPOINTS ====================
@@ -139,23 +159,36 @@ def api_idcard_table_list(request, group_id):
 @require_http_methods(["GET"])
 @api_super_admin_required
 def api_idcard_list(request, table_id):
-    """API endpoint to list ID Cards for a table with pagination support for lazy loading"""
+    """
+    API endpoint to list ID Cards for a table with pagination support for lazy loading.
+    
+    Pass after_id (the last loaded card id) for cursor paging, and count=false
+    to skip total_count/status_counts on follow-up pages. format=columnar sends
+    the field schema once and each card as a value array.
+    """
     status_filter = request.GET.get('status', None)
-    offset = int(request.GET.get('offset', 0))
-    limit = int(request.GET.get('limit', 100))
+    try:
+        offset = int(request.GET.get('offset', 0))
+        limit = int(request.GET.get('limit', 100))
+        after_id = request.GET.get('after_id')
+        after_id = int(after_id) if after_id else None
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Invalid paging parameters!'}, status=400)
+    include_count = request.GET.get('count', 'true').lower() in ('true', '1', 'yes')
+    columnar = request.GET.get('format') == 'columnar'
     
-    result = IDCardService.list_cards(table_id, status_filter, offset, limit)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    result = IDCardService.list_cards(table_id, status_filter, offset, limit, after_id, include_count, columnar)
+    return api_response(request, result)
 
 
 @csrf_exempt
 @require_http_methods(["GET"])
 @api_super_admin_required
 def api_idcard_all_ids(request, table_id):
-    """API endpoint to get all card IDs for a table (for Select All functionality)"""
+    """API endpoint for Select All: a selection handle and count for every card in the status"""
     status_filter = request.GET.get('status', None)
     result = IDCardService.get_all_card_ids(table_id, status_filter)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -205,6 +238,9 @@ def api_idcard_create(request, table_id):
                             # Get file extension
                             original_ext = os.path.splitext(uploaded_file.name)[1].lower() or '.jpg'
                             
+                            # Downscale / strip metadata (may switch the extension)
+                            image_content, original_ext = prepare_uploaded_image(uploaded_file, original_ext)
+                            
                             # Generate new filename with 14-digit timestamp + counter (for NEW cards)
                             image_counter += 1
                             new_filename = generate_image_filename(image_counter, original_ext)
@@ -212,7 +248,7 @@ def api_idcard_create(request, table_id):
                             
                             # Try to save the image
                             saved_path, renamed, success = safe_save_image(
-                                default_storage, file_path, uploaded_file, 
+                                default_storage, file_path, image_content, 
                                 fallback_name=f"fallback_{int(time.time())}.jpg"
                             )
                             
@@ -356,6 +392,9 @@ def api_idcard_update(request, card_id):
                             # Get file extension from uploaded file
                             original_ext = os.path.splitext(uploaded_file.name)[1].lower() or '.jpg'
                             
+                            # Downscale / strip metadata (may switch the extension)
+                            image_content, original_ext = prepare_uploaded_image(uploaded_file, original_ext)
+                            
                             # Check if there's an existing image for this field
                             existing_image_path = existing_field_data.get(field_name, '')
                             
@@ -364,13 +403,10 @@ def api_idcard_update(request, card_id):
                                 # UPDATE: Keep original 13-digit timestamp, add new 6-digit HHMMSS (20 digits total)
                                 new_filename = generate_updated_image_filename(existing_image_path, original_ext)
                                 
-                                # Delete old image
-                                try:
-                                    if default_storage.exists(existing_image_path):
-                                        default_storage.delete(existing_image_path)
-                                        print(f"Deleted old image: {existing_image_path}")
-                                except Exception as del_err:
-                                    print(f"Warning: Could not delete old image {existing_image_path}: {del_err}")
+                                # Delete old image (kept if other cards share it)
+                                result = ImageService.delete_image(existing_image_path)
+                                if not result.success:
+                                    print(f"Warning: Could not delete old image {existing_image_path}: {result.message}")
                             else:
                                 # FIRST UPLOAD: Generate fresh 13-digit filename
                                 image_counter += 1
@@ -380,7 +416,7 @@ def api_idcard_update(request, card_id):
                             
                             # Try to save the image
                             saved_path, renamed, success = safe_save_image(
-                                default_storage, file_path, uploaded_file,
+                                default_storage, file_path, image_content,
                                 fallback_name=f"fallback_{int(time.time())}.jpg"
                             )
                             
@@ -404,6 +440,9 @@ def api_idcard_update(request, card_id):
                     # Get file extension from uploaded file
                     original_ext = os.path.splitext(uploaded_file.name)[1].lower() or '.jpg'
                     
+                    # Downscale / strip metadata (may switch the extension)
+                    image_content, original_ext = prepare_uploaded_image(uploaded_file, original_ext)
+                    
                     # Check if there's an existing PHOTO in field_data (check both cases)
                     existing_photo_path = existing_field_data.get('PHOTO', '') or existing_field_data.get('Photo', '')
                     
@@ -412,13 +451,10 @@ def api_idcard_update(request, card_id):
                         # UPDATE: Keep original 13-digit timestamp, add new 6-digit HHMMSS (20 digits total)
                         new_filename = generate_updated_image_filename(existing_photo_path, original_ext)
                         
-                        # Delete old photo
-                        try:
-                            if default_storage.exists(existing_photo_path):
-                                default_storage.delete(existing_photo_path)
-                                print(f"Deleted old photo: {existing_photo_path}")
-                        except Exception as del_err:
-                            print(f"Warning: Could not delete old photo {existing_photo_path}: {del_err}")
+                        # Delete old photo (kept if other cards share it)
+                        result = ImageService.delete_image(existing_photo_path)
+                        if not result.success:
+                            print(f"Warning: Could not delete old photo {existing_photo_path}: {result.message}")
                     else:
                         # FIRST UPLOAD: Generate fresh 13-digit filename
                         new_filename = generate_image_filename(9, original_ext)  # Use 9 as counter for main photo
@@ -427,7 +463,7 @@ def api_idcard_update(request, card_id):
                     
                     # Save the image
                     saved_path, renamed, success = safe_save_image(
-                        default_storage, file_path, uploaded_file,
+                        default_storage, file_path, image_content,
                         fallback_name=f"photo_{int(time.time())}.jpg"
                     )
                     
@@ -458,7 +494,8 @@ def api_idcard_update(request, card_id):
             if 'status' in data and data['status'] in ['pending', 'verified', 'pool', 'approved', 'download', 'reprint']:
                 card.status = data['status']
             
-            card.save()
+            # A status-only change leaves the search document alone
+            card.save(update_fields=None if 'field_data' in data else ['status', 'updated_at'])
         
         return JsonResponse({
             'success': True,
@@ -505,7 +542,7 @@ def api_idcard_update_field(request, card_id):
         value = data.get('value', '')
         
         result = IDCardService.update_single_field(card_id, field, value)
-        return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+        return api_response(request, result)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data!'}, status=400)
     except Exception as e:
@@ -522,7 +559,7 @@ def api_idcard_change_status(request, card_id):
         new_status = data.get('status')
         
         result = IDCardService.change_status(card_id, new_status)
-        return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+        return api_response(request, result)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data!'}, status=400)
     except Exception as e:
@@ -539,8 +576,8 @@ def api_idcard_bulk_status(request, table_id):
         card_ids = data.get('card_ids', [])
         new_status = data.get('status')
         
-        result = IDCardService.bulk_change_status(table_id, card_ids, new_status)
-        return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+        result = IDCardService.bulk_change_status(table_id, card_ids, new_status, data.get('selection'))
+        return api_response(request, result)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data!'}, status=400)
     except Exception as e:
@@ -557,8 +594,8 @@ def api_idcard_bulk_delete(request, table_id):
         card_ids = data.get('card_ids', [])
         delete_all = data.get('delete_all', False)
         
-        result = IDCardService.bulk_delete(table_id, card_ids, delete_all)
-        return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+        result = IDCardService.bulk_delete(table_id, card_ids, delete_all, data.get('selection'))
+        return api_response(request, result)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data!'}, status=400)
     except Exception as e:
@@ -571,8 +608,12 @@ def api_idcard_bulk_delete(request, table_id):
 def api_idcard_search(request, table_id):
     """API endpoint to search ID Cards across all statuses"""
     query = request.GET.get('q', '').strip()
-    result = IDCardService.search_cards(table_id, query)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    try:
+        limit = min(max(int(request.GET.get('limit', 0)), 0), 500) or None
+    except ValueError:
+        limit = None
+    result = IDCardService.search_cards(table_id, query, limit)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -597,11 +638,12 @@ def api_table_status_counts(request, table_id):
 @api_super_admin_required
 def api_idcard_bulk_upload(request, table_id):
     """API endpoint to bulk upload ID Cards from XLSX/CSV file with fuzzy matching and optional ZIP photo upload"""
+    # Keeps the photo ZIPs and the spreadsheet open while rows are processed;
+    # closed on every exit path
+    upload_stack = ExitStack()
     try:
         import openpyxl
-        from io import BytesIO
         import re
-        import zipfile
         import os
         from django.core.files.storage import default_storage
         from django.core.files.base import ContentFile
@@ -621,8 +663,33 @@ def api_idcard_bulk_upload(request, table_id):
         # Get image field names from table
         image_field_names = [f['name'] for f in table.fields if f.get('type') in IMAGE_FIELD_TYPES]
         
-        # Dictionary to store photos from each ZIP: { field_name: { filename: {bytes, ext} } }
-        zip_photos_by_field = {}
+        # Background mode: store the files, queue an ImportJob and return its id right away.
+        # Progress is then polled from /api/import-jobs/<id>/
+        background = request.POST.get('background')
+        run_in_background = BaseService.parse_bool(background) if background is not None else settings.IMPORT_JOBS_ENABLED
+        if run_in_background:
+            try:
+                job_zip_field_names = json.loads(request.POST.get('zip_field_names', '[]'))
+            except:
+                job_zip_field_names = []
+            
+            job_zip_files = {
+                field_name: request.FILES[f'photos_zip_{field_name}']
+                for field_name in job_zip_field_names
+                if f'photos_zip_{field_name}' in request.FILES
+            }
+            # Legacy single photos_zip goes to the first image field
+            if not job_zip_files and 'photos_zip' in request.FILES:
+                first_image_field = image_field_names[0] if image_field_names else 'PHOTO'
+                job_zip_files[first_image_field] = request.FILES['photos_zip']
+            
+            result = ImportService.enqueue_job(table.id, uploaded_file, job_zip_files, user=request.user)
+            return api_response(request, result, status=202 if result.success else 400)
+        
+        # Lightweight per-field ZIP indexes: { field_name: StreamingZipIndex }
+        # Only the archive directory is loaded here - each photo is read from
+        # the uploaded temp file when a spreadsheet row actually references it.
+        zip_indexes_by_field = {}
         
         # Check for multiple ZIP files - one per image field
         # ZIP files are sent as photos_zip_FIELDNAME
@@ -635,83 +702,31 @@ def api_idcard_bulk_upload(request, table_id):
         print(f"DEBUG: zip_field_names = {zip_field_names}")
         print(f"DEBUG: request.FILES keys = {list(request.FILES.keys())}")
         
-        # Process each ZIP file for each image field
+        # Index each ZIP file for each image field. Photos are validated and
+        # thumbnailed inline when their row is matched (the image pool is only
+        # used by background imports in run_import_worker).
         for field_name in zip_field_names:
             zip_key = f'photos_zip_{field_name}'
             if zip_key in request.FILES:
-                photos_zip_file = request.FILES[zip_key]
-                zip_photos_by_field[field_name] = {}
-                
                 try:
-                    zip_content = photos_zip_file.read()
-                    with zipfile.ZipFile(BytesIO(zip_content), 'r') as zf:
-                        for zip_info in zf.infolist():
-                            if zip_info.is_dir():
-                                continue
-                            
-                            file_in_zip = zip_info.filename
-                            base_name = os.path.basename(file_in_zip)
-                            name_without_ext = os.path.splitext(base_name)[0]
-                            ext = os.path.splitext(base_name)[1].lower()
-                            
-                            if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']:
-                                try:
-                                    image_bytes = zf.read(zip_info.filename)
-                                    is_valid, error_msg = validate_image_bytes(image_bytes)
-                                    if is_valid:
-                                        # Use normalized key for robust case/whitespace-insensitive matching
-                                        from ..services.base import BaseService
-                                        normalized_key = BaseService.normalize_image_identifier(name_without_ext)
-                                        if normalized_key:
-                                            zip_photos_by_field[field_name][normalized_key] = {
-                                                'bytes': image_bytes,
-                                                'ext': ext,
-                                                'original_name': base_name
-                                            }
-                                except Exception as img_read_err:
-                                    continue
+                    zip_indexes_by_field[field_name] = upload_stack.enter_context(
+                        StreamingZipIndex(request.FILES[zip_key])
+                    )
                 except Exception as zip_error:
                     print(f"DEBUG: ZIP error for {field_name}: {zip_error}")
         
-        print(f"DEBUG: zip_photos_by_field keys = {list(zip_photos_by_field.keys())}")
-        for k, v in zip_photos_by_field.items():
+        print(f"DEBUG: zip_indexes_by_field keys = {list(zip_indexes_by_field.keys())}")
+        for k, v in zip_indexes_by_field.items():
             print(f"DEBUG: Field '{k}' has {len(v)} photos, first few keys: {list(v.keys())[:5]}")
         
         # Legacy: Also check for single photos_zip (backward compatibility)
-        if not zip_photos_by_field and 'photos_zip' in request.FILES:
-            photos_zip_file = request.FILES['photos_zip']
+        if not zip_indexes_by_field and 'photos_zip' in request.FILES:
             # Assign to first image field
             first_image_field = image_field_names[0] if image_field_names else 'PHOTO'
-            zip_photos_by_field[first_image_field] = {}
-            
             try:
-                zip_content = photos_zip_file.read()
-                with zipfile.ZipFile(BytesIO(zip_content), 'r') as zf:
-                    for zip_info in zf.infolist():
-                        if zip_info.is_dir():
-                            continue
-                        
-                        file_in_zip = zip_info.filename
-                        base_name = os.path.basename(file_in_zip)
-                        name_without_ext = os.path.splitext(base_name)[0]
-                        ext = os.path.splitext(base_name)[1].lower()
-                        
-                        if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp']:
-                            try:
-                                image_bytes = zf.read(zip_info.filename)
-                                is_valid, error_msg = validate_image_bytes(image_bytes)
-                                if is_valid:
-                                    # Use normalized key for robust matching
-                                    from ..services.base import BaseService
-                                    normalized_key = BaseService.normalize_image_identifier(name_without_ext)
-                                    if normalized_key:
-                                        zip_photos_by_field[first_image_field][normalized_key] = {
-                                            'bytes': image_bytes,
-                                            'ext': ext,
-                                            'original_name': base_name
-                                        }
-                            except Exception as img_read_err:
-                                continue
+                zip_indexes_by_field[first_image_field] = upload_stack.enter_context(
+                    StreamingZipIndex(request.FILES['photos_zip'])
+                )
             except Exception as zip_error:
                 pass
         
@@ -793,463 +808,420 @@ def api_idcard_bulk_upload(request, table_id):
             
             return best_match
         
-        cards_created = 0
         total_photos_matched = 0
         errors = []
         matched_field_names = []
-        
-        if file_name.endswith('.xlsx') or file_name.endswith('.xls'):
-            # Process Excel file
-            try:
-                file_content = uploaded_file.read()
-                
-                # Check file magic bytes to detect actual format
-                if len(file_content) < 4:
+        deferred_checks = []  # Photos accepted by the fast header check
+        
+        # Rows are inserted in bulk_create chunks; the last chunk is written
+        # on exit, or its images released if the upload fails part way
+        with BulkCardWriter(table, errors) as card_writer:
+            if file_name.endswith('.xlsx') or file_name.endswith('.xls'):
+                # Process Excel file - rows are streamed from the sheet while the
+                # cards are created instead of being loaded up front
+                try:
+                    sheet = upload_stack.enter_context(StreamingSheetReader(uploaded_file))
+                    headers = sheet.headers
+                    
+                    if not headers:
+                        return JsonResponse({
+                            'success': False, 
+                            'message': 'Could not read headers from Excel file. Please check the file format.'
+                        }, status=400)
+                        
+                except ImportError:
+                    return JsonResponse({
+                        'success': False, 
+                        'message': 'xlrd library not installed. Please install it to support .xls files.'
+                    }, status=400)
+                except Exception as excel_error:
                     return JsonResponse({
                         'success': False, 
-                        'message': 'File is too small or empty.'
+                        'message': f'Error reading Excel file: {str(excel_error)}'
                     }, status=400)
                 
-                magic_bytes = file_content[:4]
-                is_zip = magic_bytes[:2] == b'PK'
-                is_old_xls = (magic_bytes[0] == 0xD0 and magic_bytes[1] == 0xCF)
+                # Map headers to table fields using fuzzy matching
+                # Skip any headers that match image field names (those are for ZIP matching only)
+                header_to_field = {}
+                available_fields = table_fields.copy()
+                image_field_names_upper = [f.upper() for f in image_fields]
                 
-                headers = []
-                rows_data = []
+                # Track which column indices contain image reference values (like PHOTO column)
+                image_ref_columns = {}
+                photo_column_idx = None  # Track the generic PHOTO column for any image field
                 
-                if is_zip or file_name.endswith('.xlsx'):
-                    # New .xlsx format - use openpyxl
-                    try:
-                        wb = openpyxl.load_workbook(BytesIO(file_content))
-                        ws = wb.active
+                for idx, header in enumerate(headers):
+                    header_upper = header.upper() if header else ''
+                    header_lower = header.lower() if header else ''
+                    
+                    # Check if this header matches any image field by name or is an image column
+                    is_image_ref = False
+                    matched_img_field = None
+                    
+                    for img_field in image_fields:
+                        img_field_upper = img_field.upper()
+                        img_field_lower = img_field.lower()
                         
-                        # Get header row (first row)
-                        for cell in ws[1]:
-                            if cell.value:
-                                headers.append(str(cell.value).strip())
+                        # Exact match
+                        if header_upper == img_field_upper:
+                            image_ref_columns[img_field] = idx
+                            is_image_ref = True
+                            matched_img_field = img_field
+                            break
                         
-                        # Get data rows
-                        for row in ws.iter_rows(min_row=2, values_only=True):
-                            rows_data.append(row)
-                    except Exception as xlsx_error:
-                        # Maybe it's actually an old xls file with wrong extension
-                        if not is_zip:
-                            is_old_xls = True
-                        else:
-                            raise xlsx_error
-                
-                if is_old_xls or (file_name.endswith('.xls') and not file_name.endswith('.xlsx') and not headers):
-                    # Old .xls format - use xlrd
-                    try:
-                        import xlrd
-                        wb = xlrd.open_workbook(file_contents=file_content)
-                        ws = wb.sheet_by_index(0)
+                        # Fuzzy match for image fields (e.g., "F PHOTO" -> "F PHOTO" field)
+                        # Normalize both for comparison
+                        header_normalized = normalize_name(header)
+                        field_normalized = normalize_name(img_field)
                         
-                        # Get header row (first row)
-                        headers = []
-                        for col_idx in range(ws.ncols):
-                            cell_value = ws.cell_value(0, col_idx)
-                            if cell_value:
-                                headers.append(str(cell_value).strip())
+                        if header_normalized == field_normalized:
+                            image_ref_columns[img_field] = idx
+                            is_image_ref = True
+                            matched_img_field = img_field
+                            break
+                    
+                    # Skip this column for text field matching if it's an image reference column
+                    if is_image_ref:
+                        continue
                         
-                        # Get data rows
-                        rows_data = []
-                        for row_idx in range(1, ws.nrows):
-                            row = []
-                            for col_idx in range(ws.ncols):
-                                row.append(ws.cell_value(row_idx, col_idx))
-                            rows_data.append(tuple(row))
-                    except ImportError:
-                        return JsonResponse({
-                            'success': False, 
-                            'message': 'xlrd library not installed. Please install it to support .xls files.'
-                        }, status=400)
-                    except Exception as xls_error:
-                        return JsonResponse({
-                            'success': False, 
-                            'message': f'Error reading .xls file: {str(xls_error)}'
-                        }, status=400)
+                    match = find_best_match(header, available_fields)
+                    if match:
+                        header_to_field[idx] = match
+                        available_fields.remove(match)  # Don't match same field twice
+                        matched_field_names.append(match)
+                
+                print(f"DEBUG: image_ref_columns = {image_ref_columns}")
+                print(f"DEBUG: header_to_field = {header_to_field}")
                 
-                if not headers:
+                if not header_to_field:
                     return JsonResponse({
                         'success': False, 
-                        'message': 'Could not read headers from Excel file. Please check the file format.'
+                        'message': f'No matching columns found! Expected columns: {", ".join(table_fields)}'
                     }, status=400)
-                    
-            except Exception as excel_error:
-                return JsonResponse({
-                    'success': False, 
-                    'message': f'Error reading Excel file: {str(excel_error)}'
-                }, status=400)
-            
-            # Map headers to table fields using fuzzy matching
-            # Skip any headers that match image field names (those are for ZIP matching only)
-            header_to_field = {}
-            available_fields = table_fields.copy()
-            image_field_names_upper = [f.upper() for f in image_fields]
-            
-            # Track which column indices contain image reference values (like PHOTO column)
-            image_ref_columns = {}
-            photo_column_idx = None  # Track the generic PHOTO column for any image field
-            
-            for idx, header in enumerate(headers):
-                header_upper = header.upper() if header else ''
-                header_lower = header.lower() if header else ''
-                
-                # Check if this header matches any image field by name or is an image column
-                is_image_ref = False
-                matched_img_field = None
-                
-                for img_field in image_fields:
-                    img_field_upper = img_field.upper()
-                    img_field_lower = img_field.lower()
-                    
-                    # Exact match
-                    if header_upper == img_field_upper:
-                        image_ref_columns[img_field] = idx
-                        is_image_ref = True
-                        matched_img_field = img_field
-                        break
-                    
-                    # Fuzzy match for image fields (e.g., "F PHOTO" -> "F PHOTO" field)
-                    # Normalize both for comparison
-                    header_normalized = normalize_name(header)
-                    field_normalized = normalize_name(img_field)
-                    
-                    if header_normalized == field_normalized:
-                        image_ref_columns[img_field] = idx
-                        is_image_ref = True
-                        matched_img_field = img_field
-                        break
                 
-                # Skip this column for text field matching if it's an image reference column
-                if is_image_ref:
-                    continue
-                    
-                match = find_best_match(header, available_fields)
-                if match:
-                    header_to_field[idx] = match
-                    available_fields.remove(match)  # Don't match same field twice
-                    matched_field_names.append(match)
-            
-            print(f"DEBUG: image_ref_columns = {image_ref_columns}")
-            print(f"DEBUG: header_to_field = {header_to_field}")
-            
-            if not header_to_field:
-                return JsonResponse({
-                    'success': False, 
-                    'message': f'No matching columns found! Expected columns: {", ".join(table_fields)}'
-                }, status=400)
-            
-            # Process data rows using rows_data collected earlier
-            for row_num, row in enumerate(rows_data, start=2):
-                try:
-                    # Skip empty rows
-                    if all(cell is None or str(cell).strip() == '' for cell in row):
-                        continue
-                    
-                    field_data = {}
-                    for col_idx, field_name in header_to_field.items():
-                        if col_idx < len(row):
-                            value = row[col_idx]
-                            if value is not None:
-                                # Convert to string, handle dates and numbers
-                                if hasattr(value, 'strftime'):
-                                    # Already a datetime object
-                                    value = value.strftime('%d-%m-%Y')
-                                elif isinstance(value, float):
-                                    # Check if it's an Excel date serial number (typically between 1 and 60000)
-                                    # Excel dates start from 1900-01-01 (serial 1)
-                                    if 1 < value < 60000 and ('date' in field_name.lower() or 'dob' in field_name.lower() or 'birth' in field_name.lower()):
-                                        # Convert Excel serial date to actual date
-                                        from datetime import datetime, timedelta
-                                        # Excel's epoch is December 30, 1899
-                                        excel_epoch = datetime(1899, 12, 30)
-                                        actual_date = excel_epoch + timedelta(days=int(value))
-                                        value = actual_date.strftime('%d-%m-%Y')
-                                    elif value == int(value):
-                                        # It's actually an integer (no decimal part)
-                                        value = str(int(value)).upper()
-                                    else:
-                                        value = str(value).upper()
-                                elif isinstance(value, int):
-                                    # Check if it might be an Excel date serial for integer values
-                                    if 1 < value < 60000 and ('date' in field_name.lower() or 'dob' in field_name.lower() or 'birth' in field_name.lower()):
-                                        from datetime import datetime, timedelta
-                                        excel_epoch = datetime(1899, 12, 30)
-                                        actual_date = excel_epoch + timedelta(days=value)
-                                        value = actual_date.strftime('%d-%m-%Y')
+                # Process data rows as they are read from the sheet
+                for row_num, row in enumerate(sheet.rows(), start=2):
+                    try:
+                        # Skip empty rows
+                        if all(cell is None or str(cell).strip() == '' for cell in row):
+                            continue
+                        
+                        field_data = {}
+                        for col_idx, field_name in header_to_field.items():
+                            if col_idx < len(row):
+                                value = row[col_idx]
+                                if value is not None:
+                                    # Convert to string, handle dates and numbers
+                                    if hasattr(value, 'strftime'):
+                                        # Already a datetime object
+                                        value = value.strftime('%d-%m-%Y')
+                                    elif isinstance(value, float):
+                                        # Check if it's an Excel date serial number (typically between 1 and 60000)
+                                        # Excel dates start from 1900-01-01 (serial 1)
+                                        if 1 < value < 60000 and ('date' in field_name.lower() or 'dob' in field_name.lower() or 'birth' in field_name.lower()):
+                                            # Convert Excel serial date to actual date
+                                            from datetime import datetime, timedelta
+                                            # Excel's epoch is December 30, 1899
+                                            excel_epoch = datetime(1899, 12, 30)
+                                            actual_date = excel_epoch + timedelta(days=int(value))
+                                            value = actual_date.strftime('%d-%m-%Y')
+                                        elif value == int(value):
+                                            # It's actually an integer (no decimal part)
+                                            value = str(int(value)).upper()
+                                        else:
+                                            value = str(value).upper()
+                                    elif isinstance(value, int):
+                                        # Check if it might be an Excel date serial for integer values
+                                        if 1 < value < 60000 and ('date' in field_name.lower() or 'dob' in field_name.lower() or 'birth' in field_name.lower()):
+                                            from datetime import datetime, timedelta
+                                            excel_epoch = datetime(1899, 12, 30)
+                                            actual_date = excel_epoch + timedelta(days=value)
+                                            value = actual_date.strftime('%d-%m-%Y')
+                                        else:
+                                            value = str(value).upper()
                                     else:
-                                        value = str(value).upper()
+                                        value = str(value).strip().upper()  # Convert to uppercase
+                                    field_data[field_name] = value
                                 else:
-                                    value = str(value).strip().upper()  # Convert to uppercase
-                                field_data[field_name] = value
+                                    field_data[field_name] = ''
                             else:
                                 field_data[field_name] = ''
-                        else:
-                            field_data[field_name] = ''
-                    
-                    # Process image fields - try to match with ZIP photos
-                    photos_matched = 0
-                    
-                    for img_field in image_fields:
-                        # Get the photo reference value from the tracked column
-                        photo_column_value = None
-                        
-                        # Use the tracked image reference column if available
-                        if img_field in image_ref_columns:
-                            col_idx = image_ref_columns[img_field]
-                            if col_idx < len(row):
-                                cell_value = row[col_idx]
-                                if cell_value is not None and str(cell_value).strip() and str(cell_value).strip().lower() != 'none':
-                                    # Handle numeric values - convert float 1.0 to "1"
-                                    if isinstance(cell_value, float) and cell_value == int(cell_value):
-                                        photo_column_value = str(int(cell_value))
-                                    elif isinstance(cell_value, int):
-                                        photo_column_value = str(cell_value)
-                                    else:
-                                        photo_column_value = str(cell_value).strip()
-                        else:
-                            # Fallback: look for column named PHOTO or use photo_column_idx
-                            ref_col_idx = photo_column_idx if photo_column_idx is not None else None
-                            if ref_col_idx is None:
-                                # Search for PHOTO column
-                                for col_idx in range(len(headers)):
-                                    if headers[col_idx] and headers[col_idx].upper() == 'PHOTO':
-                                        ref_col_idx = col_idx
-                                        break
-                            
-                            if ref_col_idx is not None and ref_col_idx < len(row):
-                                cell_value = row[ref_col_idx]
-                                if cell_value is not None:
-                                    # Handle numeric values - CASE SENSITIVE
-                                    if isinstance(cell_value, float) and cell_value == int(cell_value):
-                                        photo_column_value = str(int(cell_value))
-                                    elif isinstance(cell_value, int):
-                                        photo_column_value = str(cell_value)
-                                    else:
-                                        photo_column_value = str(cell_value).strip()
                         
-                        # Try to match photo from ZIP using normalized matching
-                        # This handles: case insensitivity, whitespace, numeric formats
-                        field_zip_photos = zip_photos_by_field.get(img_field, {})
+                        # Process image fields - try to match with ZIP photos
+                        photos_matched = 0
                         
-                        # Normalize the Excel cell value for matching
-                        from ..services.base import BaseService
-                        photo_key = BaseService.normalize_image_identifier(photo_column_value) if photo_column_value else None
-                        
-                        # Debug first few rows
-                        if row_num <= 5:
-                            print(f"DEBUG Row {row_num}: img_field='{img_field}', photo_key='{photo_key}', field_zip_photos_keys={list(field_zip_photos.keys())[:5] if field_zip_photos else 'EMPTY'}")
-                        
-                        if photo_key and field_zip_photos and photo_key in field_zip_photos:
-                            try:
-                                photo_info = field_zip_photos[photo_key]
-                                
-                                # Generate new filename with 14-digit timestamp + batch counter
-                                cards_created += 1  # Increment before for 1-based counter
-                                original_ext = photo_info['ext']
-                                new_filename = generate_image_filename(cards_created, original_ext)
-                                
-                                # Use client's unique folder: adarshimg/{client_code}/
-                                file_path = f"{client_image_folder}/{new_filename}"
-                                
-                                # Save the image with error handling
-                                saved_path, renamed, success = safe_save_image(
-                                    default_storage, file_path, ContentFile(photo_info['bytes']),
-                                    fallback_name=f"fallback_{int(time.time())}{original_ext}"
-                                )
+                        for img_field in image_fields:
+                            # Get the photo reference value from the tracked column
+                            photo_column_value = None
+                            
+                            # Use the tracked image reference column if available
+                            if img_field in image_ref_columns:
+                                col_idx = image_ref_columns[img_field]
+                                if col_idx < len(row):
+                                    cell_value = row[col_idx]
+                                    if cell_value is not None and str(cell_value).strip() and str(cell_value).strip().lower() != 'none':
+                                        # Handle numeric values - convert float 1.0 to "1"
+                                        if isinstance(cell_value, float) and cell_value == int(cell_value):
+                                            photo_column_value = str(int(cell_value))
+                                        elif isinstance(cell_value, int):
+                                            photo_column_value = str(cell_value)
+                                        else:
+                                            photo_column_value = str(cell_value).strip()
+                            else:
+                                # Fallback: look for column named PHOTO or use photo_column_idx
+                                ref_col_idx = photo_column_idx if photo_column_idx is not None else None
+                                if ref_col_idx is None:
+                                    # Search for PHOTO column
+                                    for col_idx in range(len(headers)):
+                                        if headers[col_idx] and headers[col_idx].upper() == 'PHOTO':
+                                            ref_col_idx = col_idx
+                                            break
                                 
-                                if success and saved_path:
-                                    # Store the relative path for media serving
-                                    field_data[img_field] = saved_path
-                                    photos_matched += 1
-                                    total_photos_matched += 1
-                                else:
-                                    # Save failed - show placeholder
-                                    field_data[img_field] = ''
-                                cards_created -= 1  # Revert since we incremented early
-                            except Exception as photo_error:
-                                # Log but don't break the whole process
-                                print(f"Error saving photo (XLSX) for {photo_column_value}: {photo_error}")
-                                # Save as PENDING so it can be reuploaded later
+                                if ref_col_idx is not None and ref_col_idx < len(row):
+                                    cell_value = row[ref_col_idx]
+                                    if cell_value is not None:
+                                        # Handle numeric values - CASE SENSITIVE
+                                        if isinstance(cell_value, float) and cell_value == int(cell_value):
+                                            photo_column_value = str(int(cell_value))
+                                        elif isinstance(cell_value, int):
+                                            photo_column_value = str(cell_value)
+                                        else:
+                                            photo_column_value = str(cell_value).strip()
+                            
+                            # Try to match photo from ZIP using normalized matching
+                            # This handles: case insensitivity, whitespace, numeric formats
+                            field_zip_index = zip_indexes_by_field.get(img_field)
+                            
+                            # Normalize the Excel cell value for matching
+                            photo_key = BaseService.normalize_image_identifier(photo_column_value) if photo_column_value else None
+                            
+                            # Debug first few rows
+                            if row_num <= 5:
+                                print(f"DEBUG Row {row_num}: img_field='{img_field}', photo_key='{photo_key}', field_zip_index_keys={list(field_zip_index.keys())[:5] if field_zip_index else 'EMPTY'}")
+                            
+                            # Read (and validate) the matched ZIP member only now
+                            photo_info = None
+                            if photo_key and field_zip_index and photo_key in field_zip_index:
+                                photo_info = field_zip_index.get_photo(photo_key)
+                            
+                            if photo_info:
+                                try:
+                                    # Generate new filename with 14-digit timestamp + batch counter
+                                    original_ext = photo_info['ext']
+                                    new_filename = generate_image_filename(card_writer.queued + 1, original_ext)
+                                    
+                                    # Use client's unique folder: adarshimg/{client_code}/
+                                    file_path = f"{client_image_folder}/{new_filename}"
+                                    
+                                    # Save the image with error handling
+                                    saved_path, renamed, success = safe_save_image(
+                                        default_storage, file_path, ContentFile(photo_info['bytes']),
+                                        fallback_name=f"fallback_{int(time.time())}{original_ext}",
+                                        export_bytes=photo_info['export_bytes']
+                                    )
+                                    
+                                    if success and saved_path:
+                                        # Store the relative path for media serving
+                                        field_data[img_field] = saved_path
+                                        ImageService.save_thumbnail_for(saved_path, photo_info['thumb_bytes'])
+                                        if photo_info['needs_full_check']:
+                                            deferred_checks.append({
+                                                'field_name': img_field,
+                                                'image_path': saved_path,
+                                                'reference': photo_column_value,
+                                            })
+                                        photos_matched += 1
+                                        total_photos_matched += 1
+                                    else:
+                                        # Save failed - show placeholder
+                                        field_data[img_field] = ''
+                                except Exception as photo_error:
+                                    # Log but don't break the whole process
+                                    print(f"Error saving photo (XLSX) for {photo_column_value}: {photo_error}")
+                                    # Save as PENDING so it can be reuploaded later
+                                    if photo_column_value:
+                                        field_data[img_field] = f'PENDING:{photo_column_value}'
+                                    else:
+                                        field_data[img_field] = ''
+                            else:
+                                # No image in ZIP but has reference value - save as PENDING for later reupload
                                 if photo_column_value:
                                     field_data[img_field] = f'PENDING:{photo_column_value}'
                                 else:
+                                    # No reference value at all - empty field
                                     field_data[img_field] = ''
-                        else:
-                            # No image in ZIP but has reference value - save as PENDING for later reupload
-                            if photo_column_value:
-                                field_data[img_field] = f'PENDING:{photo_column_value}'
-                            else:
-                                # No reference value at all - empty field
-                                field_data[img_field] = ''
-                    
-                    # Create the card
-                    IDCard.objects.create(
-                        table=table,
-                        field_data=field_data,
-                        status='pending'
-                    )
-                    cards_created += 1
-                    
-                except Exception as e:
-                    errors.append(f'Row {row_num}: {str(e)}')
-        
-        elif file_name.endswith('.csv'):
-            import csv
-            from io import StringIO
-            
-            # Read CSV
-            content = uploaded_file.read().decode('utf-8-sig')
-            reader = csv.DictReader(StringIO(content))
-            
-            # Map CSV headers to table fields using fuzzy matching
-            csv_headers = reader.fieldnames or []
-            header_to_field = {}
-            available_fields = table_fields.copy()
-            
-            # Track image reference columns for CSV
-            csv_image_ref_columns = {}
-            csv_photo_column = None  # Track the generic PHOTO column
+                        
+                        # Queue the card (inserted in bulk_create chunks)
+                        card_writer.add(row_num, field_data)
+                        
+                    except Exception as e:
+                        errors.append(f'Row {row_num}: {str(e)}')
             
-            for header in csv_headers:
-                header_upper = header.upper() if header else ''
+            elif file_name.endswith('.csv'):
+                import csv
+                from io import TextIOWrapper
                 
-                # Check if this is a PHOTO column
-                if header_upper == 'PHOTO':
-                    csv_photo_column = header
-                    # Assign to first image field if not already assigned
-                    if image_fields and image_fields[0] not in csv_image_ref_columns:
-                        csv_image_ref_columns[image_fields[0]] = header
-                    continue
+                # Read CSV row by row instead of decoding the whole upload
+                uploaded_file.seek(0)
+                csv_text = TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+                reader = csv.DictReader(csv_text)
                 
-                # Check if this column matches any image field name exactly
-                is_image_ref = False
-                for img_field in image_fields:
-                    if header_upper == img_field.upper():
-                        csv_image_ref_columns[img_field] = header
-                        is_image_ref = True
-                        break
+                # Map CSV headers to table fields using fuzzy matching
+                csv_headers = reader.fieldnames or []
+                header_to_field = {}
+                available_fields = table_fields.copy()
                 
-                # Skip this column for text field matching if it's an image reference column
-                if is_image_ref:
-                    continue
+                # Track image reference columns for CSV
+                csv_image_ref_columns = {}
+                csv_photo_column = None  # Track the generic PHOTO column
+                
+                for header in csv_headers:
+                    header_upper = header.upper() if header else ''
                     
-                match = find_best_match(header.strip(), available_fields)
-                if match:
-                    header_to_field[header] = match
-                    available_fields.remove(match)
-                    matched_field_names.append(match)
-            
-            if not header_to_field:
-                return JsonResponse({
-                    'success': False, 
-                    'message': f'No matching columns found! Expected columns: {", ".join(table_fields)}'
-                }, status=400)
-            
-            for row_num, row in enumerate(reader, start=2):
-                try:
-                    # Skip empty rows
-                    if all(not v or str(v).strip() == '' for v in row.values()):
+                    # Check if this is a PHOTO column
+                    if header_upper == 'PHOTO':
+                        csv_photo_column = header
+                        # Assign to first image field if not already assigned
+                        if image_fields and image_fields[0] not in csv_image_ref_columns:
+                            csv_image_ref_columns[image_fields[0]] = header
                         continue
                     
-                    field_data = {}
-                    for csv_header, field_name in header_to_field.items():
-                        value = row.get(csv_header, '')
-                        field_data[field_name] = str(value).strip().upper() if value else ''  # Convert to uppercase
-                    
-                    # Process image fields - try to match with ZIP photos
-                    photos_matched = 0
-                    
+                    # Check if this column matches any image field name exactly
+                    is_image_ref = False
                     for img_field in image_fields:
-                        # Get the photo reference value from the tracked column
-                        photo_column_value = None
+                        if header_upper == img_field.upper():
+                            csv_image_ref_columns[img_field] = header
+                            is_image_ref = True
+                            break
+                    
+                    # Skip this column for text field matching if it's an image reference column
+                    if is_image_ref:
+                        continue
                         
-                        # Use tracked image reference column if available
-                        if img_field in csv_image_ref_columns:
-                            csv_header = csv_image_ref_columns[img_field]
-                            cell_value = row.get(csv_header, '')
-                            if cell_value and str(cell_value).strip():
-                                # CASE SENSITIVE - do NOT convert to uppercase
-                                photo_column_value = str(cell_value).strip()
-                        else:
-                            # Fallback: look for column named PHOTO or matching image field name
-                            for csv_header, cell_value in row.items():
-                                header_upper = csv_header.upper() if csv_header else ''
-                                if header_upper == 'PHOTO' or header_upper == img_field.upper():
-                                    if cell_value and str(cell_value).strip():
-                                        # CASE SENSITIVE
-                                        photo_column_value = str(cell_value).strip()
-                                    break
+                    match = find_best_match(header.strip(), available_fields)
+                    if match:
+                        header_to_field[header] = match
+                        available_fields.remove(match)
+                        matched_field_names.append(match)
+                
+                if not header_to_field:
+                    return JsonResponse({
+                        'success': False, 
+                        'message': f'No matching columns found! Expected columns: {", ".join(table_fields)}'
+                    }, status=400)
+                
+                for row_num, row in enumerate(reader, start=2):
+                    try:
+                        # Skip empty rows
+                        if all(not v or str(v).strip() == '' for v in row.values()):
+                            continue
                         
-                        # Try to match photo from ZIP using normalized matching
-                        # This handles: case insensitivity, whitespace, numeric formats
-                        field_zip_photos = zip_photos_by_field.get(img_field, {})
+                        field_data = {}
+                        for csv_header, field_name in header_to_field.items():
+                            value = row.get(csv_header, '')
+                            field_data[field_name] = str(value).strip().upper() if value else ''  # Convert to uppercase
                         
-                        # Normalize the CSV cell value for matching
-                        from ..services.base import BaseService
-                        photo_key = BaseService.normalize_image_identifier(photo_column_value) if photo_column_value else None
+                        # Process image fields - try to match with ZIP photos
+                        photos_matched = 0
                         
-                        if photo_key and field_zip_photos and photo_key in field_zip_photos:
-                            try:
-                                photo_info = field_zip_photos[photo_key]
-                                
-                                # Generate new filename with 14-digit timestamp + batch counter
-                                cards_created += 1  # Increment before for 1-based counter
-                                original_ext = photo_info['ext']
-                                new_filename = generate_image_filename(cards_created, original_ext)
-                                
-                                # Use client's unique folder: adarshimg/{client_code}/
-                                file_path = f"{client_image_folder}/{new_filename}"
-                                
-                                # Save the image with error handling
-                                saved_path, renamed, success = safe_save_image(
-                                    default_storage, file_path, ContentFile(photo_info['bytes']),
-                                    fallback_name=f"fallback_{int(time.time())}{original_ext}"
-                                )
-                                
-                                if success and saved_path:
-                                    # Store the relative path for media serving
-                                    field_data[img_field] = saved_path
-                                    photos_matched += 1
-                                    total_photos_matched += 1
-                                else:
-                                    # Save failed - show placeholder
-                                    field_data[img_field] = ''
-                                cards_created -= 1  # Revert since we incremented early
-                            except Exception as photo_error:
-                                # Log but don't break the whole process
-                                print(f"Error saving photo (CSV) for {photo_column_value}: {photo_error}")
-                                # Save as PENDING so it can be reuploaded later
+                        for img_field in image_fields:
+                            # Get the photo reference value from the tracked column
+                            photo_column_value = None
+                            
+                            # Use tracked image reference column if available
+                            if img_field in csv_image_ref_columns:
+                                csv_header = csv_image_ref_columns[img_field]
+                                cell_value = row.get(csv_header, '')
+                                if cell_value and str(cell_value).strip():
+                                    # CASE SENSITIVE - do NOT convert to uppercase
+                                    photo_column_value = str(cell_value).strip()
+                            else:
+                                # Fallback: look for column named PHOTO or matching image field name
+                                for csv_header, cell_value in row.items():
+                                    header_upper = csv_header.upper() if csv_header else ''
+                                    if header_upper == 'PHOTO' or header_upper == img_field.upper():
+                                        if cell_value and str(cell_value).strip():
+                                            # CASE SENSITIVE
+                                            photo_column_value = str(cell_value).strip()
+                                        break
+                            
+                            # Try to match photo from ZIP using normalized matching
+                            # This handles: case insensitivity, whitespace, numeric formats
+                            field_zip_index = zip_indexes_by_field.get(img_field)
+                            
+                            # Normalize the CSV cell value for matching
+                            photo_key = BaseService.normalize_image_identifier(photo_column_value) if photo_column_value else None
+                            
+                            # Read (and validate) the matched ZIP member only now
+                            photo_info = None
+                            if photo_key and field_zip_index and photo_key in field_zip_index:
+                                photo_info = field_zip_index.get_photo(photo_key)
+                            
+                            if photo_info:
+                                try:
+                                    # Generate new filename with 14-digit timestamp + batch counter
+                                    original_ext = photo_info['ext']
+                                    new_filename = generate_image_filename(card_writer.queued + 1, original_ext)
+                                    
+                                    # Use client's unique folder: adarshimg/{client_code}/
+                                    file_path = f"{client_image_folder}/{new_filename}"
+                                    
+                                    # Save the image with error handling
+                                    saved_path, renamed, success = safe_save_image(
+                                        default_storage, file_path, ContentFile(photo_info['bytes']),
+                                        fallback_name=f"fallback_{int(time.time())}{original_ext}",
+                                        export_bytes=photo_info['export_bytes']
+                                    )
+                                    
+                                    if success and saved_path:
+                                        # Store the relative path for media serving
+                                        field_data[img_field] = saved_path
+                                        ImageService.save_thumbnail_for(saved_path, photo_info['thumb_bytes'])
+                                        if photo_info['needs_full_check']:
+                                            deferred_checks.append({
+                                                'field_name': img_field,
+                                                'image_path': saved_path,
+                                                'reference': photo_column_value,
+                                            })
+                                        photos_matched += 1
+                                        total_photos_matched += 1
+                                    else:
+                                        # Save failed - show placeholder
+                                        field_data[img_field] = ''
+                                except Exception as photo_error:
+                                    # Log but don't break the whole process
+                                    print(f"Error saving photo (CSV) for {photo_column_value}: {photo_error}")
+                                    # Save as PENDING so it can be reuploaded later
+                                    if photo_column_value:
+                                        field_data[img_field] = f'PENDING:{photo_column_value}'
+                                    else:
+                                        field_data[img_field] = ''
+                            else:
+                                # No image in ZIP but has reference value - save as PENDING for later reupload
                                 if photo_column_value:
                                     field_data[img_field] = f'PENDING:{photo_column_value}'
                                 else:
+                                    # No reference value at all - empty field
                                     field_data[img_field] = ''
-                        else:
-                            # No image in ZIP but has reference value - save as PENDING for later reupload
-                            if photo_column_value:
-                                field_data[img_field] = f'PENDING:{photo_column_value}'
-                            else:
-                                # No reference value at all - empty field
-                                field_data[img_field] = ''
-                    
-                    # Create the card
-                    IDCard.objects.create(
-                        table=table,
-                        field_data=field_data,
-                        status='pending'
-                    )
-                    cards_created += 1
-                    
-                except Exception as e:
-                    errors.append(f'Row {row_num}: {str(e)}')
+                        
+                        # Queue the card (inserted in bulk_create chunks)
+                        card_writer.add(row_num, field_data)
+                        
+                    except Exception as e:
+                        errors.append(f'Row {row_num}: {str(e)}')
+                
+                csv_text.detach()
+            
+            else:
+                return JsonResponse({
+                    'success': False, 
+                    'message': 'Invalid file format! Please upload .xlsx, .xls, or .csv file.'
+                }, status=400)
         
-        else:
-            return JsonResponse({
-                'success': False, 
-                'message': 'Invalid file format! Please upload .xlsx, .xls, or .csv file.'
-            }, status=400)
+        cards_created = card_writer.created
+        
+        # Queue the full decode of header-checked photos for the import worker
+        ImageService.defer_full_validation(table, deferred_checks)
         
         # Return result
         photo_msg = f" with {total_photos_matched} photos matched" if total_photos_matched > 0 else ""
@@ -1274,6 +1246,17 @@ def api_idcard_bulk_upload(request, table_id):
         }, status=500)
     except Exception as e:
         return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    finally:
+        upload_stack.close()
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@api_super_admin_required
+def api_import_job_status(request, job_id):
+    """API endpoint to get progress of a background bulk upload job"""
+    result = ImportService.get_job(job_id)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -1293,11 +1276,17 @@ def api_idcard_download_images(request, table_id):
         data = json.loads(request.body)
         
         card_ids = data.get('card_ids', [])
-        if not card_ids:
+        selection = data.get('selection')
+        if not card_ids and not selection:
             return JsonResponse({'success': False, 'message': 'No cards selected!'}, status=400)
         
+        # Store JPEG/PNG/WebP as is instead of deflating them again
+        store_compressed = data.get('store_compressed')
+        if store_compressed is None:
+            store_compressed = ExportService.store_compressed_default()
+        
         # Get selected cards in database order
-        cards = IDCard.objects.filter(table=table, id__in=card_ids).order_by('id')
+        cards = IDCardService.select_cards(table, card_ids, selection).order_by('id')
         if not cards.exists():
             return JsonResponse({'success': False, 'message': 'No cards found!'}, status=400)
         
@@ -1355,7 +1344,10 @@ def api_idcard_download_images(request, table_id):
                                         download_filename = os.path.basename(img_path)
                                         
                                         # Add to ZIP with the filename
-                                        zf.writestr(download_filename, img_data)
+                                        zf.writestr(
+                                            download_filename, img_data,
+                                            compress_type=ExportService.zip_compress_type(download_filename, store_compressed)
+                                        )
                                         images_in_field += 1
                         except Exception as e:
                             print(f"Error downloading image {img_path}: {e}")
@@ -1416,6 +1408,42 @@ def api_idcard_download_images(request, table_id):
         return JsonResponse({'success': False, 'message': str(e)}, status=400)
 
 
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@api_super_admin_required
+def api_idcard_download_images_stream(request, table_id):
+    """
+    API endpoint to download images as ONE streamed ZIP (a folder per image column).
+    
+    Card selection: JSON body {"card_ids": [...]} or {"selection": {...}}
+    (see IDCardService.select_cards), or form/query fields card_ids=1,2,3 or
+    selection=<JSON>. Requests without a selection are rejected.
+    store_compressed=false deflates JPEG/PNG/WebP entries as well.
+    """
+    selection = None
+    try:
+        if request.content_type == 'application/json' and request.body:
+            data = json.loads(request.body)
+            card_ids = data.get('card_ids')
+            selection = data.get('selection')
+            store_compressed = data.get('store_compressed')
+        else:
+            params = request.POST if request.method == 'POST' else request.GET
+            raw_ids = params.get('card_ids')
+            card_ids = [int(i) for i in raw_ids.split(',') if i.strip()] if raw_ids else None
+            raw_selection = params.get('selection')
+            selection = json.loads(raw_selection) if raw_selection else None
+            raw_store = params.get('store_compressed')
+            store_compressed = raw_store.lower() in ('true', '1', 'yes') if raw_store else None
+    except (json.JSONDecodeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'Invalid card selection!'}, status=400)
+    
+    result = ExportService.stream_images_zip(table_id, card_ids, store_compressed, selection)
+    if not result.success:
+        return api_response(request, result, status=400)
+    return result.data['response']
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 @api_super_admin_required
@@ -1450,9 +1478,9 @@ def api_idcard_reupload_images(request, table_id):
         
         # Get cards to process in database order
         if card_ids:
-            cards = IDCard.objects.filter(table=table, id__in=card_ids).order_by('id')
+            cards = IDCard.objects.filter(table=table, id__in=card_ids).select_related('table').order_by('id')
         else:
-            cards = IDCard.objects.filter(table=table).order_by('id')
+            cards = IDCard.objects.filter(table=table).select_related('table').order_by('id')
         
         cards_to_process = list(cards)
         
@@ -1591,28 +1619,30 @@ def api_idcard_reupload_images(request, table_id):
                         batch_counter += 1
                         photo_info = matched_photo_info
                         
+                        # Downscale / strip metadata (may switch the extension)
+                        stored_bytes, stored_ext = ImageService.apply_ingest_policy(
+                            photo_info['bytes'], photo_info['ext']
+                        )
+                        
                         # Generate filename
                         if existing_image_path and existing_image_path not in ['NOT_FOUND', 'PENDING', '']:
                             # UPDATE: Keep original timestamp, add new suffix
-                            new_filename = generate_updated_image_filename(existing_image_path, photo_info['ext'])
+                            new_filename = generate_updated_image_filename(existing_image_path, stored_ext)
                             
-                            # Delete old image file
-                            try:
-                                if default_storage.exists(existing_image_path):
-                                    default_storage.delete(existing_image_path)
-                                    print(f"Deleted old image during reupload: {existing_image_path}")
-                            except Exception as del_err:
-                                print(f"Warning: Could not delete old image {existing_image_path}: {del_err}")
+                            # Delete old image file (kept if other cards share it)
+                            result = ImageService.delete_image(existing_image_path)
+                            if not result.success:
+                                print(f"Warning: Could not delete old image {existing_image_path}: {result.message}")
                         else:
                             # FIRST UPLOAD: Generate fresh filename
-                            new_filename = generate_image_filename(batch_counter, photo_info['ext'])
+                            new_filename = generate_image_filename(batch_counter, stored_ext)
                         
                         # Save to client's UUID folder
                         file_path = f"{client_image_folder}/{new_filename}"
                         
                         saved_path, renamed, success = safe_save_image(
-                            default_storage, file_path, ContentFile(photo_info['bytes']),
-                            fallback_name=f"reupload_{int(time.time())}_{batch_counter}{photo_info['ext']}"
+                            default_storage, file_path, ContentFile(stored_bytes),
+                            fallback_name=f"reupload_{int(time.time())}_{batch_counter}{stored_ext}"
                         )
                         
                         if success and saved_path:
@@ -1661,595 +1691,19 @@ def api_idcard_reupload_images(request, table_id):
 def api_idcard_download_docx(request, table_id):
     """API endpoint to download selected cards as Word document (.docx or .doc format)"""
     try:
-        from docx import Document
-        from docx.shared import Inches, Cm, Pt, RGBColor
-        from docx.enum.table import WD_TABLE_ALIGNMENT
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        from docx.oxml.ns import nsdecls
-        from docx.oxml import parse_xml
-        from io import BytesIO
-        from datetime import datetime
-        from django.http import HttpResponse
-        from django.core.files.storage import default_storage
-        import os
-        from PIL import Image
-        
-        table = get_object_or_404(IDCardTable, id=table_id)
         data = json.loads(request.body)
-        
-        card_ids = data.get('card_ids', [])
-        doc_format = data.get('format', 'docx')  # 'docx' or 'doc'
-        
-        if not card_ids:
-            return JsonResponse({'success': False, 'message': 'No cards selected!'}, status=400)
-        
-        # Get selected cards in database order (first uploaded = first shown)
-        cards = IDCard.objects.filter(table=table, id__in=card_ids).order_by('id')
-        if not cards.exists():
-            return JsonResponse({'success': False, 'message': 'No cards found!'}, status=400)
-        
-        # Get table fields configuration - maintain original order
-        table_fields = table.fields
-        
-        # Build ordered_fields list - TEXT fields first, then IMAGE fields (images on right side)
-        # Each field has: name, type, is_image flag
-        text_fields = []
-        image_fields = []
-        # Image field types
-        IMAGE_FIELD_TYPES = ['photo', 'mother_photo', 'father_photo', 'barcode', 'qr_code', 'signature', 'image']
-        
-        for f in table_fields:
-            field_name = f['name']
-            field_type = f.get('type', 'text')
-            # Check if it's an image field
-            is_image = (field_type in IMAGE_FIELD_TYPES or field_name.upper() in ['PHOTO', 'SIGNATURE', 'IMAGE', 'PIC', 'PICTURE', 'SIGN'])
-            field_info = {
-                'name': field_name,
-                'type': field_type,
-                'is_image': is_image
-            }
-            if is_image:
-                image_fields.append(field_info)
-            else:
-                text_fields.append(field_info)
-        
-        # Combine: text fields first (left), image fields last (right)
-        ordered_fields = text_fields + image_fields
-        
-        # Get client/institution name from the table's group
-        institution_name = table.group.client.name if table.group and table.group.client else "Institution"
-        
-        # Create Word document
-        doc = Document()
-        
-        # Set page orientation to landscape with 1cm margins
-        from docx.enum.section import WD_ORIENT
-        section = doc.sections[0]
-        # Swap width and height for landscape
-        new_width = section.page_height
-        new_height = section.page_width
-        section.page_width = new_width
-        section.page_height = new_height
-        section.orientation = WD_ORIENT.LANDSCAPE
-        
-        # Set 1cm margins on all sides
-        section.left_margin = Cm(1)
-        section.right_margin = Cm(1)
-        section.top_margin = Cm(0.8)
-        section.bottom_margin = Cm(0.3)  # Minimal gap between content and footer
-        
-        # Header/Footer distance from edge
-        section.header_distance = Cm(0.3)
-        section.footer_distance = Cm(1)  # 1cm from bottom edge
-        
-        # Add Header
-        header = section.header
-        header.is_linked_to_previous = False
-        
-        # Get current date formatted
-        from datetime import datetime
-        current_date = datetime.now().strftime('%d-%m-%Y')
-        
-        # Create header table for 3-column layout - use full available width matching data table
-        header_table = header.add_table(rows=1, cols=3, width=Cm(27.5))
-        header_table.autofit = False
-        header_table.alignment = WD_TABLE_ALIGNMENT.CENTER
-        header_cells = header_table.rows[0].cells
-        
-        # Set column widths for header (left wider for institute name, center for title, right for brand)
-        header_cells[0].width = Cm(9)
-        header_cells[1].width = Cm(11)
-        header_cells[2].width = Cm(7.5)
-        
-        # Left: INSTITUTE NAME: [Client Name] - bold, Arial
-        left_para = header_cells[0].paragraphs[0]
-        left_run = left_para.add_run(f'INSTITUTE NAME: {institution_name}')
-        left_run.bold = True
-        left_run.font.name = 'Arial'
-        left_run.font.size = Pt(10)
-        left_run.font.color.rgb = RGBColor(0, 0, 0)  # Black
-        left_para.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        # Remove spacing below paragraph
-        pPr_left = left_para._p.get_or_add_pPr()
-        pPr_left.append(parse_xml(r'<w:spacing {} w:before="0" w:after="0" w:line="240" w:lineRule="auto"/>'.format(nsdecls('w'))))
-        
-        # Center: [Table Name] (Current Date) - bold, Arial
-        center_para = header_cells[1].paragraphs[0]
-        center_run = center_para.add_run(f'{table.name} ({current_date})')
-        center_run.bold = True
-        center_run.font.name = 'Arial'
-        center_run.font.size = Pt(11)
-        center_run.font.color.rgb = RGBColor(0, 0, 0)  # Black
-        center_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        # Remove spacing below paragraph
-        pPr_center = center_para._p.get_or_add_pPr()
-        pPr_center.append(parse_xml(r'<w:spacing {} w:before="0" w:after="0" w:line="240" w:lineRule="auto"/>'.format(nsdecls('w'))))
-        
-        # Right: ADARSH ID CARDS - bold, Arial
-        right_para = header_cells[2].paragraphs[0]
-        right_run = right_para.add_run('ADARSH ID CARDS')
-        right_run.bold = True
-        right_run.font.name = 'Arial'
-        right_run.font.size = Pt(10)
-        right_run.font.color.rgb = RGBColor(0, 0, 0)  # Black
-        right_para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
-        # Remove spacing below paragraph
-        pPr_right = right_para._p.get_or_add_pPr()
-        pPr_right.append(parse_xml(r'<w:spacing {} w:before="0" w:after="0" w:line="240" w:lineRule="auto"/>'.format(nsdecls('w'))))
-        
-        # Remove header table borders and set minimal spacing + vertical center
-        from docx.oxml.ns import qn
-        for cell in header_cells:
-            tc = cell._tc
-            tcPr = tc.get_or_add_tcPr()
-            tcBorders = parse_xml(
-                r'<w:tcBorders {0}>'
-                r'<w:top w:val="nil"/>'
-                r'<w:left w:val="nil"/>'
-                r'<w:bottom w:val="nil"/>'
-                r'<w:right w:val="nil"/>'
-                r'</w:tcBorders>'.format(nsdecls('w'))
-            )
-            tcPr.append(tcBorders)
-            # Add vertical alignment center
-            vAlign = parse_xml(r'<w:vAlign {} w:val="center"/>'.format(nsdecls('w')))
-            tcPr.append(vAlign)
-            # Zero cell margins
-            tcMar = parse_xml(
-                r'<w:tcMar {}>'
-                r'<w:top w:w="0" w:type="dxa"/>'
-                r'<w:bottom w:w="0" w:type="dxa"/>'
-                r'</w:tcMar>'.format(nsdecls('w'))
-            )
-            tcPr.append(tcMar)
-        
-        # No underline - removed
-        
-        # Add Footer with 2 lines - minimal gap from content
-        footer = section.footer
-        footer.is_linked_to_previous = False
-        
-        from docx.oxml import OxmlElement
-        
-        # Footer Line 1 - Note text (7pt, Arial)
-        footer_para1 = footer.add_paragraph()
-        footer_run1 = footer_para1.add_run('Note: This document is computer generated. Please verify all details before printing ID cards.')
-        footer_run1.font.name = 'Arial'
-        footer_run1.font.size = Pt(7)
-        footer_run1.font.color.rgb = RGBColor(0, 0, 0)
-        footer_para1.alignment = WD_ALIGN_PARAGRAPH.LEFT
-        pPr1 = footer_para1._p.get_or_add_pPr()
-        pPr1.append(parse_xml(r'<w:spacing {} w:before="0" w:after="0" w:line="180" w:lineRule="exact"/>'.format(nsdecls('w'))))
-        
-        # Footer Line 2 - Generated date + copyright on left, Page X of Y on right (using tabs)
-        footer_para2 = footer.add_paragraph()
-        pPr2 = footer_para2._p.get_or_add_pPr()
-        pPr2.append(parse_xml(r'<w:spacing {} w:before="0" w:after="0" w:line="180" w:lineRule="exact"/>'.format(nsdecls('w'))))
-        
-        # Add tab stop at right margin for right-aligned page number
-        tabs = parse_xml(r'<w:tabs {}><w:tab w:val="right" w:pos="14400"/></w:tabs>'.format(nsdecls('w')))
-        pPr2.append(tabs)
-        
-        # Left part: Generated date + copyright (7pt)
-        left_run = footer_para2.add_run('Generated on: ' + datetime.now().strftime('%d-%b-%Y %I:%M %p') + ' | © Adarsh ID Cards Management System - All Rights Reserved')
-        left_run.font.name = 'Arial'
-        left_run.font.size = Pt(7)
-        left_run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        # Tab to move to right
-        tab_run = footer_para2.add_run('\t')
-        
-        # Page X of Y (9pt, bold)
-        page_run = footer_para2.add_run('Page ')
-        page_run.font.name = 'Arial'
-        page_run.font.size = Pt(9)
-        page_run.font.bold = True
-        page_run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        # PAGE field
-        fldChar1 = OxmlElement('w:fldChar')
-        fldChar1.set(qn('w:fldCharType'), 'begin')
-        instrText = OxmlElement('w:instrText')
-        instrText.set(qn('xml:space'), 'preserve')
-        instrText.text = "PAGE"
-        fldChar2 = OxmlElement('w:fldChar')
-        fldChar2.set(qn('w:fldCharType'), 'separate')
-        fldChar3 = OxmlElement('w:fldChar')
-        fldChar3.set(qn('w:fldCharType'), 'end')
-        
-        page_num_run = footer_para2.add_run()
-        page_num_run.font.size = Pt(9)
-        page_num_run.font.bold = True
-        page_num_run._r.append(fldChar1)
-        page_num_run._r.append(instrText)
-        page_num_run._r.append(fldChar2)
-        page_num_run._r.append(fldChar3)
-        
-        of_run = footer_para2.add_run(' of ')
-        of_run.font.name = 'Arial'
-        of_run.font.size = Pt(9)
-        of_run.font.bold = True
-        of_run.font.color.rgb = RGBColor(0, 0, 0)
-        
-        # NUMPAGES field
-        fldChar4 = OxmlElement('w:fldChar')
-        fldChar4.set(qn('w:fldCharType'), 'begin')
-        instrText2 = OxmlElement('w:instrText')
-        instrText2.set(qn('xml:space'), 'preserve')
-        instrText2.text = "NUMPAGES"
-        fldChar5 = OxmlElement('w:fldChar')
-        fldChar5.set(qn('w:fldCharType'), 'separate')
-        fldChar6 = OxmlElement('w:fldChar')
-        fldChar6.set(qn('w:fldCharType'), 'end')
-        
-        total_pages_run = footer_para2.add_run()
-        total_pages_run.font.size = Pt(9)
-        total_pages_run.font.bold = True
-        total_pages_run._r.append(fldChar4)
-        total_pages_run._r.append(instrText2)
-        total_pages_run._r.append(fldChar5)
-        total_pages_run._r.append(fldChar6)
-        
-        # Calculate number of columns: Sr No + all fields (in original order)
-        num_cols = 1 + len(ordered_fields)
-        
-        # First pass: Calculate max content length for each column to determine widths
-        column_max_lengths = {}
-        column_max_lengths[0] = 5  # Sr No. column - fixed width
-        
-        # Calculate widths for each field in order
-        for idx, field in enumerate(ordered_fields):
-            field_name = field['name']
-            if field['is_image']:
-                # Image fields - fixed width for 2.5cm height images
-                column_max_lengths[1 + idx] = 12
-            else:
-                # Text fields - calculate based on content
-                max_len = len(field_name)  # Start with header length
-                for card in cards:
-                    field_data = card.field_data or {}
-                    value = str(field_data.get(field_name, ''))
-                    if len(value) > max_len:
-                        max_len = len(value)
-                # Cap max length for very long text
-                column_max_lengths[1 + idx] = min(max_len, 50)
-        
-        # Calculate column widths based on content length
-        # Available width in landscape A4 with 1cm margins: approximately 27.7cm
-        total_chars = sum(column_max_lengths.values())
-        available_width_cm = 27.5  # Full width for landscape with 1cm margins
-        
-        # Calculate column widths
-        column_widths = {}
-        for col_idx in range(num_cols):
-            col_chars = column_max_lengths.get(col_idx, 10)
-            col_width_cm = (col_chars / total_chars) * available_width_cm
-            col_width_cm = max(1.5, min(col_width_cm, 8.0))
-            column_widths[col_idx] = col_width_cm
-        
-        # Helper function to set cell margins (minimal padding)
-        def set_cell_margins(cell, top=0, bottom=0, left=28, right=28):
-            """Set cell margins in twips (1/20 of a point). 28 twips ≈ 1px"""
-            tc = cell._tc
-            tcPr = tc.get_or_add_tcPr()
-            tcMar = parse_xml(
-                r'<w:tcMar {}>'
-                r'<w:top w:w="{}" w:type="dxa"/>'
-                r'<w:bottom w:w="{}" w:type="dxa"/>'
-                r'<w:left w:w="{}" w:type="dxa"/>'
-                r'<w:right w:w="{}" w:type="dxa"/>'
-                r'</w:tcMar>'.format(nsdecls('w'), top, bottom, left, right)
-            )
-            tcPr.append(tcMar)
-        
-        # Helper function to set cell vertical alignment
-        def set_cell_vertical_alignment(cell, align='center'):
-            """Set vertical alignment: 'top', 'center', 'bottom'"""
-            tc = cell._tc
-            tcPr = tc.get_or_add_tcPr()
-            vAlign = parse_xml(r'<w:vAlign {} w:val="{}"/>'.format(nsdecls('w'), align))
-            tcPr.append(vAlign)
-        
-        # Helper function to set paragraph spacing
-        def set_paragraph_spacing(paragraph, before=0, after=0, line=240):
-            """Set paragraph spacing in twips"""
-            pPr = paragraph._p.get_or_add_pPr()
-            spacing = parse_xml(
-                r'<w:spacing {} w:before="{}" w:after="{}" w:line="{}" w:lineRule="auto"/>'.format(
-                    nsdecls('w'), before, after, line
-                )
-            )
-            pPr.append(spacing)
-        
-        # Helper function to set table borders to 0.5pt (half point)
-        def set_table_borders_half_pt(table):
-            """Set all table borders to 0.5pt (4 eighths of a point = sz 4)"""
-            tbl = table._tbl
-            tblPr = tbl.tblPr if tbl.tblPr is not None else parse_xml(r'<w:tblPr {}/>' .format(nsdecls('w')))
-            if tbl.tblPr is None:
-                tbl.insert(0, tblPr)
-            
-            # Remove existing borders if any
-            for child in tblPr:
-                if 'tblBorders' in child.tag:
-                    tblPr.remove(child)
-                    break
-            
-            # sz=4 means 0.5pt (size is in eighths of a point)
-            tblBorders = parse_xml(
-                r'<w:tblBorders {}>'
-                r'<w:top w:val="single" w:sz="4" w:color="000000"/>'
-                r'<w:left w:val="single" w:sz="4" w:color="000000"/>'
-                r'<w:bottom w:val="single" w:sz="4" w:color="000000"/>'
-                r'<w:right w:val="single" w:sz="4" w:color="000000"/>'
-                r'<w:insideH w:val="single" w:sz="4" w:color="000000"/>'
-                r'<w:insideV w:val="single" w:sz="4" w:color="000000"/>'
-                r'</w:tblBorders>'.format(nsdecls('w'))
-            )
-            tblPr.append(tblBorders)
-        
-        # Helper function to style header row - NO BACKGROUND, only bold, Arial font
-        def style_header_row(header_cells):
-            col_idx = 0
-            
-            # Sr No header
-            header_cells[col_idx].text = 'Sr No.'
-            header_cells[col_idx].paragraphs[0].runs[0].bold = True
-            header_cells[col_idx].paragraphs[0].runs[0].font.name = 'Arial'
-            header_cells[col_idx].paragraphs[0].runs[0].font.size = Pt(9)
-            header_cells[col_idx].paragraphs[0].runs[0].font.color.rgb = RGBColor(0, 0, 0)
-            header_cells[col_idx].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            set_cell_margins(header_cells[col_idx], 0, 0, 14, 14)
-            set_cell_vertical_alignment(header_cells[col_idx], 'center')
-            set_paragraph_spacing(header_cells[col_idx].paragraphs[0], 0, 0)
-            header_cells[col_idx].width = Cm(column_widths[col_idx])
-            col_idx += 1
-            
-            # All field headers in original order
-            for field in ordered_fields:
-                header_cells[col_idx].text = field['name']
-                header_cells[col_idx].paragraphs[0].runs[0].bold = True
-                header_cells[col_idx].paragraphs[0].runs[0].font.name = 'Arial'
-                header_cells[col_idx].paragraphs[0].runs[0].font.size = Pt(9)
-                header_cells[col_idx].paragraphs[0].runs[0].font.color.rgb = RGBColor(0, 0, 0)
-                header_cells[col_idx].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-                set_cell_margins(header_cells[col_idx], 0, 0, 14, 14)
-                set_cell_vertical_alignment(header_cells[col_idx], 'center')
-                set_paragraph_spacing(header_cells[col_idx].paragraphs[0], 0, 0)
-                header_cells[col_idx].width = Cm(column_widths[col_idx])
-                col_idx += 1
-            
-            # NO background shading - just bold text
-        
-        # Fixed row height for data rows - 2.5cm (same as image, no gap)
-        row_height = Cm(2.5)
-        ENTRIES_PER_PAGE = 7
-        
-        # Convert cards queryset to list
-        cards_list = list(cards)
-        total_cards = len(cards_list)
-        
-        # Remove default empty paragraph that Word creates
-        if doc.paragraphs:
-            p = doc.paragraphs[0]._element
-            p.getparent().remove(p)
-        
-        # Process cards in batches of 7 per page
-        current_table = None
-        sr_no = 1
-        
-        for card_idx, card in enumerate(cards_list):
-            # Check if we need a new page/table
-            if card_idx % ENTRIES_PER_PAGE == 0:
-                if current_table is not None:
-                    # Add page break after previous table (not as a separate paragraph)
-                    # Use section break for continuous pages instead of page break
-                    from docx.oxml import OxmlElement
-                    from docx.oxml.ns import qn
-                    
-                    # Add paragraph with page break
-                    p = doc.add_paragraph()
-                    # Remove spacing from this paragraph
-                    pPr = p._p.get_or_add_pPr()
-                    pPr.append(parse_xml(r'<w:spacing {} w:before="0" w:after="0" w:line="0" w:lineRule="auto"/>'.format(nsdecls('w'))))
-                    
-                    # Add page break run
-                    run = p.add_run()
-                    br = OxmlElement('w:br')
-                    br.set(qn('w:type'), 'page')
-                    run._r.append(br)
-                
-                # Create new table with header row
-                current_table = doc.add_table(rows=1, cols=num_cols)
-                current_table.style = 'Table Grid'
-                current_table.alignment = WD_TABLE_ALIGNMENT.CENTER
-                
-                # Set table borders to 0.5pt
-                set_table_borders_half_pt(current_table)
-                
-                # Style header row
-                style_header_row(current_table.rows[0].cells)
-            
-            # Add data row to current table
-            field_data = card.field_data or {}
-            new_row = current_table.add_row()
-            row_cells = new_row.cells
-            
-            # Set fixed row height
-            tr = new_row._tr
-            trPr = tr.get_or_add_trPr()
-            trHeight = parse_xml(r'<w:trHeight {} w:val="{}" w:hRule="exact"/>'.format(
-                nsdecls('w'), int(row_height.twips)
-            ))
-            trPr.append(trHeight)
-            
-            col_idx = 0
-            
-            # Sr No - minimal padding, Arial font
-            row_cells[col_idx].text = str(sr_no)
-            row_cells[col_idx].paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            row_cells[col_idx].paragraphs[0].runs[0].font.name = 'Arial'
-            row_cells[col_idx].paragraphs[0].runs[0].font.size = Pt(9)
-            row_cells[col_idx].paragraphs[0].runs[0].font.color.rgb = RGBColor(0, 0, 0)
-            set_cell_margins(row_cells[col_idx], 0, 0, 14, 14)  # Minimal padding
-            set_cell_vertical_alignment(row_cells[col_idx], 'center')
-            set_paragraph_spacing(row_cells[col_idx].paragraphs[0], 0, 0)
-            row_cells[col_idx].width = Cm(column_widths[col_idx])
-            col_idx += 1
-            
-            # All fields in original order
-            for field in ordered_fields:
-                field_name = field['name']
-                cell = row_cells[col_idx]
-                cell.width = Cm(column_widths[col_idx])
-                
-                if field['is_image']:
-                    # Image field - NO padding, image touches borders
-                    img_path = field_data.get(field_name, '')
-                    
-                    # Set cell styling - zero padding on all sides
-                    set_cell_margins(cell, 0, 0, 0, 0)  # No padding - image touches borders
-                    set_cell_vertical_alignment(cell, 'center')
-                    
-                    if img_path and img_path != 'NOT_FOUND' and img_path.strip():
-                        try:
-                            if default_storage.exists(img_path):
-                                with default_storage.open(img_path, 'rb') as img_file:
-                                    img_data = img_file.read()
-                                    
-                                    # Validate image data is not empty
-                                    if not img_data or len(img_data) < 100:
-                                        raise ValueError("Image data is empty or too small")
-                                    
-                                    # Add 0.5pt black border to image
-                                    try:
-                                        pil_img = Image.open(BytesIO(img_data))
-                                        
-                                        # Verify image can be loaded
-                                        pil_img.verify()
-                                        # Re-open after verify (verify invalidates the image)
-                                        pil_img = Image.open(BytesIO(img_data))
-                                        
-                                        # Convert to RGB if needed
-                                        if pil_img.mode in ('RGBA', 'LA', 'P'):
-                                            pil_img = pil_img.convert('RGB')
-                                        
-                                        # Add black border (1 pixel ≈ 0.5pt at 144 DPI)
-                                        from PIL import ImageOps
-                                        pil_img = ImageOps.expand(pil_img, border=1, fill='black')
-                                        
-                                        # Save image to BytesIO
-                                        img_stream = BytesIO()
-                                        pil_img.save(img_stream, format='JPEG', quality=90)
-                                        img_stream.seek(0)
-                                        
-                                        # Target height is 2.5cm (fits in 2.7cm row with padding)
-                                        target_height_cm = 2.5
-                                        
-                                        # Add image to cell
-                                        paragraph = cell.paragraphs[0]
-                                        run = paragraph.add_run()
-                                        run.add_picture(img_stream, height=Cm(target_height_cm))
-                                        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                                        set_paragraph_spacing(paragraph, 0, 0)
-                                    except Exception as img_err:
-                                        print(f"Image processing error for {img_path}: {img_err}")
-                                        cell.text = '[Error]'
-                                        cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-                                        cell.paragraphs[0].runs[0].font.size = Pt(8)
-                                        cell.paragraphs[0].runs[0].font.color.rgb = RGBColor(150, 150, 150)
-                                        set_paragraph_spacing(cell.paragraphs[0], 0, 0)
-                            else:
-                                cell.text = '[No Image]'
-                                cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-                                cell.paragraphs[0].runs[0].font.size = Pt(8)
-                                cell.paragraphs[0].runs[0].font.color.rgb = RGBColor(150, 150, 150)
-                                set_paragraph_spacing(cell.paragraphs[0], 0, 0)
-                        except Exception as e:
-                            cell.text = '[Error]'
-                            cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-                            if cell.paragraphs[0].runs:
-                                cell.paragraphs[0].runs[0].font.size = Pt(8)
-                            set_paragraph_spacing(cell.paragraphs[0], 0, 0)
-                    else:
-                        # Empty placeholder - leave empty (white background)
-                        paragraph = cell.paragraphs[0]
-                        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                        set_paragraph_spacing(paragraph, 0, 0)
-                else:
-                    # Text field - minimal padding, Arial font
-                    value = field_data.get(field_name, '')
-                    # Ensure uppercase for display
-                    value = str(value).upper() if value else ''
-                    cell.text = value
-                    
-                    # Apply minimal styling to text cells with Arial font
-                    set_cell_margins(cell, 0, 0, 28, 28)  # 0 top/bottom, small left/right
-                    set_cell_vertical_alignment(cell, 'center')
-                    if cell.paragraphs[0].runs:
-                        cell.paragraphs[0].runs[0].font.name = 'Arial'
-                        cell.paragraphs[0].runs[0].font.size = Pt(9)
-                        cell.paragraphs[0].runs[0].font.color.rgb = RGBColor(0, 0, 0)
-                    set_paragraph_spacing(cell.paragraphs[0], 0, 0)
-                
-                col_idx += 1
-            
-            sr_no += 1
-        
-        # Save document to buffer
-        doc_buffer = BytesIO()
-        doc.save(doc_buffer)
-        doc_buffer.seek(0)
-        
-        # Generate filename
-        timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        if doc_format == 'doc':
-            # For .doc format, we still generate .docx but rename it
-            # Most modern systems can open .docx, but for true .doc compatibility
-            # we'd need additional conversion. For now, we provide .docx with .doc extension
-            # which works in Word 2007+ with compatibility mode
-            filename = f"{table.name}_{timestamp_str}.doc"
-            content_type = 'application/msword'
-        else:
-            filename = f"{table.name}_{timestamp_str}.docx"
-            content_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        
-        response = HttpResponse(doc_buffer.getvalue(), content_type=content_type)
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response['Content-Length'] = len(doc_buffer.getvalue())
-        
-        return response
-        
-    except ImportError as e:
-        return JsonResponse({
-            'success': False, 
-            'message': 'python-docx or Pillow library not installed. Run: pip install python-docx Pillow'
-        }, status=500)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data!'}, status=400)
-    except Exception as e:
-        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    
+    result = ExportService.export_docx(
+        table_id,
+        data.get('card_ids', []),
+        data.get('format', 'docx'),  # 'docx' or 'doc'
+        data.get('selection')
+    )
+    if not result.success:
+        return api_response(request, result, status=400)
+    return result.data['response']
 
 
 @csrf_exempt
@@ -2257,137 +1711,11 @@ def api_idcard_download_docx(request, table_id):
 def api_idcard_download_xlsx(request, table_id):
     """API endpoint to download selected cards as Excel file (.xlsx format) with auto-sized columns"""
     try:
-        import openpyxl
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-        from openpyxl.utils import get_column_letter
-        from io import BytesIO
-        from datetime import datetime
-        from django.http import HttpResponse
-        
-        table = get_object_or_404(IDCardTable, id=table_id)
-        
-        # Get request data
         data = json.loads(request.body)
-        card_ids = data.get('card_ids', [])
-        
-        if not card_ids:
-            return JsonResponse({'success': False, 'message': 'No cards selected!'}, status=400)
-        
-        # Get cards
-        cards = IDCard.objects.filter(table=table, id__in=card_ids).order_by('id')
-        
-        if not cards.exists():
-            return JsonResponse({'success': False, 'message': 'No cards found!'}, status=400)
-        
-        # Get table fields
-        table_fields = table.fields or []
-        
-        # Image field types
-        IMAGE_FIELD_TYPES = ['photo', 'mother_photo', 'father_photo', 'barcode', 'qr_code', 'signature', 'image']
-        
-        # Separate text fields (exclude image fields for Excel)
-        text_fields = []
-        for f in table_fields:
-            field_name = f['name'].upper()
-            # Skip image fields
-            if field_name in ['PHOTO', 'SIGNATURE', 'IMAGE', 'PIC', 'PICTURE', 'SIGN', 'MOTHER PHOTO', 'FATHER PHOTO', 'M PHOTO', 'F PHOTO', 'BARCODE', 'QR CODE', 'QR']:
-                continue
-            if f.get('type', 'text') in IMAGE_FIELD_TYPES:
-                continue
-            text_fields.append(f)
-        
-        # Create workbook and worksheet
-        wb = Workbook()
-        ws = wb.active
-        ws.title = table.name[:31]  # Excel sheet names max 31 chars
-        
-        # Define simple styles - no colors, just clean formatting
-        header_font = Font(name='Calibri', size=11, bold=True)
-        header_alignment = Alignment(horizontal='center', vertical='center')
-        
-        data_font = Font(name='Calibri', size=10)
-        data_alignment = Alignment(horizontal='left', vertical='center', wrap_text=False)
-        center_alignment = Alignment(horizontal='center', vertical='center')
-        
-        thin_border = Border(
-            left=Side(style='thin', color='CCCCCC'),
-            right=Side(style='thin', color='CCCCCC'),
-            top=Side(style='thin', color='CCCCCC'),
-            bottom=Side(style='thin', color='CCCCCC')
-        )
-        
-        # Track max width for each column
-        column_widths = {}
-        
-        # Add header row (no Sr No. - only data fields)
-        headers = [f['name'] for f in text_fields]
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.font = header_font
-            cell.alignment = header_alignment
-            cell.border = thin_border
-            
-            # Track width
-            column_widths[col_idx] = len(str(header)) + 2
-        
-        # Add data rows
-        for row_idx, card in enumerate(cards, 2):
-            field_data = card.field_data or {}
-            
-            # Data fields (no Sr No.)
-            for col_idx, field in enumerate(text_fields, 1):
-                value = field_data.get(field['name'], '')
-                # Ensure uppercase for display
-                value_str = str(value).upper() if value else ''
-                
-                cell = ws.cell(row=row_idx, column=col_idx, value=value_str)
-                cell.font = data_font
-                cell.alignment = data_alignment
-                cell.border = thin_border
-                
-                # Track max width (cap at 50 to prevent overly wide columns)
-                current_width = len(value_str) + 2
-                current_width = min(current_width, 50)
-                column_widths[col_idx] = max(column_widths.get(col_idx, 8), current_width)
-        
-        # Apply column widths
-        for col_idx, width in column_widths.items():
-            col_letter = get_column_letter(col_idx)
-            # Minimum width of 8, add some padding
-            final_width = max(8, width * 1.1)
-            ws.column_dimensions[col_letter].width = final_width
-        
-        # Set row height for header
-        ws.row_dimensions[1].height = 25
-        
-        # Freeze header row
-        ws.freeze_panes = 'A2'
-        
-        # Save to buffer
-        xlsx_buffer = BytesIO()
-        wb.save(xlsx_buffer)
-        xlsx_buffer.seek(0)
-        
-        # Generate filename
-        timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{table.name}_{timestamp_str}.xlsx"
-        
-        response = HttpResponse(
-            xlsx_buffer.getvalue(),
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response['Content-Length'] = len(xlsx_buffer.getvalue())
-        
-        return response
-        
-    except ImportError as e:
-        return JsonResponse({
-            'success': False, 
-            'message': 'openpyxl library not installed. Run: pip install openpyxl'
-        }, status=500)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data!'}, status=400)
-    except Exception as e:
-        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    
+    result = ExportService.export_xlsx(table_id, data.get('card_ids', []), data.get('selection'))
+    if not result.success:
+        return api_response(request, result, status=400)
+    return result.data['response']
@@ -8,6 +8,7 @@ from django.views.decorators.csrf import csrf_exempt
 import json
 from .base import api_super_admin_required
 from ..services import StaffService
+from ..utils import api_response, FastJsonResponse
 
 
 @csrf_exempt
@@ -38,7 +39,7 @@ def api_staff_create(request):
         if result.success and 'email_sent' in result.data:
             response_data['email_sent'] = result.data['email_sent']
         
-        return JsonResponse(response_data, status=200 if result.success else 400)
+        return FastJsonResponse(response_data, request=request, status=200 if result.success else 400)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data'}, status=400)
     except Exception as e:
@@ -51,7 +52,7 @@ def api_staff_create(request):
 def api_staff_get(request, staff_id):
     """API endpoint to get a staff's details"""
     result = StaffService.get(staff_id, include_permissions=True)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -71,7 +72,7 @@ def api_staff_update(request, staff_id):
             profile_image = None
         
         result = StaffService.update(staff_id, data, profile_image=profile_image)
-        return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+        return api_response(request, result)
     except json.JSONDecodeError:
         return JsonResponse({'success': False, 'message': 'Invalid JSON data'}, status=400)
     except Exception as e:
@@ -84,7 +85,7 @@ def api_staff_update(request, staff_id):
 def api_staff_delete(request, staff_id):
     """API endpoint to delete a staff"""
     result = StaffService.delete(staff_id)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
 
 
 @csrf_exempt
@@ -93,4 +94,4 @@ def api_staff_delete(request, staff_id):
 def api_staff_toggle_status(request, staff_id):
     """API endpoint to toggle staff active/inactive status"""
     result = StaffService.toggle_status(staff_id)
-    return JsonResponse(result.to_response_dict(), status=200 if result.success else 400)
+    return api_response(request, result)
@@ -112,7 +112,7 @@ function bulkVerify(cardIds) {
         return;
     }
     if (typeof apiCall === 'function') {
-        apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { card_ids: cardIds, status: 'verified' })
+        apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { ...cardSelectionPayload(cardIds), status: 'verified' })
             .then(data => {
                 if (typeof showToast === 'function') showToast(`${data.updated_count} card(s) verified`);
                 location.reload();
@@ -127,7 +127,7 @@ function bulkApprove(cardIds) {
         return;
     }
     if (typeof apiCall === 'function') {
-        apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { card_ids: cardIds, status: 'approved' })
+        apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { ...cardSelectionPayload(cardIds), status: 'approved' })
             .then(data => {
                 if (typeof showToast === 'function') showToast(`${data.updated_count} card(s) approved`);
                 location.reload();
@@ -142,7 +142,7 @@ function bulkUnapprove(cardIds) {
         return;
     }
     if (typeof apiCall === 'function') {
-        apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { card_ids: cardIds, status: 'verified' })
+        apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { ...cardSelectionPayload(cardIds), status: 'verified' })
             .then(data => {
                 if (typeof showToast === 'function') showToast(`${data.updated_count} card(s) moved to verified`);
                 location.reload();
@@ -157,7 +157,7 @@ function bulkUnverify(cardIds) {
         return;
     }
     if (typeof apiCall === 'function') {
-        apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { card_ids: cardIds, status: 'pending' })
+        apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { ...cardSelectionPayload(cardIds), status: 'pending' })
             .then(data => {
                 if (typeof showToast === 'function') showToast(`${data.updated_count} card(s) moved to pending`);
                 location.reload();
@@ -177,7 +177,7 @@ function bulkDelete(cardIds) {
             return;
         }
         if (typeof apiCall === 'function') {
-            apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { card_ids: cardIds, status: 'pool' })
+            apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { ...cardSelectionPayload(cardIds), status: 'pool' })
                 .then(data => {
                     if (typeof showToast === 'function') showToast(`${data.updated_count} card(s) moved to pool`);
                     location.reload();
@@ -193,7 +193,7 @@ function bulkRetrieve(cardIds) {
         return;
     }
     if (typeof apiCall === 'function') {
-        apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { card_ids: cardIds, status: 'pending' })
+        apiCall(`/api/table/${tableId}/cards/bulk-status/`, 'POST', { ...cardSelectionPayload(cardIds), status: 'pending' })
             .then(data => {
                 if (typeof showToast === 'function') showToast(`${data.updated_count} card(s) retrieved to pending`);
                 location.reload();
@@ -302,7 +302,7 @@ function bulkDownload(cardIds) {
             'X-CSRFToken': csrfToken,
         },
         body: JSON.stringify({
-            card_ids: cardIds,
+            ...cardSelectionPayload(cardIds),
             status: 'download'
         })
     })
@@ -341,7 +341,7 @@ function bulkBackToApproved(cardIds) {
             'X-CSRFToken': csrfToken,
         },
         body: JSON.stringify({
-            card_ids: cardIds,
+            ...cardSelectionPayload(cardIds),
             status: 'approved'
         })
     })
@@ -176,11 +176,7 @@ function initCheckboxes() {
             
             // If unchecking, also deactivate the Select All DB button
             if (!this.checked) {
-                const selectAllDbBtn = document.getElementById('selectAllDbBtn');
-                if (selectAllDbBtn) {
-                    selectAllDbBtn.classList.remove('active');
-                    window.IDCardApp.allDbCardIds = null;
-                }
+                clearAllDbSelection();
             }
         });
     }
@@ -205,6 +201,7 @@ function initCheckboxes() {
                     for (let i = start; i <= end; i++) {
                         if (rowCheckboxes[i]) {
                             rowCheckboxes[i].checked = true;
+                            setAllDbCardExcluded(rowCheckboxes[i], false);
                         }
                     }
                     
@@ -230,14 +227,10 @@ function initCheckboxes() {
         tableBody.addEventListener('change', function(e) {
             if (e.target.classList.contains('rowCheckbox')) {
                 const rowCheckboxes = getRowCheckboxes();
+                // Select All DB stays active - unchecked cards are excluded from it
+                setAllDbCardExcluded(e.target, !e.target.checked);
                 if (!e.target.checked) {
                     selectAll.checked = false;
-                    // Also deactivate Select All DB if any checkbox is unchecked
-                    const selectAllDbBtn = document.getElementById('selectAllDbBtn');
-                    if (selectAllDbBtn) {
-                        selectAllDbBtn.classList.remove('active');
-                        window.IDCardApp.allDbCardIds = null;
-                    }
                 } else if ([...rowCheckboxes].every(c => c.checked)) {
                     selectAll.checked = true;
                 }
@@ -274,8 +267,7 @@ function initSelectAllDbButton() {
         
         // If already active, deselect all
         if (this.classList.contains('active')) {
-            this.classList.remove('active');
-            window.IDCardApp.allDbCardIds = null;
+            clearAllDbSelection();
             
             // Uncheck all visible checkboxes
             const selectAll = document.getElementById("selectAll");
@@ -296,9 +288,12 @@ function initSelectAllDbButton() {
             const response = await fetch(`/api/table/${tableId}/cards/all-ids/?status=${currentStatus}`);
             const data = await response.json();
             
-            if (data.success && data.card_ids) {
-                // Store all card IDs globally
-                window.IDCardApp.allDbCardIds = data.card_ids;
+            if (data.success && data.selection) {
+                // Keep only the server's handle for the cards (bulk requests
+                // send it back) and their count - never the ids themselves
+                window.IDCardApp.allDbSelection = data.selection;
+                window.IDCardApp.allDbTotalCount = data.total_count;
+                window.IDCardApp.allDbExcludedIds = new Set();
                 
                 // Mark button as active
                 this.classList.add('active');
@@ -328,23 +323,74 @@ function initSelectAllDbButton() {
     });
 }
 
-// Override getSelectedCardIds to use all DB IDs when Select All DB is active
+function isAllDbSelectionActive() {
+    const selectAllDbBtn = document.getElementById('selectAllDbBtn');
+    return !!(window.IDCardApp.allDbSelection &&
+        selectAllDbBtn && selectAllDbBtn.classList.contains('active'));
+}
+
+function clearAllDbSelection() {
+    const selectAllDbBtn = document.getElementById('selectAllDbBtn');
+    if (selectAllDbBtn) selectAllDbBtn.classList.remove('active');
+    window.IDCardApp.allDbSelection = null;
+    window.IDCardApp.allDbTotalCount = 0;
+    window.IDCardApp.allDbExcludedIds = new Set();
+}
+
+// Track a row unchecked (excluded) or re-checked while Select All DB is active
+function setAllDbCardExcluded(checkbox, excluded) {
+    if (!isAllDbSelectionActive()) return;
+    const app = window.IDCardApp;
+    const cardId = checkbox.closest('tr')?.getAttribute('data-card-id');
+    // Cards added after the selection was made (id > max_id) aren't in it
+    if (!cardId || Number(cardId) > app.allDbSelection.max_id) return;
+    
+    if (excluded) {
+        app.allDbExcludedIds.add(String(cardId));
+    } else {
+        app.allDbExcludedIds.delete(String(cardId));
+    }
+    
+    if (app.allDbExcludedIds.size >= app.allDbTotalCount) clearAllDbSelection();
+}
+
+// Override getSelectedCardIds to stand for the whole Select All DB selection
+// when it is active. Bulk actions only read .length from it and hand it to
+// cardSelectionPayload, which sends the selection handle.
 const originalGetSelectedCardIds = getSelectedCardIds;
 function getSelectedCardIdsWithDbSelect() {
-    // If Select All DB is active, return all DB card IDs
-    if (window.IDCardApp.allDbCardIds && window.IDCardApp.allDbCardIds.length > 0) {
-        const selectAllDbBtn = document.getElementById('selectAllDbBtn');
-        if (selectAllDbBtn && selectAllDbBtn.classList.contains('active')) {
-            return window.IDCardApp.allDbCardIds;
-        }
+    if (isAllDbSelectionActive()) {
+        const app = window.IDCardApp;
+        return {
+            length: app.allDbTotalCount - app.allDbExcludedIds.size,
+            isAllDbSelection: true,
+        };
     }
     // Otherwise, return selected visible checkboxes
     return originalGetSelectedCardIds();
 }
 
+// Request body fields for the cards an action targets: the Select All DB
+// selection handle (with the unchecked cards as exclude_ids) when cardIds
+// stands for that selection, the ids otherwise
+function cardSelectionPayload(cardIds) {
+    const app = window.IDCardApp;
+    if (cardIds && cardIds.isAllDbSelection && isAllDbSelectionActive()) {
+        if (app.allDbExcludedIds.size === 0) {
+            return { selection: app.allDbSelection };
+        }
+        const excludeIds = [...app.allDbExcludedIds].map(Number);
+        return { selection: { ...app.allDbSelection, exclude_ids: excludeIds } };
+    }
+    return { card_ids: cardIds };
+}
+
 // Expose globally
+window.cardSelectionPayload = cardSelectionPayload;
+window.IDCardApp.cardSelectionPayload = cardSelectionPayload;
 window.getRowCheckboxes = getRowCheckboxes;
 window.getSelectedCardIds = getSelectedCardIdsWithDbSelect;
+window.getCheckedCardIds = originalGetSelectedCardIds;
 window.getAllVisibleCardIds = getAllVisibleCardIds;
 window.getCardIdsForAction = getCardIdsForAction;
 window.updateButtonStates = updateButtonStates;
@@ -2,7 +2,7 @@
 // Contains: Download images, DOCX, XLSX, reupload images
 
 // ==========================================
-// DOWNLOAD IMAGES (Separate ZIP per image column)
+// DOWNLOAD IMAGES (One streamed ZIP, a folder per image column)
 // ==========================================
 
 function downloadImages(cardIds) {
@@ -17,94 +17,63 @@ function downloadImages(cardIds) {
         return;
     }
     
-    if (typeof showProgressToast === 'function') showProgressToast('Preparing images...', -1);
-    
-    const xhr = new XMLHttpRequest();
-    xhr.open('POST', `/api/table/${tableId}/cards/download-images/`, true);
-    xhr.setRequestHeader('Content-Type', 'application/json');
-    xhr.setRequestHeader('X-CSRFToken', typeof getCSRFToken === 'function' ? getCSRFToken() : '');
-    
-    xhr.onload = function() {
-        if (xhr.status === 200) {
+    // Submit a form into a hidden iframe so the browser writes the streamed
+    // ZIP straight to disk instead of buffering it in a Blob
+    let frame = document.getElementById('downloadImagesFrame');
+    if (!frame) {
+        frame = document.createElement('iframe');
+        frame.id = 'downloadImagesFrame';
+        frame.name = 'downloadImagesFrame';
+        frame.style.display = 'none';
+        document.body.appendChild(frame);
+        
+        // Only fires when an error page (JSON) loads - attachments don't load the frame
+        frame.addEventListener('load', function() {
+            let text = '';
             try {
-                const response = JSON.parse(xhr.responseText);
-                
-                if (response.success && response.zip_files && response.zip_files.length > 0) {
-                    // Download each ZIP file with a small delay between each
-                    let downloadIndex = 0;
-                    const totalZips = response.zip_files.length;
-                    
-                    function downloadNextZip() {
-                        if (downloadIndex >= totalZips) {
-                            if (typeof showDownloadComplete === 'function') {
-                                showDownloadComplete(`Downloaded ${totalZips} ZIP file(s) with ${response.total_images} images!`);
-                            }
-                            return;
-                        }
-                        
-                        const zipInfo = response.zip_files[downloadIndex];
-                        
-                        // Convert base64 to blob
-                        const binaryString = atob(zipInfo.data);
-                        const bytes = new Uint8Array(binaryString.length);
-                        for (let i = 0; i < binaryString.length; i++) {
-                            bytes[i] = binaryString.charCodeAt(i);
-                        }
-                        const blob = new Blob([bytes], { type: 'application/zip' });
-                        
-                        // Create download link
-                        const url = window.URL.createObjectURL(blob);
-                        const a = document.createElement('a');
-                        a.style.display = 'none';
-                        a.href = url;
-                        a.download = zipInfo.filename;
-                        
-                        document.body.appendChild(a);
-                        a.click();
-                        
-                        window.URL.revokeObjectURL(url);
-                        document.body.removeChild(a);
-                        
-                        downloadIndex++;
-                        
-                        // Update progress
-                        if (typeof showProgressToast === 'function') {
-                            showProgressToast(`Downloading ${downloadIndex}/${totalZips} ZIPs...`, Math.round((downloadIndex / totalZips) * 100));
-                        }
-                        
-                        // Download next ZIP after a small delay (to allow browser to process)
-                        setTimeout(downloadNextZip, 300);
-                    }
-                    
-                    // Start downloading
-                    downloadNextZip();
-                    
-                } else {
-                    if (typeof hideProgressToast === 'function') hideProgressToast();
-                    if (typeof showToast === 'function') showToast(response.message || 'No images found!', false);
-                }
-            } catch(e) {
-                if (typeof hideProgressToast === 'function') hideProgressToast();
-                if (typeof showToast === 'function') showToast('Failed to process download response', false);
-                console.error('Download error:', e);
-            }
-        } else {
-            if (typeof hideProgressToast === 'function') hideProgressToast();
+                text = frame.contentDocument ? frame.contentDocument.body.textContent : '';
+            } catch(e) {}
+            if (!text) return;
             try {
-                const error = JSON.parse(xhr.responseText);
+                const error = JSON.parse(text);
                 if (typeof showToast === 'function') showToast(error.message || 'Failed to download images', false);
             } catch(e) {
                 if (typeof showToast === 'function') showToast('Failed to download images', false);
             }
-        }
-    };
+        });
+    }
     
-    xhr.onerror = function() {
-        if (typeof hideProgressToast === 'function') hideProgressToast();
-        if (typeof showToast === 'function') showToast('Failed to download images', false);
+    const form = document.createElement('form');
+    form.method = 'POST';
+    form.action = `/api/table/${tableId}/cards/download-images/stream/`;
+    form.target = frame.name;
+    form.style.display = 'none';
+    
+    const payload = cardSelectionPayload(cardIds);
+    const fields = {
+        csrfmiddlewaretoken: typeof getCSRFToken === 'function' ? getCSRFToken() : '',
     };
+    if (payload.selection) {
+        fields.selection = JSON.stringify(payload.selection);
+    } else {
+        fields.card_ids = payload.card_ids.join(',');
+    }
+    Object.entries(fields).forEach(([name, value]) => {
+        const input = document.createElement('input');
+        input.type = 'hidden';
+        input.name = name;
+        input.value = value;
+        form.appendChild(input);
+    });
+    
+    document.body.appendChild(form);
+    form.submit();
+    document.body.removeChild(form);
     
-    xhr.send(JSON.stringify({ card_ids: cardIds }));
+    // The browser shows the download's progress from here
+    if (typeof showDownloadComplete === 'function') {
+        showDownloadComplete('Images download started');
+    }
 }
 
 function initDownloadImagesHandlers() {
@@ -221,7 +190,7 @@ function downloadDocx(cardIds, format) {
         if (typeof showToast === 'function') showToast('Failed to download document', false);
     };
     
-    xhr.send(JSON.stringify({ card_ids: cardIds, format: format }));
+    xhr.send(JSON.stringify({ ...cardSelectionPayload(cardIds), format: format }));
 }
 
 function initDownloadDocxHandlers() {
@@ -336,7 +305,7 @@ function downloadXlsx(cardIds) {
         if (typeof showToast === 'function') showToast('Failed to download Excel file', false);
     };
     
-    xhr.send(JSON.stringify({ card_ids: cardIds }));
+    xhr.send(JSON.stringify(cardSelectionPayload(cardIds)));
 }
 
 function initDownloadXlsxHandlers() {
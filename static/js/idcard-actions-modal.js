@@ -754,7 +754,7 @@ function initDeleteModal() {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': typeof getCSRFToken === 'function' ? getCSRFToken() : ''
                 },
-                body: JSON.stringify({ card_ids: cardIds })
+                body: JSON.stringify(cardSelectionPayload(cardIds))
             })
             .then(response => response.json())
             .then(data => {
@@ -852,7 +852,7 @@ function initSimpleDeleteModal() {
                     'Content-Type': 'application/json',
                     'X-CSRFToken': typeof getCSRFToken === 'function' ? getCSRFToken() : ''
                 },
-                body: JSON.stringify({ card_ids: cardIds, status: 'pool' })
+                body: JSON.stringify({ ...cardSelectionPayload(cardIds), status: 'pool' })
             })
             .then(response => response.json())
             .then(data => {
@@ -961,7 +961,8 @@ function initModalModule() {
         const btn = document.getElementById(btnId);
         if (btn) {
             btn.addEventListener('click', function() {
-                const selectedIds = typeof getSelectedCardIds === 'function' ? getSelectedCardIds() : [];
+                // Edit/View act on a single visible row, never the Select All DB selection
+                const selectedIds = typeof getCheckedCardIds === 'function' ? getCheckedCardIds() : [];
                 if (selectedIds.length === 1) {
                     fetchCardAndOpenModal('edit', selectedIds[0]);
                 }
@@ -975,7 +976,8 @@ function initModalModule() {
         const btn = document.getElementById(btnId);
         if (btn) {
             btn.addEventListener('click', function() {
-                const selectedIds = typeof getSelectedCardIds === 'function' ? getSelectedCardIds() : [];
+                // Edit/View act on a single visible row, never the Select All DB selection
+                const selectedIds = typeof getCheckedCardIds === 'function' ? getCheckedCardIds() : [];
                 if (selectedIds.length === 1) {
                     fetchCardAndOpenModal('view', selectedIds[0]);
                 }
@@ -1065,7 +1067,7 @@ function directPermanentDelete(cardIds) {
             'Content-Type': 'application/json',
             'X-CSRFToken': typeof getCSRFToken === 'function' ? getCSRFToken() : ''
         },
-        body: JSON.stringify({ card_ids: cardIds })
+        body: JSON.stringify(cardSelectionPayload(cardIds))
     })
     .then(response => response.json())
     .then(data => {
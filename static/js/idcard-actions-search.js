@@ -462,7 +462,7 @@ function initSearchAllModal() {
             .then(response => response.json())
             .then(data => {
                 if (data.success) {
-                    displaySearchResults(data.results, query, searchResultsContainer, closeSearchAllModalFn);
+                    displaySearchResults(data.results, query, searchResultsContainer, closeSearchAllModalFn, data.has_more);
                 } else {
                     if (searchResultsContainer) {
                         searchResultsContainer.innerHTML = `
@@ -558,7 +558,7 @@ function initSearchAllModal() {
     window.closeSearchAllModal = closeSearchAllModalFn;
 }
 
-function displaySearchResults(results, query, container, closeModalFn) {
+function displaySearchResults(results, query, container, closeModalFn, hasMore = false) {
     if (!container) return;
     
     if (results.length === 0) {
@@ -571,7 +571,10 @@ function displaySearchResults(results, query, container, closeModalFn) {
         return;
     }
     
-    let html = `<div class="search-results-count">${results.length} result${results.length > 1 ? 's' : ''} found</div>`;
+    // The server stops at its result limit - say so instead of showing it as an exact count
+    let html = hasMore
+        ? `<div class="search-results-count">${results.length}+ results, refine your search</div>`
+        : `<div class="search-results-count">${results.length} result${results.length > 1 ? 's' : ''} found</div>`;
     html += '<div class="search-results-list">';
     
     results.forEach(result => {
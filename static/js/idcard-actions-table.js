@@ -20,6 +20,7 @@ const lazyLoadState = {
     hasMore: false,
     totalCount: 0,
     loadedCount: 0,
+    lastId: null,  // Cursor: id of the last loaded card (rows are ordered by id)
     batchSize: 100,
     triggerOffset: 15,
     tableId: typeof TABLE_ID !== 'undefined' ? TABLE_ID : null,
@@ -55,6 +56,15 @@ function initializeRows() {
 // LAZY LOAD STATE INITIALIZATION
 // ==========================================
 
+function getLastLoadedCardId() {
+    let lastId = null;
+    allRows.forEach(row => {
+        const id = parseInt(row.getAttribute('data-card-id'));
+        if (!isNaN(id) && (lastId === null || id > lastId)) lastId = id;
+    });
+    return lastId;
+}
+
 function earlyInitLazyLoadState() {
     const paginationBar = document.getElementById('paginationBar');
     if (paginationBar) {
@@ -743,6 +753,35 @@ function attachRowEventHandlers(row) {
     });
 }
 
+// Same format as the server's '%d-%b-%Y %I:%M %p' (timestamps are rendered in UTC)
+function formatCardTimestamp(seconds) {
+    const months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
+    const d = new Date(seconds * 1000);
+    const pad = n => String(n).padStart(2, '0');
+    const hours = d.getUTCHours() % 12 || 12;
+    return `${pad(d.getUTCDate())}-${months[d.getUTCMonth()]}-${d.getUTCFullYear()} ` +
+        `${pad(hours)}:${pad(d.getUTCMinutes())} ${d.getUTCHours() < 12 ? 'AM' : 'PM'}`;
+}
+
+// Expand a format=columnar page into the card objects createRowFromCard expects
+function cardsFromColumnar(data) {
+    const offset = data.columns.length - data.fields.length;
+    return data.rows.map((row, i) => ({
+        id: row[0],
+        sr_no: data.first_sr_no + i,
+        status: row[1],
+        status_display: data.status_labels[row[1]] || row[1],
+        photo: row[2],
+        created_at: formatCardTimestamp(row[3]),
+        updated_at: formatCardTimestamp(row[4]),
+        ordered_fields: data.fields.map((field, j) => ({
+            name: field.name,
+            type: field.type,
+            value: row[offset + j],
+        })),
+    }));
+}
+
 async function loadMoreData() {
     if (lazyLoadState.isLoading || !lazyLoadState.hasMore || !lazyLoadState.tableId) {
         return;
@@ -753,7 +792,16 @@ async function loadMoreData() {
     
     try {
         const offset = lazyLoadState.loadedCount;
-        const url = `/api/table/${lazyLoadState.tableId}/cards/?status=${lazyLoadState.currentStatus}&offset=${offset}&limit=${lazyLoadState.batchSize}`;
+        if (lazyLoadState.lastId === null) {
+            lazyLoadState.lastId = getLastLoadedCardId();
+        }
+        
+        // Cursor paging: seek past the last loaded id (offset only numbers the rows).
+        // The total is already known from the page render, so skip the count.
+        let url = `/api/table/${lazyLoadState.tableId}/cards/?status=${lazyLoadState.currentStatus}&offset=${offset}&limit=${lazyLoadState.batchSize}&format=columnar`;
+        if (lazyLoadState.lastId !== null) {
+            url += `&after_id=${lazyLoadState.lastId}&count=false`;
+        }
         
         const response = await fetch(url, {
             headers: {
@@ -766,6 +814,9 @@ async function loadMoreData() {
         }
         
         const data = await response.json();
+        if (data.format === 'columnar') {
+            data.cards = cardsFromColumnar(data);
+        }
         
         if (data.cards && data.cards.length > 0) {
             const tableBody = document.getElementById('cardsTableBody');
@@ -778,8 +829,11 @@ async function loadMoreData() {
             });
             
             lazyLoadState.loadedCount += data.cards.length;
+            lazyLoadState.lastId = data.next_after_id;
             lazyLoadState.hasMore = data.has_more;
-            lazyLoadState.totalCount = data.total_count;
+            if (data.total_count !== null && data.total_count !== undefined) {
+                lazyLoadState.totalCount = data.total_count;
+            }
             
             filteredRows = [...allRows];
             if (searchQuery) {
@@ -796,9 +850,11 @@ async function loadMoreData() {
             const paginationBar = document.getElementById('paginationBar');
             if (paginationBar) {
                 paginationBar.dataset.hasMore = data.has_more.toString();
-                paginationBar.dataset.totalCount = data.total_count.toString();
+                paginationBar.dataset.totalCount = lazyLoadState.totalCount.toString();
                 paginationBar.dataset.initialLoaded = lazyLoadState.loadedCount.toString();
             }
+        } else {
+            lazyLoadState.hasMore = false;
         }
         
     } catch (error) {
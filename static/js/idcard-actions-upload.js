@@ -607,7 +607,15 @@ function initXlsxUpload() {
                 try {
                     const result = JSON.parse(xhr.responseText);
                     
-                    if (xhr.status === 200 && result.success) {
+                    if (xhr.status === 202 && result.success && result.job_id) {
+                        // Queued as a background import - follow the job's progress
+                        confirmUploadModal.innerHTML = '<i class="fa-solid fa-spinner fa-spin"></i> Importing...';
+                        if (progressBar) progressBar.style.width = '0%';
+                        if (percentageText) percentageText.textContent = '0%';
+                        if (sizeText) sizeText.textContent = 'Upload complete';
+                        if (timeText) timeText.textContent = 'Waiting for import worker...';
+                        pollImportJob(result.job_id);
+                    } else if (xhr.status === 200 && result.success) {
                         if (progressBar) progressBar.style.width = '100%';
                         if (percentageText) percentageText.textContent = '100%';
                         if (timeText) timeText.textContent = 'Complete!';
@@ -649,6 +657,53 @@ function initXlsxUpload() {
                 resetUploadState();
             });
             
+            // Poll /api/import-jobs/<id>/ until the background import finishes
+            function pollImportJob(jobId) {
+                fetch(`/api/import-jobs/${jobId}/`, { credentials: 'same-origin' })
+                    .then(response => response.json())
+                    .then(data => {
+                        if (!data.success || !data.job) {
+                            throw new Error(data.message || 'Could not read import progress');
+                        }
+                        
+                        const job = data.job;
+                        const percent = job.progress !== null ? Math.round(job.progress) : 0;
+                        if (progressBar) progressBar.style.width = percent + '%';
+                        if (percentageText) percentageText.textContent = percent + '%';
+                        if (sizeText && job.total_rows !== null) {
+                            sizeText.textContent = `${job.rows_processed} / ${job.total_rows} rows`;
+                        }
+                        if (timeText) {
+                            timeText.textContent = job.status === 'queued'
+                                ? 'Waiting for import worker...'
+                                : `${job.cards_created} cards, ${job.photos_matched} photos matched`;
+                        }
+                        
+                        if (!job.is_finished) {
+                            setTimeout(() => pollImportJob(jobId), 2000);
+                            return;
+                        }
+                        
+                        if (job.status === 'completed') {
+                            closeUploadModalFn();
+                            let message = job.message;
+                            if (job.error_count > 0) message += ` (${job.error_count} rows had errors)`;
+                            if (typeof showToast === 'function') showToast(message, true);
+                            setTimeout(() => {
+                                window.location.reload();
+                            }, 1500);
+                        } else {
+                            if (typeof showToast === 'function') showToast(job.message || 'Import failed', false);
+                            resetUploadState();
+                        }
+                    })
+                    .catch(error => {
+                        console.error('Import progress error:', error);
+                        if (typeof showToast === 'function') showToast('Failed to read import progress', false);
+                        resetUploadState();
+                    });
+            }
+            
             function resetUploadState() {
                 if (progressSection) progressSection.style.display = 'none';
                 if (progressBar) progressBar.style.width = '0%';